@@ -0,0 +1,303 @@
+# backends.py – moteurs PLNE interchangeables : Gurobi ou HiGHS (scipy.optimize.milp)
+import time
+from typing import Optional, Dict, Any, List
+import numpy as np
+import scipy.sparse as sp
+try:
+    from gurobipy import Model as GurobiModel, GRB, Env as GurobiEnv, GurobiError
+except Exception:
+    GurobiModel = None
+    GRB = None
+    GurobiEnv = None
+    GurobiError = None
+
+# Erreurs Gurobi dues à la licence : absente ou expirée (10009), modèle trop grand pour la
+# licence limitée en taille livrée avec pip (10010)
+LICENSE_ERRORS = (10009, 10010)
+
+
+class LinearProblem:
+    # Description d'un PLNE indépendante du solveur : min c·x, lb <= x <= ub,
+    # blocs de contraintes creuses (nom, A, sens, rhs) avec sens dans '<', '>', '='
+    def __init__(self, name: str = "model"):
+        self.name = name
+        self.c = np.zeros(0)
+        self.lb = np.zeros(0)
+        self.ub = np.zeros(0)
+        self.integer = np.zeros(0, dtype=bool)
+        self.blocks = []
+        self.start = None   # solution initiale éventuelle (MIP start)
+        self.meta = {}      # informations propres au modèle appelant
+
+    @property
+    def num_vars(self) -> int:
+        return len(self.c)
+
+    def add_vars(self, n: int, lb=0.0, ub=np.inf, integer=False, obj=0.0) -> np.ndarray:
+        first = self.num_vars
+        self.c = np.concatenate([self.c, np.broadcast_to(np.asarray(obj, dtype=float), (n,))])
+        self.lb = np.concatenate([self.lb, np.broadcast_to(np.asarray(lb, dtype=float), (n,))])
+        self.ub = np.concatenate([self.ub, np.broadcast_to(np.asarray(ub, dtype=float), (n,))])
+        self.integer = np.concatenate([self.integer, np.broadcast_to(np.asarray(integer, dtype=bool), (n,))])
+        return np.arange(first, first + n)
+
+    def add_block(self, name: str, A, sense: str, rhs):
+        self.blocks.append((name, sp.coo_matrix(A), sense, np.asarray(rhs, dtype=float).ravel()))
+
+    def add_constrs(self, name: str, rows, cols, vals, sense: str, rhs):
+        # Contraintes données en triplets (ligne, colonne, coefficient)
+        rhs = np.asarray(rhs, dtype=float).ravel()
+        rows, cols = np.asarray(rows).ravel(), np.asarray(cols).ravel()
+        vals = np.broadcast_to(np.asarray(vals, dtype=float), rows.shape).ravel()
+        A = sp.coo_matrix((vals, (rows, cols)), shape=(len(rhs), max(self.num_vars, cols.max(initial=-1) + 1)))
+        self.blocks.append((name, A, sense, rhs))
+
+    def block_matrices(self):
+        # Blocs au format CSR, complétés à la largeur finale du vecteur x
+        N = self.num_vars
+        for name, A, sense, rhs in self.blocks:
+            A = sp.csr_matrix((A.data, (A.row, A.col)), shape=(A.shape[0], N))
+            yield name, A, sense, rhs
+
+    def size(self) -> Dict[str, int]:
+        return {'vars': self.num_vars,
+                'constrs': int(sum(len(b[3]) for b in self.blocks)),
+                'nonzeros': int(sum(b[1].nnz for b in self.blocks))}
+
+
+_default_env = None   # environnement Gurobi partagé (un par processus en mode batch)
+
+
+def set_gurobi_env(env):
+    global _default_env
+    _default_env = env
+
+
+def init_worker(backend: Optional[str] = None, threads: Optional[int] = None):
+    # Initialiseur des processus de calcul (batch, sweep, multisite) : un environnement Gurobi
+    # par processus, limité à `threads` threads ; sans licence, get_backend retombe sur HiGHS
+    if backend not in (None, "gurobi") or GurobiEnv is None:
+        return
+    try:
+        env = GurobiEnv(empty=True)
+        env.setParam('OutputFlag', 0)
+        if threads:
+            env.setParam('Threads', threads)
+        env.start()
+        set_gurobi_env(env)
+    except GurobiError:
+        pass
+
+
+def progress_info(obj, bound, elapsed) -> Dict[str, Any]:
+    # obj / bound : None tant qu'ils ne sont pas connus
+    gap = (abs(obj - bound) / max(abs(obj), 1e-10)
+           if obj is not None and bound is not None else None)
+    return {'obj': obj, 'bound': bound, 'gap': gap, 'elapsed': elapsed}
+
+
+class Backend:
+    name = "base"
+    label = "base"   # nom affiché dans l'interface
+
+    def available(self) -> bool:
+        return False
+
+    def solve(self, problem: LinearProblem, time_limit: Optional[float] = None,
+              **options) -> Dict[str, Any]:
+        raise NotImplementedError
+
+
+class GurobiBackend(Backend):
+    name = "gurobi"
+    label = "Gurobi"
+    fallback = None    # moteur de repli quand la licence refuse le modèle (choix automatique)
+    _licensed = None   # licence vérifiée une seule fois par processus
+
+    def available(self) -> bool:
+        if GurobiModel is None:
+            return False
+        if _default_env is not None:
+            return True
+        if GurobiBackend._licensed is None:
+            try:
+                env = GurobiEnv(empty=True)
+                env.setParam('OutputFlag', 0)
+                env.start()
+                env.dispose()
+                GurobiBackend._licensed = True
+            except GurobiError:
+                GurobiBackend._licensed = False
+        return GurobiBackend._licensed
+
+    def build(self, problem: LinearProblem):
+        m = GurobiModel(problem.name, env=_default_env) if _default_env else GurobiModel(problem.name)
+        m.setParam('OutputFlag', 0)
+        vtype = np.where(problem.integer,
+                         np.where((problem.lb == 0) & (problem.ub == 1), GRB.BINARY, GRB.INTEGER),
+                         GRB.CONTINUOUS)
+        x = m.addMVar(problem.num_vars, lb=problem.lb, ub=problem.ub, vtype=vtype, name="x")
+        constrs = {name: m.addMConstr(A, x, sense, rhs, name=name)
+                   for name, A, sense, rhs in problem.block_matrices()}
+        m.setMObjective(None, problem.c, 0.0, sense=GRB.MINIMIZE)
+        if problem.start is not None:
+            x.Start = problem.start
+        return m, x, constrs
+
+    @staticmethod
+    def _callback(progress, cancel, interval):
+        # progress(dict) appelé au plus toutes les `interval` secondes (et à chaque nouvelle
+        # solution) ; cancel : threading.Event, arrêt propre via terminate()
+        last = [-np.inf]
+
+        def cb(model, where):
+            if cancel is not None and cancel.is_set():
+                model.terminate()
+                return
+            if progress is None or where not in (GRB.Callback.MIP, GRB.Callback.MIPSOL):
+                return
+            now = model.cbGet(GRB.Callback.RUNTIME)
+            if where == GRB.Callback.MIP and now - last[0] < interval:
+                return
+            last[0] = now
+            if where == GRB.Callback.MIP:
+                obj, bound = model.cbGet(GRB.Callback.MIP_OBJBST), model.cbGet(GRB.Callback.MIP_OBJBND)
+            else:
+                obj, bound = model.cbGet(GRB.Callback.MIPSOL_OBJBST), model.cbGet(GRB.Callback.MIPSOL_OBJBND)
+            progress(progress_info(obj if abs(obj) < GRB.INFINITY else None,
+                                   bound if abs(bound) < GRB.INFINITY else None, now))
+        return cb
+
+    def run(self, m, x, time_limit: Optional[float] = None, threads: Optional[int] = None,
+            iis: bool = False, constrs: Optional[Dict[str, Any]] = None,
+            progress=None, cancel=None, progress_interval: float = 0.25) -> Dict[str, Any]:
+        # iis : en cas d'infaisabilité, sous-système irréductible rendu par bloc nommé
+        # ({nom du bloc : lignes}, 'bornes' : variables dont la borne intervient)
+        m.setParam('TimeLimit', time_limit if time_limit else GRB.INFINITY)
+        if threads:
+            m.setParam('Threads', threads)
+        if progress is None and cancel is None:
+            m.optimize()
+        else:
+            m.optimize(self._callback(progress, cancel, progress_interval))
+        res = {'backend': self.name, 'runtime': m.Runtime}
+        if m.Status == GRB.OPTIMAL:
+            res.update(status='optimal', x=x.X, obj=m.ObjVal, bound=m.ObjBound)
+        elif m.Status == GRB.INFEASIBLE:
+            res.update(status='infeasible')
+            if iis:
+                t0 = time.perf_counter()
+                m.computeIIS()
+                found = {name: np.flatnonzero(np.atleast_1d(c.IISConstr)).tolist()
+                         for name, c in (constrs or {}).items()}
+                found['bornes'] = np.flatnonzero(np.atleast_1d(x.IISLB) | np.atleast_1d(x.IISUB)).tolist()
+                res['iis'] = {name: rows for name, rows in found.items() if rows}
+                res['iis_time'] = time.perf_counter() - t0
+        elif m.Status in (GRB.TIME_LIMIT, GRB.INTERRUPTED):
+            res.update(status='time_limit' if m.Status == GRB.TIME_LIMIT else 'interrupted')
+            if m.SolCount > 0:
+                res.update(x=x.X, obj=m.ObjVal, bound=m.ObjBound)
+        else:
+            res.update(status='error', message=f'Gurobi status: {m.Status}')
+        return res
+
+    def solve(self, problem, time_limit=None, threads=None, iis=False, progress=None,
+              cancel=None, **options):
+        try:
+            t0 = time.perf_counter()
+            m, x, constrs = self.build(problem)
+            build_time = time.perf_counter() - t0
+            try:
+                res = self.run(m, x, time_limit, threads, iis, constrs, progress, cancel)
+                res['build_time'] = build_time
+                return res
+            finally:
+                m.dispose()
+        except GurobiError as ex:
+            # Licence limitée en taille (ou absente) : même problème repris par le moteur de repli
+            if self.fallback is None or ex.errno not in LICENSE_ERRORS:
+                raise
+            res = self.fallback.solve(problem, time_limit=time_limit, threads=threads, iis=iis,
+                                      progress=progress, cancel=cancel, **options)
+            res['fallback'] = f"Gurobi : {ex.message} – résolu avec {self.fallback.label}"
+            return res
+
+
+class HighsBackend(Backend):
+    # HiGHS via scipy.optimize.milp : aucune licence nécessaire
+    name = "highs"
+    label = "HiGHS"
+
+    def available(self) -> bool:
+        try:
+            from scipy.optimize import milp  # noqa: F401
+            return True
+        except Exception:
+            return False
+
+    def solve(self, problem, time_limit=None, threads=None, progress=None, cancel=None, **options):
+        # scipy.optimize.milp n'expose pas de callback : pas de progression, et l'annulation
+        # n'est prise en compte qu'avant le lancement
+        from scipy.optimize import milp, Bounds, LinearConstraint
+        if cancel is not None and cancel.is_set():
+            return {'backend': self.name, 'runtime': 0.0, 'status': 'interrupted'}
+        t0 = time.perf_counter()
+        constraints = []
+        for name, A, sense, rhs in problem.block_matrices():
+            lo = rhs if sense in ('>', '=') else np.full(len(rhs), -np.inf)
+            hi = rhs if sense in ('<', '=') else np.full(len(rhs), np.inf)
+            constraints.append(LinearConstraint(A, lo, hi))
+        opts = {'disp': False}
+        if time_limit:
+            opts['time_limit'] = float(time_limit)
+        build_time = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        r = milp(problem.c, integrality=problem.integer.astype(int),
+                 bounds=Bounds(problem.lb, problem.ub), constraints=constraints, options=opts)
+        res = {'backend': self.name, 'runtime': time.perf_counter() - t0, 'build_time': build_time}
+        has_x = r.x is not None
+        if r.status == 0:
+            res.update(status='optimal', x=r.x, obj=r.fun, bound=getattr(r, 'mip_dual_bound', r.fun))
+        elif r.status == 2:
+            res.update(status='infeasible')
+        elif r.status == 1:
+            res.update(status='time_limit')
+            if has_x:
+                res.update(x=r.x, obj=r.fun, bound=getattr(r, 'mip_dual_bound', None))
+        else:
+            res.update(status='error', message=f'HiGHS : {r.message}')
+        return res
+
+
+BACKENDS = {'gurobi': GurobiBackend, 'highs': HighsBackend}
+
+
+def get_backend(name: Optional[str] = None) -> Backend:
+    # name=None : Gurobi si disponible (licence comprise), sinon HiGHS ; un modèle refusé par
+    # la licence Gurobi est alors résolu avec HiGHS
+    if name is None:
+        gurobi = GurobiBackend()
+        if not gurobi.available():
+            return HighsBackend()
+        gurobi.fallback = HighsBackend()
+        return gurobi
+    if name not in BACKENDS:
+        raise ValueError(f"Solveur inconnu : {name} (choix : {', '.join(BACKENDS)})")
+    backend = BACKENDS[name]()
+    if not backend.available():
+        raise RuntimeError(f"Solveur {name} indisponible sur cette machine")
+    return backend
+
+
+def available_backends() -> List[str]:
+    return [name for name, cls in BACKENDS.items() if cls().available()]
+
+
+def compare_backends(problem: LinearProblem, names: Optional[List[str]] = None,
+                     time_limit: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+    # Résout le même problème avec chaque moteur (objectif, statut, temps)
+    out = {}
+    for name in names or available_backends():
+        res = get_backend(name).solve(problem, time_limit=time_limit)
+        out[name] = {k: res.get(k) for k in ('status', 'obj', 'bound', 'runtime')}
+    return out
@@ -0,0 +1,126 @@
+# batch.py – résolution sans interface de nombreux fichiers de demande en parallèle
+# Exemple : python batch.py "sites/*.csv" -E 40 --max-shifts 20 --workers 8 --threads 2 \
+#               --out resultats.jsonl --csv resume.csv
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from backends import init_worker
+from instrumentation import emit, solve_record
+
+CSV_FIELDS = ['file', 'status', 'obj', 'runtime', 'wall', 'E', 'D', 'S', 'backend', 'formulation', 'message']
+
+
+def find_instances(patterns):
+    # Répertoires (tous les *.csv qu'ils contiennent) ou motifs glob
+    files = []
+    for p in patterns:
+        if os.path.isdir(p):
+            files.extend(glob.glob(os.path.join(p, "*.csv")))
+        else:
+            files.extend(glob.glob(p))
+    return sorted(set(files))
+
+
+def solve_file(path, E, max_shifts, costs, backend, time_limit, threads, rolling):
+    from demand_io import load_demand_csv
+    from model import SchedulingModel
+    t0 = time.perf_counter()
+    out = {'file': path}
+    try:
+        demand = load_demand_csv(path)
+        D, S = demand.shape
+        out.update(E=E, D=D, S=S)
+        model = SchedulingModel(E, D, S, demand, max_shifts, costs)
+        if rolling:
+            from rolling import solve_rolling
+            res = solve_rolling(model, window=rolling, backend=backend, time_limit=time_limit, log=False)
+        else:
+            res = model.solve(time_limit=time_limit, backend=backend, threads=threads, log=False)
+    except Exception as ex:
+        res = {'status': 'error', 'message': str(ex)}
+    out.update({k: v for k, v in res.items() if k != 'solution'})
+    if res.get('solution') is not None:
+        # Planning compact : quart travaillé par agent et par jour (-1 = repos)
+        sol = np.asarray(res['solution'])
+        out['roster'] = np.where(sol.any(axis=2), sol.argmax(axis=2), -1).tolist()
+    out['wall'] = time.perf_counter() - t0
+    return out
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="Résolution en lot de fichiers de demande (D lignes × S quarts)")
+    p.add_argument("inputs", nargs="+", help="répertoires ou motifs glob de fichiers CSV")
+    p.add_argument("-E", "--agents", type=int, required=True, help="nombre d'agents")
+    p.add_argument("--max-shifts", type=int, required=True, help="quarts maximum par agent")
+    p.add_argument("--costs", help="coût par quart, ex. 1,1,1.8 (défaut : nuit à 1.8)")
+    p.add_argument("--backend", choices=("gurobi", "highs"), default=None)
+    p.add_argument("--time-limit", type=float, default=None, help="secondes par instance")
+    p.add_argument("--workers", type=int, default=os.cpu_count(), help="processus en parallèle")
+    p.add_argument("--threads", type=int, default=1, help="threads solveur par processus")
+    p.add_argument("--rolling", type=int, default=0, metavar="JOURS",
+                   help="horizon glissant avec des fenêtres de JOURS jours (0 : modèle complet)")
+    p.add_argument("--out", default="-", help="résultats JSON lignes (défaut : sortie standard)")
+    p.add_argument("--csv", help="résumé CSV (une ligne par instance)")
+    p.add_argument("--profile", action="store_true", help="profil cProfile de chaque résolution (logs/profiles)")
+    return p.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    files = find_instances(args.inputs)
+    if not files:
+        print("Aucun fichier de demande trouvé", file=sys.stderr)
+        return 1
+    costs = [float(c) for c in args.costs.split(",")] if args.costs else None
+    workers = max(1, min(args.workers or 1, len(files)))
+    # Les bibliothèques numériques des processus fils héritent du budget de threads
+    for var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[var] = str(args.threads)
+    if args.profile:
+        os.environ["SCHEDULER_PROFILE"] = "1"
+
+    out = sys.stdout if args.out == "-" else open(args.out, "w")
+    summary = open(args.csv, "w", newline="") if args.csv else None
+    writer = None
+    if summary:
+        writer = csv.DictWriter(summary, fieldnames=CSV_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+    failed = 0
+    t0 = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                 initargs=(args.backend, args.threads)) as pool:
+            jobs = [pool.submit(solve_file, f, args.agents, args.max_shifts, costs, args.backend,
+                                args.time_limit, args.threads, args.rolling) for f in files]
+            # Chaque instance est écrite dès qu'elle se termine
+            for job in as_completed(jobs):
+                res = job.result()
+                # Journal écrit par le seul processus principal (rotation sûre)
+                emit(solve_record(res, model='rolling' if args.rolling else 'scheduling',
+                                  source='batch', file=res['file'], E=res.get('E'), D=res.get('D'),
+                                  S=res.get('S'), wall=res['wall']))
+                failed += res['status'] != 'optimal'
+                out.write(json.dumps(res) + "\n")
+                out.flush()
+                if writer:
+                    writer.writerow(res)
+                    summary.flush()
+                print(f"{res['file']} : {res['status']} ({res['wall']:.1f}s)", file=sys.stderr)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        if summary:
+            summary.close()
+    print(f"{len(files)} instances, {failed} non optimales, {time.perf_counter() - t0:.1f}s",
+          file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+# benchmark.py – passage à l'échelle de SchedulingModel et NovaModel
+# Exemple : python benchmark.py --suite quick --backend highs --out bench.json
+#           python benchmark.py --suite quick --backend highs --baseline bench_ref.json
+# Pour chaque point : temps de construction, de résolution, mémoire de pointe (tracemalloc :
+# allocations Python et numpy, pas la mémoire interne du solveur) et objectif.
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+import numpy as np
+from model import SchedulingModel
+from nova_model import NovaModel
+from instances import scheduling_instance, nova_instance
+
+# (E, D, S, densité, motif de coût) et (projets, tâches, équipes)
+SUITES = {
+    'quick': {'scheduling': [(10, 7, 3, 0.7, 'night'), (20, 14, 3, 0.7, 'night'),
+                             (20, 14, 3, 0.7, 'random'), (40, 28, 3, 0.7, 'night')],
+              'nova': [(3, 2, 2), (4, 3, 3)]},
+    'full': {'scheduling': [(E, D, S, dens, cost) for E, D in ((20, 14), (50, 31), (100, 31), (100, 92))
+                            for S in (3, 8) for dens in (0.5, 0.9) for cost in ('night', 'agent')],
+             'nova': [(p, t, k) for p, t in ((3, 3), (5, 4), (8, 4), (12, 8)) for k in (2, 4, 6)]},
+}
+
+
+def _measure(make, solve):
+    # make() construit le modèle, solve(model) le résout ; mémoire de pointe sur les deux
+    tracemalloc.start()
+    try:
+        t0 = time.perf_counter()
+        model = make()
+        construct = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        res = solve(model)
+        wall = construct + time.perf_counter() - t0
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return model, res, construct, wall, peak
+
+
+def bench_scheduling(E, D, S, density, cost, backend=None, time_limit=None, repeat=1, seed=0):
+    inst = scheduling_instance(E, D, S, density, cost, seed=seed)
+    runs = [_measure(lambda: SchedulingModel(**inst),
+                     lambda m: m.solve(backend=backend, time_limit=time_limit, log=False))
+            for _ in range(repeat)]
+    model, res, construct, wall, peak = min(runs, key=lambda r: r[3])
+    phases = res.get('phases', {})
+    return {'name': f"sched-E{E}-D{D}-S{S}-{density}-{cost}", 'kind': 'scheduling',
+            'params': {'E': E, 'D': D, 'S': S, 'density': density, 'cost': cost, 'seed': seed},
+            'status': res['status'], 'obj': res.get('obj'), 'size': res.get('size'),
+            'formulation': res.get('formulation'), 'backend': res.get('backend'),
+            'build': construct + phases.get('build', 0.0) + phases.get('presolve', 0.0),
+            'solve': phases.get('optimize', 0.0) + phases.get('heuristic', 0.0),
+            'wall': wall, 'peak_mb': peak / 2**20, 'message': res.get('message')}
+
+
+def bench_nova(projects, tasks, teams, backend=None, time_limit=None, repeat=1, seed=0):
+    inst = nova_instance(projects, tasks, teams, seed=seed)
+    runs = [_measure(lambda: NovaModel(**inst),
+                     lambda m: m.solve(backend=backend, time_limit=time_limit, log=False))
+            for _ in range(repeat)]
+    model, res, construct, wall, peak = min(runs, key=lambda r: r[3])
+    phases = res.get('phases', {})
+    return {'name': f"nova-P{projects}-T{tasks}-K{teams}", 'kind': 'nova',
+            'params': {'projects': projects, 'tasks': tasks, 'teams': teams, 'seed': seed},
+            'status': res['status'], 'obj': res.get('makespan'), 'size': res.get('size'),
+            'backend': res.get('backend'),
+            'build': construct + phases.get('build', 0.0), 'solve': phases.get('optimize', 0.0),
+            'wall': wall, 'peak_mb': peak / 2**20, 'message': res.get('message')}
+
+
+def run_suite(suite: str = 'quick', backend: Optional[str] = None, time_limit: Optional[float] = None,
+              repeat: int = 1, verbose: bool = True) -> Dict[str, Any]:
+    points = SUITES[suite]
+    # Échauffement : imports paresseux (scipy.optimize, gurobipy) hors des mesures
+    SchedulingModel(**scheduling_instance(3, 2, 2, 0.3)).solve(backend=backend, log=False)
+    results = []
+    jobs = ([(bench_scheduling, p) for p in points['scheduling']]
+            + [(bench_nova, p) for p in points['nova']])
+    for fn, p in jobs:
+        r = fn(*p, backend=backend, time_limit=time_limit, repeat=repeat)
+        results.append(r)
+        if verbose:
+            obj = f"{r['obj']:.2f}" if r['obj'] is not None else "-"
+            print(f"{r['name']:<32} {r['status']:<11} obj {obj:>9}  build {r['build']:.3f}s  "
+                  f"solve {r['solve']:.3f}s  pic {r['peak_mb']:.1f} Mo", file=sys.stderr)
+    return {'meta': {'suite': suite, 'backend': backend, 'time_limit': time_limit, 'repeat': repeat,
+                     'date': datetime.now().isoformat(timespec='seconds'),
+                     'python': platform.python_version(), 'numpy': np.__version__,
+                     'platform': platform.platform()},
+            'results': results}
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], time_tol: float = 0.25,
+            mem_tol: float = 0.25, min_delta: float = 0.05) -> List[str]:
+    # Régressions par rapport à la référence : statut, objectif (à statut optimal égal),
+    # temps (au-delà de time_tol relatif ET min_delta secondes absolues) et mémoire de pointe
+    ref = {r['name']: r for r in baseline['results']}
+    issues = []
+    for r in report['results']:
+        b = ref.get(r['name'])
+        if b is None:
+            continue
+        if r['status'] != b['status']:
+            issues.append(f"{r['name']} : statut {b['status']} → {r['status']}")
+            continue
+        if r['status'] == 'optimal' and b['obj'] is not None and r['obj'] is not None \
+                and abs(r['obj'] - b['obj']) > 1e-6 * max(1.0, abs(b['obj'])):
+            issues.append(f"{r['name']} : objectif {b['obj']:.4f} → {r['obj']:.4f}")
+        for key in ('build', 'solve'):
+            if r[key] > b[key] * (1 + time_tol) and r[key] - b[key] > min_delta:
+                issues.append(f"{r['name']} : {key} {b[key]:.3f}s → {r[key]:.3f}s")
+        if r['peak_mb'] > b['peak_mb'] * (1 + mem_tol) and r['peak_mb'] - b['peak_mb'] > 1.0:
+            issues.append(f"{r['name']} : mémoire {b['peak_mb']:.1f} → {r['peak_mb']:.1f} Mo")
+    return issues
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Benchmark de passage à l'échelle")
+    p.add_argument("--suite", choices=sorted(SUITES), default="quick")
+    p.add_argument("--backend", choices=("gurobi", "highs"), default=None)
+    p.add_argument("--time-limit", type=float, default=60.0)
+    p.add_argument("--repeat", type=int, default=1, help="garde la meilleure de N mesures")
+    p.add_argument("--out", help="rapport JSON")
+    p.add_argument("--baseline", help="rapport de référence à comparer")
+    p.add_argument("--time-tol", type=float, default=0.25)
+    p.add_argument("--mem-tol", type=float, default=0.25)
+    args = p.parse_args(argv)
+
+    report = run_suite(args.suite, args.backend, args.time_limit, args.repeat)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=1)
+    if args.baseline:
+        with open(args.baseline) as f:
+            issues = compare(report, json.load(f), args.time_tol, args.mem_tol)
+        for line in issues:
+            print("RÉGRESSION " + line, file=sys.stderr)
+        print(f"{len(issues)} régression(s) par rapport à {args.baseline}", file=sys.stderr)
+        return 1 if issues else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
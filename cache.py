@@ -0,0 +1,129 @@
+# cache.py – cache des solutions adressé par contenu (mémoire LRU + disque)
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, Any
+import numpy as np
+from backends import get_backend
+
+# Seuls les résultats déterministes sont conservés
+CACHED_STATUSES = ('optimal', 'infeasible')
+
+
+class SolutionCache:
+    def __init__(self, max_entries: int = 64, directory: Optional[str] = ".solution_cache"):
+        self.max_entries = max_entries
+        self.directory = directory
+        self.hits_memory = 0
+        self.hits_disk = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(model, backend: Optional[str] = None) -> str:
+        # Empreinte canonique de (E, D, S, demande, budgets, veille de nuit, coûts, moteur) :
+        # toute donnée qui change la faisabilité ou l'optimum doit y figurer
+        h = hashlib.sha256()
+        h.update(f"{model.E},{model.D},{model.S},{backend}".encode())
+        h.update(np.ascontiguousarray(model.demand, dtype=np.int64).tobytes())
+        h.update(np.ascontiguousarray(model.budget, dtype=np.int64).tobytes())
+        h.update(np.ascontiguousarray(model.prev_night, dtype=np.uint8).tobytes())
+        h.update(np.ascontiguousarray(model.cost, dtype=np.float64).tobytes())
+        return h.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.npz")
+
+    def _load(self, key) -> Optional[Dict[str, Any]]:
+        if not self.directory or not os.path.exists(self._path(key)):
+            return None
+        try:
+            with np.load(self._path(key)) as data:
+                res = json.loads(str(data["meta"]))
+                if "packed" in data:
+                    shape = tuple(res.pop("shape"))
+                    bits = np.unpackbits(data["packed"], count=int(np.prod(shape)))
+                    res["solution"] = bits.reshape(shape)
+            return res
+        except Exception:
+            return None   # fichier illisible : traité comme un défaut de cache
+
+    def _store(self, key, res):
+        if not self.directory:
+            return
+        meta = {k: v for k, v in res.items() if k != "solution"}
+        arrays = {}
+        if "solution" in res:
+            sol = np.asarray(res["solution"], dtype=np.uint8)
+            meta["shape"] = list(sol.shape)
+            arrays["packed"] = np.packbits(sol.ravel())     # 1 bit par variable x[e,d,s]
+        tmp = self._path(key) + ".tmp.npz"
+        np.savez_compressed(tmp, meta=np.array(json.dumps(meta)), **arrays)
+        os.replace(tmp, self._path(key))
+
+    def get(self, key) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits_memory += 1
+                return dict(self._memory[key])
+        res = self._load(key)
+        with self._lock:
+            if res is None:
+                self.misses += 1
+                return None
+            self.hits_disk += 1
+            self._remember(key, res)
+        return dict(res)
+
+    def _remember(self, key, res):
+        if "solution" in res:
+            res["solution"].flags.writeable = False   # partagé entre appelants, jamais copié
+        self._memory[key] = res
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def put(self, key, res):
+        if res.get('status') not in CACHED_STATUSES:
+            return
+        res = {k: v for k, v in res.items() if k not in ('cached', 'incremental', 'phases')}
+        if "solution" in res:
+            res["solution"] = np.asarray(res["solution"], dtype=np.uint8)
+        with self._lock:
+            self._remember(key, res)
+        self._store(key, res)
+
+    def solve(self, model, backend: Optional[str] = None, **solve_kwargs) -> Dict[str, Any]:
+        # Remplace model.solve : un succès de cache ne touche pas au solveur
+        name = get_backend(backend).name
+        key = self.key(model, name)
+        res = self.get(key)
+        if res is not None:
+            res['cached'] = True
+            return res
+        res = model.solve(backend=name, **solve_kwargs)
+        self.put(key, res)
+        return res
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        if self.directory:
+            for f in os.listdir(self.directory):
+                if f.endswith(".npz"):
+                    os.remove(os.path.join(self.directory, f))
+
+    def stats(self) -> Dict[str, int]:
+        return {'hits_memory': self.hits_memory, 'hits_disk': self.hits_disk,
+                'misses': self.misses, 'entries': len(self._memory)}
+
+    def stats_text(self) -> str:
+        hits = self.hits_memory + self.hits_disk
+        total = hits + self.misses
+        return f"cache {hits}/{total} (mém. {self.hits_memory}, disque {self.hits_disk})"
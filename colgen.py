@@ -0,0 +1,378 @@
+# colgen.py – génération de colonnes : plannings individuels (motifs) au lieu de x[e,d,s]
+# Une colonne = un motif sur l'horizon pour une classe d'agents interchangeables (même coûts,
+# budget et veille) ; il respecte déjà un quart par jour, nuit → matin et max quarts.
+#   maître (PL, HiGHS via scipy) : min Σ coût·λ, couverture Σ λ·a >= demande, Σ λ <= n_c ;
+#   pricing : plus court chemin par programmation dynamique jours × (nuit la veille) × quarts faits ;
+#   fin : price-and-branch, PLNE entier sur les colonnes générées (moteur de backends.py).
+import time
+from typing import Optional, Dict, Any
+import numpy as np
+import scipy.sparse as sp
+from scipy.optimize import linprog
+from model import SchedulingModel
+from heuristic import heuristic_schedule
+from backends import LinearProblem, get_backend, progress_info
+from instrumentation import PhaseTimer, emit, solve_record
+
+KEEP = 5        # colonnes gardées dans le PL (et le PLNE final) : KEEP × lignes du maître
+BIG_M = 1e3     # coût d'une unité de couverture artificielle, × coût maximal d'un quart
+BRANCH_TIME = 5.0   # limite (s) du PLNE final quand aucune limite globale n'est donnée
+DIVE_ITER = 10      # itérations de génération par étape d'arrondi (tolérance DIVE_TOL)
+DIVE_TOL = 1e-3
+ROUND_UP = 0.5      # parties fractionnaires arrondies au-dessus pendant l'arrondi
+
+
+def price(r, budget, prev_night, max_cols=5):
+    # r : coûts réduits (D, S) → meilleurs motifs (un par nombre de quarts) et leur coût réduit
+    # Motif : vecteur (D,) du quart travaillé chaque jour, S = repos
+    D, S = r.shape
+    B = min(int(budget), D)
+    night = S >= 2
+    V = np.full((B + 1, 2), np.inf)
+    V[0, int(prev_night and night)] = 0.0
+    # Choix retenus pour chaque état (k quarts faits, nuit ce jour) : état de la veille, quart
+    from_n = np.zeros((D, B + 1, 2), dtype=np.int8)
+    shift = np.zeros((D, B + 1, 2), dtype=np.int16)
+    for d in range(D):
+        W = np.full((B + 1, 2), np.inf)
+        best_n = np.argmin(V, axis=1)
+        W[:, 0] = V[np.arange(B + 1), best_n]
+        from_n[d, :, 0] = best_n
+        shift[d, :, 0] = S
+        for s in range(S):
+            n_to = int(night and s == S - 1)
+            if night and s == 0:
+                prev = np.zeros(B, dtype=np.int8)          # pas de matin après une nuit
+            else:
+                prev = best_n[:-1]
+            cand = V[np.arange(B), prev] + r[d, s]
+            better = cand < W[1:, n_to]
+            W[1:, n_to][better] = cand[better]
+            from_n[d, 1:, n_to][better] = prev[better]
+            shift[d, 1:, n_to][better] = s
+        V = W
+
+    final = V.min(axis=1)
+    pats, values = [], []
+    for k in np.argsort(final, kind='stable')[:max_cols]:
+        if not np.isfinite(final[k]):
+            break
+        values.append(float(final[k]))
+        n = int(np.argmin(V[k]))
+        pat = np.empty(D, dtype=np.int16)
+        for d in range(D - 1, -1, -1):
+            pat[d] = shift[d, k, n]
+            n = int(from_n[d, k, n])
+            k -= int(pat[d] < S)
+        pats.append(pat)
+    return pats, values
+
+
+class _Columns:
+    # Réservoir de colonnes : classe, coût, cases couvertes (d*S + s) ; sans doublons
+    def __init__(self, D, S):
+        self.D, self.S = D, S
+        self.cls, self.cost, self.cover = [], [], []
+        self.seen = {}
+
+    def add(self, c, pat, cost):
+        key = (c, pat.tobytes())
+        if key not in self.seen:
+            days = np.flatnonzero(pat < self.S)
+            self.seen[key] = len(self.cls)
+            self.cls.append(c)
+            self.cost.append(float(cost[days, pat[days]].sum()))
+            self.cover.append(days * self.S + pat[days])
+        return self.seen[key]
+
+    def add_rosters(self, x, labels, cost):
+        # Plannings (n, D, S) d'agents des classes labels → nombre d'agents par colonne
+        pats = np.where(x.any(axis=2), x.argmax(axis=2), self.S).astype(np.int16)
+        idx = [self.add(c, pat, cost[c]) for c, pat in zip(labels, pats)]
+        return np.bincount(idx, minlength=len(self)).astype(float)
+
+    def __len__(self):
+        return len(self.cls)
+
+    def matrix(self):
+        # Couverture (D*S, colonnes)
+        cols = np.repeat(np.arange(len(self)), [len(c) for c in self.cover])
+        rows = np.concatenate(self.cover) if self.cover else np.zeros(0, dtype=np.int64)
+        return sp.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(self.D * self.S, len(self)))
+
+    def expand(self, take, classes, E):
+        # Nombre d'agents par colonne → planning (E, D, S), motifs distribués dans chaque classe
+        sol = np.zeros((E, self.D, self.S), dtype=np.uint8)
+        used = [0] * len(classes)
+        for j in np.flatnonzero(take):
+            c = self.cls[j]
+            for _ in range(int(take[j])):
+                sol[classes[c][used[c]], self.cover[j] // self.S, self.cover[j] % self.S] = 1
+                used[c] += 1
+        return sol, used
+
+
+class _Master:
+    # Problème maître par classes d'agents ; generate() peut résoudre un problème résiduel
+    # (demande et agents restants) en réutilisant le réservoir de colonnes
+    def __init__(self, model, classes):
+        self.S = model.S
+        self.cls_cost = [np.asarray(model.cost[m[0]], dtype=float) for m in classes]
+        self.cls_budget = [int(model.budget[m[0]]) for m in classes]
+        self.cls_night = [bool(model.prev_night[m[0]]) for m in classes]
+        self.cols = _Columns(model.D, model.S)
+        self.rows = model.demand.size + len(classes)
+        self.big_m = BIG_M * (float(np.abs(model.cost).max(initial=0.0)) + 1.0)
+
+    def lp(self, active, demand, counts):
+        # Maître relâché sur les colonnes actives ; variables : λ puis artificielles de couverture
+        cols, DS, K = self.cols, demand.size, len(counts)
+        A = cols.matrix()[:, active]
+        conv = sp.csr_matrix((np.ones(len(active)), (np.asarray(cols.cls)[active], np.arange(len(active)))),
+                             shape=(K, len(active)))
+        A_ub = sp.vstack([sp.hstack([-A, -sp.identity(DS)]),
+                          sp.hstack([conv, sp.csr_matrix((K, DS))])]).tocsr()
+        b_ub = np.concatenate([-demand.ravel(), counts]).astype(float)
+        c = np.concatenate([np.asarray(cols.cost)[active], np.full(DS, self.big_m)])
+        res = linprog(c, A_ub=A_ub, b_ub=b_ub, bounds=(0, None), method='highs')
+        if res.status != 0:
+            raise RuntimeError(f"PL maître : {res.message}")
+        duals = res.ineqlin.marginals
+        pi = -duals[:DS].reshape(demand.shape)          # >= 0 : valeur d'une unité de couverture
+        mu = duals[DS:]                                 # <= 0 : valeur d'un agent de la classe
+        return res.fun, res.x[:len(active)], float(res.x[len(active):].sum()), pi, mu
+
+    def reduced_costs(self, pi, mu):
+        cols = self.cols
+        return np.asarray(cols.cost) - cols.matrix().T @ pi.ravel() - mu[np.asarray(cols.cls)]
+
+    def generate(self, demand, counts, active, max_iter, tol, smoothing, deadline=None,
+                 cancel=None, on_iter=None):
+        # Génération de colonnes jusqu'à l'optimum du PL (ou tol, max_iter, deadline, cancel)
+        cols, S = self.cols, self.S
+        out = {'lp': None, 'bound': -np.inf, 'converged': False, 'iterations': 0}
+        # Centre de stabilisation initial : une unité de couverture vaut le quart le moins cher
+        center = np.min(self.cls_cost, axis=0)
+        for it in range(max_iter):
+            if cancel is not None and cancel.is_set():
+                break
+            lp, lam, artificial, pi, mu = self.lp(active, demand, counts)
+            out.update(lp=lp, lam=lam, solved=active, artificial=artificial, pi=pi, mu=mu,
+                       iterations=it + 1)
+            # Réservoir : le PL ne garde que les colonnes de base et les moins chères en coût
+            # réduit ; les autres y reviennent dès que leur coût réduit devient négatif
+            pool_rc = self.reduced_costs(pi, mu)
+            if len(active) > KEEP * self.rows:
+                cheap = np.argsort(pool_rc, kind='stable')[:KEEP * self.rows // 2]
+                active = np.union1d(active[lam > 1e-9], cheap)
+            back = np.setdiff1d(np.flatnonzero(pool_rc < -1e-9), active)
+            n0 = len(cols)
+            # Stabilisation (lissage de Wentges) : pricing sur un mélange des duaux du PL et
+            # du centre (duaux de la meilleure borne) ; sans colonne trouvée, duaux du PL seuls
+            alpha = smoothing
+            while True:
+                sep = alpha * center + (1 - alpha) * pi if alpha else pi
+                # Borne lagrangienne : π·demande + Σ n_c × min(0, coût réduit minimal de la classe)
+                bound = float((sep * demand).sum())
+                for c, n in enumerate(counts):
+                    if n <= 0:
+                        continue
+                    pats, values = price(self.cls_cost[c] - sep, self.cls_budget[c], self.cls_night[c])
+                    bound += n * min(0.0, values[0] if values else 0.0)
+                    r = self.cls_cost[c] - pi
+                    for pat in pats:
+                        days = np.flatnonzero(pat < S)
+                        if r[days, pat[days]].sum() - mu[c] < -1e-9:
+                            cols.add(c, pat, self.cls_cost[c])
+                if bound > out['bound']:
+                    out['bound'], center = bound, sep
+                if len(cols) > n0 or not alpha:
+                    break
+                alpha = 0.0
+            added = len(cols) - n0 + len(back)
+            active = np.concatenate([active, back, np.arange(n0, len(cols))])
+            if not added and artificial <= 1e-6:
+                out['bound'] = max(out['bound'], lp)     # PL optimal : sa valeur est la borne
+            if on_iter is not None:
+                on_iter(it, lp, out['bound'])
+            if not added or lp - out['bound'] <= tol * max(abs(lp), 1.0):
+                out['converged'] = True
+                break
+            if deadline and time.perf_counter() >= deadline:
+                break
+        out['active'] = active
+        return out
+
+    def dive(self, root, demand, counts, smoothing, deadline=None, cancel=None):
+        # Arrondi résiduel : on fixe les λ arrondis (partie entière, ou entier supérieur au-delà de
+        # ROUND_UP ; à défaut la plus grande valeur à 1), puis on reprend la génération de colonnes
+        # sur la demande et les agents restants.
+        # Renvoie le nombre d'agents par colonne, ou None (résiduel irréalisable, temps écoulé).
+        cols, res = self.cols, root
+        fixed = np.zeros(0)
+        while True:
+            if res['artificial'] > 1e-6:
+                return None
+            lam = np.zeros(len(cols))
+            lam[res['solved']] = res['lam']
+            fixed = np.pad(fixed, (0, len(cols) - len(fixed)))
+            if np.abs(lam - np.rint(lam)).max(initial=0.0) <= 1e-6:
+                return fixed + np.rint(lam)          # PL résiduel entier : terminé
+            rest = counts - np.bincount(cols.cls, fixed, minlength=len(counts))
+            take = np.floor(lam + 1e-6)
+            rest -= np.bincount(cols.cls, take, minlength=len(counts))
+            # Parties fractionnaires >= ROUND_UP arrondies au-dessus tant que la classe a des agents
+            frac = lam - take
+            for j in np.argsort(-frac, kind='stable'):
+                if frac[j] < ROUND_UP:
+                    break
+                if rest[cols.cls[j]] >= 1:
+                    take[j] += 1
+                    rest[cols.cls[j]] -= 1
+            if not take.any():
+                take[np.argmax(lam)] = 1.0
+                rest[cols.cls[np.argmax(lam)]] -= 1
+            fixed += take
+            left = np.maximum(demand.ravel() - cols.matrix() @ fixed, 0).reshape(demand.shape)
+            if not left.any():
+                return fixed
+            if (deadline and time.perf_counter() >= deadline) or (cancel is not None and cancel.is_set()):
+                return None
+            res = self.generate(left, rest, res['active'], DIVE_ITER, DIVE_TOL, smoothing, deadline, cancel)
+
+
+def solve_colgen(model: SchedulingModel, backend: Optional[str] = None,
+                 time_limit: Optional[float] = None, max_iter: int = 200, tol: float = 1e-4,
+                 smoothing: float = 0.5, threads: Optional[int] = None, progress=None, cancel=None,
+                 log: bool = True) -> Dict[str, Any]:
+    # Même format de résultat que SchedulingModel.solve (solution (E, D, S)) ;
+    # bound : borne lagrangienne (valide pour tout planning), gap : écart de la solution entière
+    # smoothing : lissage des duaux (0 = pricing sur les duaux du PL)
+    E, D, S = model.E, model.D, model.S
+    t0 = time.perf_counter()
+    timer = PhaseTimer()
+
+    def finish(res):
+        res['phases'] = timer.phases
+        if log:
+            emit(solve_record(res, model='colgen', E=E, D=D, S=S, wall=timer.wall))
+        return res
+
+    try:
+        with timer.phase('presolve'):
+            conflicts = model.presolve()
+        if conflicts:
+            res = model._infeasible(conflicts)
+            res['runtime'] = time.perf_counter() - t0
+            return finish(res)
+
+        classes = model._agent_classes()
+        labels = np.empty(E, dtype=np.int64)
+        for c, members in enumerate(classes):
+            labels[members] = c
+        counts = np.array([len(m) for m in classes], dtype=float)
+        master = _Master(model, classes)
+        cols = master.cols
+
+        # Colonnes initiales : les plannings de l'heuristique
+        with timer.phase('heuristic'):
+            h = heuristic_schedule(model.demand, model.cost, model.budget, model.prev_night)
+            first = cols.add_rosters(h['solution'], labels, master.cls_cost)
+            incumbents = [first] if h['feasible'] else []
+
+        history = []
+
+        def on_iter(it, lp, bound):
+            history.append({'iter': it, 'lp': lp, 'bound': bound, 'columns': len(cols),
+                            'elapsed': time.perf_counter() - t0})
+            if progress is not None:
+                progress(progress_info(None, bound, history[-1]['elapsed']))
+
+        # La moitié du temps au plus pour le PL, le reste pour l'arrondi et le PLNE final
+        deadline = t0 + time_limit / 2 if time_limit else None
+        with timer.phase('pricing'):
+            root = master.generate(model.demand, counts, np.arange(len(cols)), max_iter, tol,
+                                   smoothing, deadline, cancel, on_iter)
+        lp, lb = root['lp'], root['bound']
+        if lp is None:
+            return finish({'status': 'interrupted', 'message': 'Résolution annulée avant la première solution',
+                           'runtime': time.perf_counter() - t0})
+        if root['converged'] and root['artificial'] > 1e-6:
+            # Même le PL a besoin des artificielles : aucun planning ne couvre la demande
+            res = model._infeasible()
+            res['runtime'] = time.perf_counter() - t0
+            return finish(res)
+
+        # Solution entière de départ : arrondi résiduel, ou l'heuristique si elle est meilleure
+        with timer.phase('dive'):
+            dive_deadline = t0 + 0.75 * time_limit if time_limit else None
+            rounded = master.dive(root, model.demand, counts, smoothing, dive_deadline, cancel)
+            if rounded is not None:
+                incumbents.append(rounded)
+            costs = np.asarray(cols.cost)
+            incumbents = [np.pad(v, (0, len(cols) - len(v))) for v in incumbents]
+            incumbent = min(incumbents, key=lambda v: v @ costs) if incumbents else None
+            ub = float(incumbent @ costs) if incumbent is not None else np.inf
+        rows = master.rows
+        pi, mu = root['pi'], root['mu']
+
+        # Price-and-branch : PLNE sur les colonnes dont le coût réduit laisse espérer mieux
+        # que la solution de départ (au plus KEEP × lignes, les moins chères)
+        with timer.phase('build'):
+            pool_rc = master.reduced_costs(pi, mu)
+            keep = np.flatnonzero(pool_rc <= ub - lp + 1e-6)
+            if len(keep) > KEEP * rows:
+                keep = np.argsort(pool_rc, kind='stable')[:KEEP * rows]
+            if incumbent is not None:
+                keep = np.union1d(keep, np.flatnonzero(incumbent))
+            cls = np.asarray(cols.cls)[keep]
+            problem = LinearProblem("Motifs")
+            problem.add_vars(len(keep), lb=0.0, ub=counts[cls], integer=True, obj=costs[keep])
+            problem.add_block("couverture", cols.matrix()[:, keep], '>', model.demand.ravel().astype(float))
+            problem.add_constrs("classes", cls, np.arange(len(keep)), 1.0, '<', counts)
+            if incumbent is not None:
+                problem.start = incumbent[keep]
+        engine = get_backend(backend)
+        # Sans limite globale, la phase entière est bornée : les colonnes quasi identiques rendent
+        # la preuve d'optimalité du PLNE restreint longue pour un gain faible sur la solution arrondie
+        remaining = (max(1.0, time_limit - (time.perf_counter() - t0)) if time_limit
+                     else BRANCH_TIME)
+        with timer.phase('optimize'):
+            res = engine.solve(problem, time_limit=remaining, threads=threads,
+                               progress=progress, cancel=cancel)
+
+        if 'x' in res and res['obj'] <= ub + 1e-9:
+            take = np.zeros(len(cols))
+            take[keep] = np.rint(res['x'])
+            obj = float(res['obj'])
+        elif incumbent is not None and res['status'] in ('optimal', 'time_limit', 'interrupted'):
+            # Le solveur n'a pas fait mieux que la solution de départ dans le temps imparti
+            take, obj = incumbent, ub
+        else:
+            if res['status'] == 'infeasible':
+                msg = "Aucune combinaison entière des motifs générés ne couvre la demande"
+            else:
+                msg = res.get('message', f"{engine.name} : {res['status']}")
+            return finish({'status': 'interrupted' if res['status'] == 'interrupted' else 'error',
+                           'message': msg, 'bound': lb, 'runtime': time.perf_counter() - t0})
+
+        with timer.phase('extract'):
+            sol, _ = cols.expand(take, classes, E)
+        # Price-and-branch est une heuristique : optimal seulement si la borne le prouve
+        gap = max(0.0, obj - lb) / max(abs(obj), 1e-10)
+        if res['status'] == 'interrupted':
+            status = 'interrupted'
+        else:
+            status = 'optimal' if gap <= tol else 'feasible'
+        out = {'status': status, 'obj': obj, 'bound': lb, 'gap': gap,
+               'solution': sol, 'runtime': time.perf_counter() - t0,
+               'formulation': 'patterns', 'backend': engine.name, 'size': problem.size(),
+               'columns': len(cols), 'iterations': root['iterations'], 'history': history}
+        if status == 'interrupted':
+            out['message'] = 'Résolution annulée : meilleure solution trouvée'
+        elif status == 'feasible':
+            out['message'] = f"Solution réalisable, écart à la borne {100 * gap:.2f} %"
+        return finish(out)
+
+    except Exception as ex:
+        return finish({'status': 'error', 'message': str(ex)})
@@ -1,40 +1,146 @@
 # controller.py 
 from PyQt5 import QtCore
-from model import SchedulingModel
+import threading
+import numpy as np
+from model import SchedulingModel, SchedulingSession
+from rolling import solve_rolling
+from cache import SolutionCache
+from backends import get_backend
+from sweep import sweep_staffing
+from instrumentation import PhaseTimer, emit, solve_record
 import traceback
 
 class SolverWorker(QtCore.QThread):
-    finished = QtCore.pyqtSignal(dict)
+    # object : le dict (et son ndarray) traverse la frontière de thread sans conversion ni copie
+    finished = QtCore.pyqtSignal(object)
+    progress = QtCore.pyqtSignal(object)   # {'obj', 'bound', 'gap', 'elapsed'}, limité à ~4/s
 
-    def __init__(self, params, time_limit=60):
+    def __init__(self, params, time_limit=60, session=None, cache=None):
         super().__init__()
         self.params = params
         self.time_limit = time_limit
+        self.session = session
+        self.cache = cache
+        self.cancel = threading.Event()
 
     def run(self):
         try:
-            model = SchedulingModel(**self.params)
-            res = model.solve(time_limit=self.time_limit)
+            params = dict(self.params)
+            backend = params.pop('backend', None)
+            window = params.pop('rolling', None)
+            model = SchedulingModel(**params)
+            # backend=None reste transmis tel quel : repli sur HiGHS si la licence Gurobi refuse
+            key = (self.cache.key(model, get_backend(backend).name)
+                   if self.cache is not None and not window else None)
+            res = self.cache.get(key) if key else None
+            # Journal écrit par le contrôleur, une fois le résultat mis en forme
+            live = {'progress': self.progress.emit, 'cancel': self.cancel, 'log': False}
+            if window:
+                res = solve_rolling(model, window=window, backend=backend,
+                                    time_limit=self.time_limit, **live)
+            elif res is not None:
+                res['cached'] = True
+            elif self.session is not None:
+                res = self.session.solve(model.demand, model.max_shifts, model.cost,
+                                         time_limit=self.time_limit, **live)
+            else:
+                res = model.solve(time_limit=self.time_limit, backend=backend, **live)
+            if key and not res.get('cached'):
+                self.cache.put(key, res)
             self.finished.emit(res)
         except Exception as e:
             self.finished.emit({'status': 'error', 'message': traceback.format_exc()})
 
 
+class SweepWorker(QtCore.QThread):
+    finished = QtCore.pyqtSignal(object)
+
+    def __init__(self, params, time_limit=30):
+        super().__init__()
+        self.params = params
+        self.time_limit = time_limit
+
+    def run(self):
+        try:
+            self.finished.emit(sweep_staffing(time_limit=self.time_limit, **self.params))
+        except Exception:
+            self.finished.emit({'status': 'error', 'message': traceback.format_exc()})
+
+
 class SchedulerController:
     def __init__(self, view):
         self.view = view
         self.view.solve_requested.connect(self.on_solve_requested)
+        self.view.sweep_requested.connect(self.on_sweep_requested)
+        self.view.cancel_requested.connect(self.on_cancel_requested)
         self._worker = None
+        self._sweep_worker = None
+        self._sessions = {}   # (E, D, S) → SchedulingSession, réutilisée entre deux clics
+        self._cache = SolutionCache()
+
+    def _session_for(self, params):
+        # Sessions persistantes : Gurobi uniquement (HiGHS repart de zéro à chaque appel)
+        if params.get('backend') != 'gurobi' or params.get('rolling'):
+            return None
+        key = (params['E'], params['D'], params['S'])
+        if key not in self._sessions:
+            self._sessions[key] = SchedulingSession(*key)
+        return self._sessions[key]
 
     def on_solve_requested(self, params):
-        self.view.set_status("Résolution en cours avec Gurobi...")
-        self.view.show_result("Gurobi optimise le planning...", sol=None)
-        self._worker = SolverWorker(params)
+        engine = get_backend(params.get('backend')).label
+        self.view.set_status(f"Résolution en cours avec {engine}...")
+        # Planning heuristique immédiat, remplacé par l'optimum dès qu'il arrive
+        quick = self._quick_roster(params)
+        if quick is not None:
+            txt = (f"{engine} optimise le planning... (en attendant : solution heuristique)\n\n"
+                   + self._format_solution(quick['solution'], quick['obj'], quick['runtime'],
+                                           title="Solution heuristique"))
+            self.view.show_result(txt, quick['solution'])
+        else:
+            self.view.show_result(f"{engine} optimise le planning...", sol=None)
+        self._worker = SolverWorker(params, session=self._session_for(params), cache=self._cache)
         self._worker.finished.connect(self.on_finished)
+        self._worker.progress.connect(self.on_progress)
+        self.view.set_running(True)
         self._worker.start()
 
+    def on_progress(self, info):
+        parts = [f"{info['elapsed']:.1f} s"]
+        if info['obj'] is not None:
+            parts.append(f"meilleur coût {info['obj']:.2f}")
+        if info['bound'] is not None:
+            parts.append(f"borne {info['bound']:.2f}")
+        if info['gap'] is not None:
+            parts.append(f"écart {100 * info['gap']:.2f} %")
+        self.view.set_status("Optimisation : " + " – ".join(parts))
+
+    def on_cancel_requested(self):
+        if self._worker is not None and self._worker.isRunning():
+            self._worker.cancel.set()
+            self.view.set_status("Annulation en cours...")
+
+    def _quick_roster(self, params):
+        p = {k: v for k, v in params.items() if k not in ('backend', 'rolling')}
+        try:
+            res = SchedulingModel(**p).solve_heuristic()
+        except Exception:
+            return None
+        return res if res['status'] == 'heuristic' else None
+
     def on_finished(self, result):
+        timer = PhaseTimer()
+        timer.merge(result.get('phases'))
+        with timer.phase('format'):
+            self._show_result(result)
+        params = self._worker.params if self._worker is not None else {}
+        emit(solve_record(dict(result, phases=timer.phases), source='gui',
+                          model='rolling' if result.get('formulation') == 'rolling' else 'scheduling',
+                          E=params.get('E'), D=params.get('D'), S=params.get('S')))
+
+    def _show_result(self, result):
         status = result.get('status')
+        self.view.set_running(False)
 
         if status == 'optimal':
             obj = result['obj']
@@ -46,33 +152,103 @@ class SchedulerController:
             self.view.show_result(txt, sol)
 
             # Statut en vert avec le temps
-            self.view.set_status(f"Solution optimale trouvée en {runtime:.3f} s")
+            mode = (" (cache)" if result.get('cached')
+                    else " (ré-optimisation)" if result.get('incremental') else "")
+            if result.get('fallback'):
+                mode += f" – {result['fallback']}"
+            self.view.set_status(f"Solution optimale trouvée en {runtime:.3f} s{mode}"
+                                 f" – {self._cache.stats_text()}")
+
+        elif status == 'feasible':
+            # Horizon glissant : chaque fenêtre est optimale, pas le planning complet
+            runtime = result.get('runtime', 0.0)
+            txt = self._format_solution(result['solution'], result['obj'], runtime,
+                                        title="Solution réalisable")
+            self.view.show_result(txt, result['solution'])
+            gap = (f", écart à la borne {100 * result['gap']:.2f} %"
+                   if result.get('gap') is not None else "")
+            self.view.set_status(f"Solution réalisable (horizon glissant, {result['windows']} fenêtres)"
+                                 f" trouvée en {runtime:.3f} s{gap} – {self._cache.stats_text()}")
+
+        elif status == 'interrupted' and result.get('solution') is not None:
+            txt = self._format_solution(result['solution'], result['obj'], result.get('runtime', 0.0),
+                                        title="Solution (annulée, meilleure trouvée)")
+            self.view.show_result(txt, result['solution'])
+            self.view.set_status(f"Annulé – meilleure solution : coût {result['obj']:.2f}")
+
+        elif status == 'time_limit' and result.get('solution') is not None:
+            txt = self._format_solution(result['solution'], result['obj'], result.get('runtime', 0.0),
+                                        title="Solution (limite de temps, meilleure trouvée)")
+            self.view.show_result(txt, result['solution'])
+            gap = f" (écart {100 * result['gap']:.2f} %)" if result.get('gap') is not None else ""
+            if result.get('formulation') == 'rolling':
+                gap += (f" – horizon glissant, {result['time_limited']} fenêtre(s) sur "
+                        f"{result['windows']} arrêtée(s) par la limite")
+            if result.get('fallback'):
+                gap += f" – {result['fallback']}"
+            self.view.set_status(f"Limite de temps – meilleure solution : coût {result['obj']:.2f}{gap}")
+
+        elif status == 'interrupted':
+            self.view.show_result(result.get('message', 'Résolution annulée'))
+            self.view.set_status("Annulé")
 
         elif status == 'infeasible':
             msg = result.get('message', 'Modèle infaisable sans explication.')
             self.view.show_result("INFASIBLE\n\n" + msg)
-            self.view.set_status("Infaisable – Ajustez les paramètres")
+            self.view.set_status(f"Infaisable – Ajustez les paramètres – {self._cache.stats_text()}")
 
         else:
             msg = result.get('message', 'Erreur inconnue')
             self.view.show_result("ERREUR :\n" + msg)
             self.view.set_status("Erreur lors de la résolution")
 
-    def _format_solution(self, sol, obj, runtime):
-        E, D, S = len(sol), len(sol[0]), len(sol[0][0])
+    def on_sweep_requested(self, params):
+        self.view.show_result("Recherche de l'effectif minimal...", sol=None)
+        self._sweep_worker = SweepWorker(params)
+        self._sweep_worker.finished.connect(self.on_sweep_finished)
+        self._sweep_worker.start()
+
+    def on_sweep_finished(self, result):
+        if result.get('status') not in ('optimal', 'time_limit'):
+            self.view.show_result("ERREUR :\n" + result.get('message', 'Erreur inconnue'))
+            self.view.set_status("Erreur lors du balayage")
+            return
+        lines = [f"Balayage : {result['solves']} résolutions en {result['runtime']:.1f} s",
+                 f"Coût fixe : {result['agent_cost']:.2f} € par agent", "=" * 65, ""]
+        if result.get('message'):
+            lines[2:2] = [result['message']]
+        for ms, E in sorted(result['min_agents'].items()):
+            if ms in result['unresolved']:
+                lines.append(f"Max {ms} quarts/agent → {E} agents suffisent (minimum non prouvé)")
+            else:
+                lines.append(f"Max {ms} quarts/agent → au moins {E} agents")
+            for p in result['points']:
+                if p['max_shifts'] == ms and p['E'] >= E and 'total' in p:
+                    lines.append(f"   {p['E']} agents : quarts {p['obj']:.2f} €, total {p['total']:.2f} €")
+            lines.append("")
+        self.view.show_result("\n".join(lines))
+        self.view.show_frontier(result)
+        best = min(result['min_agents'].values())
+        if result['status'] == 'optimal':
+            self.view.set_status(f"Balayage terminé : {best} agents au minimum")
+        else:
+            self.view.set_status(f"Balayage incomplet : {best} agents suffisent (minimum non prouvé)")
+
+    def _format_solution(self, sol, obj, runtime, title="Solution optimale"):
+        # sol : ndarray uint8 (E, D, S) ; une seule passe sur les affectations non nulles
         lines = [
             f"Coût total = {obj:.2f} €",
-            f"Solution optimale trouvée en {runtime:.3f} seconde(s)",
+            f"{title} trouvée en {runtime:.3f} seconde(s)",
             "=" * 65,
             ""
         ]
-        for e in range(E):
-            shifts = sum(sum(day) for day in sol[e])
-            if shifts > 0:
-                lines.append(f"Agent {e+1} → {shifts} quarts")
-                for d in range(D):
-                    assigned = [s+1 for s in range(S) if sol[e][d][s]]
-                    if assigned:
-                        lines.append(f"   Jour {d+1} : quart(s) {', '.join(map(str, assigned))}")
-                lines.append("")
+        loads = sol.sum(axis=(1, 2))
+        ee, dd, ss = np.nonzero(sol)
+        bounds = np.searchsorted(ee, np.arange(sol.shape[0] + 1))
+        for e in np.flatnonzero(loads):
+            lines.append(f"Agent {e+1} → {loads[e]} quarts")
+            lo, hi = bounds[e], bounds[e + 1]
+            for d, s in zip(dd[lo:hi], ss[lo:hi]):
+                lines.append(f"   Jour {d+1} : quart(s) {s+1}")
+            lines.append("")
         return "\n".join(lines)
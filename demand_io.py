@@ -0,0 +1,197 @@
+# demand_io.py – lecture des fichiers de demande
+#  - matrice simple (D lignes × S quarts) : load_demand_csv / save_demand_csv ;
+#  - prévisions par site et par intervalle (CSV « site,date,time,demand ») lues par blocs typés,
+#    ou format colonnaire binaire (.npy + .json) lu en mmap : load_demand agrège en (D, S).
+import json
+import os
+from typing import Dict, Iterator, List, Optional, Sequence
+import numpy as np
+
+
+def load_demand_csv(path: str) -> np.ndarray:
+    # Fichier au format de sample_demand.csv : une ligne par jour, un entier par quart
+    demand = np.loadtxt(path, delimiter=",", dtype=np.int64, ndmin=2)
+    if (demand < 0).any():
+        raise ValueError(f"{path} : demande négative")
+    return demand
+
+
+def save_demand_csv(path: str, demand) -> None:
+    np.savetxt(path, np.asarray(demand, dtype=np.int64), fmt="%d", delimiter=",")
+
+
+# --- Prévisions par intervalle ---
+# Une ligne par site, jour et intervalle : S01,2026-01-05,06:30,12 (agents requis sur l'intervalle)
+# Heure 'HH:MM' ; 'H:MM' et 'HH:MM:SS' sont acceptées (secondes ignorées)
+INTERVAL_DTYPE = np.dtype([('site', 'U16'), ('date', 'datetime64[D]'), ('time', 'U8'), ('demand', 'f8')])
+# Colonnes compactes, triées par (site, jour, minute) dans le format colonnaire
+COLUMNAR_DTYPE = np.dtype([('site', 'u2'), ('day', 'i4'), ('minute', 'u2'), ('demand', 'f4')])
+
+
+def _parse_time(text: str) -> int:
+    parts = text.strip().split(":")
+    if (len(parts) not in (2, 3) or not all(p.isdigit() and len(p) <= 2 for p in parts)
+            or int(parts[0]) >= 24 or any(int(p) >= 60 for p in parts[1:])):
+        raise ValueError(f"heure invalide : {text!r} (HH:MM de 00:00 à 23:59 attendu)")
+    return int(parts[0]) * 60 + int(parts[1])
+
+
+def _minutes(times: np.ndarray) -> np.ndarray:
+    # 'HH:MM' → minutes depuis minuit, sans boucle Python (codes UCS-4 des chiffres) ;
+    # les autres formes ('9:30', '09:30:00', erreurs) passent par _parse_time, une fois par valeur
+    times = np.ascontiguousarray(times)
+    c = times.view(np.uint32).reshape(len(times), times.dtype.itemsize // 4).astype(np.int32) - 48
+    digits = (c[:, [0, 1, 3, 4]] >= 0) & (c[:, [0, 1, 3, 4]] <= 9)
+    n = np.char.str_len(times)
+    hours = c[:, 0] * 10 + c[:, 1]
+    fast = digits.all(axis=1) & (c[:, 2] == ord(":") - 48) & (n == 5) & (hours < 24) & (c[:, 3] <= 5)
+    minutes = hours * 60 + c[:, 3] * 10 + c[:, 4]
+    if not fast.all():
+        other, inv = np.unique(times[~fast], return_inverse=True)
+        minutes[~fast] = np.array([_parse_time(str(t)) for t in other], dtype=np.int32)[inv.ravel()]
+    return minutes
+
+
+def _day(date) -> int:
+    return int(np.datetime64(date, 'D').astype(np.int64))
+
+
+def iter_interval_csv(path: str, chunk_rows: int = 250_000) -> Iterator[np.ndarray]:
+    # Lecture par blocs typés (np.loadtxt en C) : la mémoire reste bornée à chunk_rows lignes
+    with open(path, encoding="utf-8") as f:
+        header = f.readline().strip().lower().replace(" ", "").split(",")
+        if header != list(INTERVAL_DTYPE.names):
+            raise ValueError(f"{path} : en-tête attendu {','.join(INTERVAL_DTYPE.names)}")
+        while True:
+            chunk = np.loadtxt(f, delimiter=",", dtype=INTERVAL_DTYPE, max_rows=chunk_rows, ndmin=1)
+            if not len(chunk):
+                return
+            yield chunk
+            if len(chunk) < chunk_rows:
+                return
+
+
+def _read_csv_columns(path, sites, first, last, chunk_rows):
+    # Blocs CSV → colonnes compactes filtrées (sites, jours [first, last]) ; codes de site globaux
+    code: Dict[str, int] = {}
+    parts = []
+    for chunk in iter_interval_csv(path, chunk_rows):
+        # Les fichiers sont groupés par site : np.unique sur les seules têtes de séries
+        site = chunk['site']
+        heads = np.flatnonzero(np.concatenate([[True], site[1:] != site[:-1]]))
+        uniq, head_inv = np.unique(site[heads], return_inverse=True)
+        inv = np.repeat(head_inv, np.diff(np.append(heads, len(site))))
+        remap = np.array([code.setdefault(str(s), len(code)) for s in uniq], dtype=np.int64)
+        cols = np.empty(len(chunk), dtype=COLUMNAR_DTYPE)
+        cols['site'] = remap[inv]
+        cols['day'] = chunk['date'].astype(np.int64)
+        cols['minute'] = _minutes(chunk['time'])
+        cols['demand'] = chunk['demand']
+        keep = np.ones(len(cols), dtype=bool)
+        if sites is not None:
+            keep &= np.isin(uniq, list(sites))[inv]
+        if first is not None:
+            keep &= cols['day'] >= first
+        if last is not None:
+            keep &= cols['day'] <= last
+        parts.append(cols[keep])
+    cols = np.concatenate(parts) if parts else np.empty(0, dtype=COLUMNAR_DTYPE)
+    return cols, list(code)
+
+
+def convert_to_columnar(csv_path: str, out_path: str, chunk_rows: int = 250_000) -> str:
+    # CSV par intervalle → out_path (.npy, lisible en mmap) + out_path.json (sites, index par site)
+    cols, names = _read_csv_columns(csv_path, None, None, None, chunk_rows)
+    # Sites numérotés dans l'ordre alphabétique, puis tri (site, jour, minute)
+    order = np.argsort(names)
+    rank = np.empty(len(names), dtype=np.int64)
+    rank[order] = np.arange(len(names))
+    cols['site'] = rank[cols['site']]
+    cols = cols[np.lexsort((cols['minute'], cols['day'], cols['site']))]
+    if not out_path.endswith(".npy"):
+        out_path += ".npy"
+    np.save(out_path, cols)
+    offsets = np.searchsorted(cols['site'], np.arange(len(names) + 1))
+    with open(out_path + ".json", "w", encoding="utf-8") as f:
+        json.dump({'sites': [names[i] for i in order], 'offsets': offsets.tolist(),
+                   'days': [int(cols['day'].min(initial=0)), int(cols['day'].max(initial=0))]}, f)
+    return out_path
+
+
+def _read_columnar(path, sites, first, last):
+    # mmap : seules les lignes des sites et jours demandés sont lues sur disque
+    with open(path + ".json", encoding="utf-8") as f:
+        meta = json.load(f)
+    data = np.load(path, mmap_mode="r")
+    names = meta['sites']
+    wanted = range(len(names)) if sites is None else [names.index(s) for s in sites if s in names]
+    parts = []
+    for k in wanted:
+        block = data[meta['offsets'][k]:meta['offsets'][k + 1]]
+        lo = 0 if first is None else np.searchsorted(block['day'], first, side='left')
+        hi = len(block) if last is None else np.searchsorted(block['day'], last, side='right')
+        parts.append(np.array(block[lo:hi]))
+    cols = np.concatenate(parts) if parts else np.empty(0, dtype=COLUMNAR_DTYPE)
+    return cols, names
+
+
+def aggregate(cols: np.ndarray, n_sites: int, first: int, D: int, S: int,
+              day_start: float = 6.0, how: str = 'max') -> np.ndarray:
+    # Intervalles → (sites, D, S) : S quarts égaux de 24/S heures à partir de day_start ;
+    # les intervalles avant day_start appartiennent à la nuit du jour précédent.
+    # how : 'max' (pic de l'intervalle le plus chargé, par défaut), 'mean' ou 'sum' ; arrondi supérieur.
+    rel = cols['minute'].astype(np.int64) - int(round(day_start * 60))
+    day = cols['day'].astype(np.int64) - first + np.floor_divide(rel, 1440)
+    shift = np.mod(rel, 1440) * S // 1440
+    keep = (day >= 0) & (day < D)
+    idx = (cols['site'][keep].astype(np.int64), day[keep], shift[keep])
+    values = cols['demand'][keep].astype(float)
+    out = np.zeros((n_sites, D, S))
+    if how == 'max':
+        np.maximum.at(out, idx, values)
+    elif how in ('sum', 'mean'):
+        np.add.at(out, idx, values)
+        if how == 'mean':
+            count = np.zeros((n_sites, D, S))
+            np.add.at(count, idx, 1.0)
+            out = np.divide(out, count, out=np.zeros_like(out), where=count > 0)
+    else:
+        raise ValueError(f"agrégation inconnue : {how!r} (max, mean, sum)")
+    return np.ceil(out - 1e-9).astype(np.int64)
+
+
+def load_demand(path: str, S: int = 3, sites: Optional[Sequence[str]] = None,
+                start=None, days: Optional[int] = None, day_start: float = 6.0, how: str = 'max',
+                chunk_rows: int = 250_000) -> Dict[str, np.ndarray]:
+    # {site: demande (D, S)} pour SchedulingModel. start ('2026-01-05') et days restreignent
+    # la période ; sans start, la période couvre tout le fichier (pour les sites retenus).
+    first = None if start is None else _day(start)
+    # Un jour de plus en lecture : la fin de nuit du dernier jour tombe le lendemain matin
+    last = None if first is None or days is None else first + days
+    if path.endswith(".npy"):
+        cols, names = _read_columnar(path, sites, first, last)
+    else:
+        cols, names = _read_csv_columns(path, sites, first, last, chunk_rows)
+    if not len(cols):
+        return {}
+    if first is None:
+        first = int(cols['day'].min())
+    D = days if days is not None else int(cols['day'].max()) - first + 1
+    demand = aggregate(cols, len(names), first, D, S, day_start, how)
+    present = np.unique(cols['site'])
+    return {names[k]: demand[k] for k in present}
+
+
+def list_sites(path: str) -> List[str]:
+    if path.endswith(".npy"):
+        with open(path + ".json", encoding="utf-8") as f:
+            return json.load(f)['sites']
+    return sorted({str(s) for chunk in iter_interval_csv(path) for s in np.unique(chunk['site'])})
+
+
+def is_interval_file(path: str) -> bool:
+    # Fichier par intervalle (en-tête site,date,...) ou colonnaire, par opposition à la matrice D × S
+    if path.endswith(".npy"):
+        return os.path.exists(path + ".json")
+    with open(path, encoding="utf-8") as f:
+        return f.readline().strip().lower().startswith("site")
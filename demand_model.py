@@ -0,0 +1,110 @@
+# demand_model.py – modèle Qt de la grille de demande, adossé à un tableau numpy (D × S)
+# Le total est tenu à jour cellule par cellule ; collage et chargement en bloc n'émettent
+# qu'une seule notification.
+import numpy as np
+from PyQt5 import QtCore
+
+Qt = QtCore.Qt
+
+
+class DemandTableModel(QtCore.QAbstractTableModel):
+    total_changed = QtCore.pyqtSignal(int)
+
+    def __init__(self, demand=None, parent=None):
+        super().__init__(parent)
+        self._demand = np.zeros((0, 0), dtype=np.int64)
+        self._total = 0
+        if demand is not None:
+            self.set_demand(demand)
+
+    # --- accès ---
+    @property
+    def total(self) -> int:
+        return self._total
+
+    def demand(self) -> np.ndarray:
+        return self._demand.copy()
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else self._demand.shape[0]
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else self._demand.shape[1]
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            return int(self._demand[index.row(), index.column()])
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        return f"Quart {section+1}" if orientation == Qt.Horizontal else f"Jour {section+1}"
+
+    def flags(self, index):
+        return Qt.ItemIsSelectable | Qt.ItemIsEnabled | Qt.ItemIsEditable
+
+    # --- modifications ---
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or role != Qt.EditRole:
+            return False
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            return False
+        if value < 0:
+            return False
+        d, s = index.row(), index.column()
+        old = int(self._demand[d, s])
+        if value == old:
+            return True
+        self._demand[d, s] = value
+        self._total += value - old
+        self.dataChanged.emit(index, index, [Qt.DisplayRole, Qt.EditRole])
+        self.total_changed.emit(self._total)
+        return True
+
+    def set_demand(self, demand):
+        # Remplacement complet (chargement CSV, reconstruction) : une seule réinitialisation
+        demand = np.array(demand, dtype=np.int64, ndmin=2)
+        if (demand < 0).any():
+            raise ValueError("demande négative")
+        self.beginResetModel()
+        self._demand = demand
+        self._total = int(demand.sum())
+        self.endResetModel()
+        self.total_changed.emit(self._total)
+
+    def paste_block(self, row: int, col: int, block) -> int:
+        # Copie un bloc à partir de (row, col), tronqué aux bords ; renvoie le nombre de cellules
+        block = np.array(block, dtype=np.int64, ndmin=2)
+        if (block < 0).any():
+            raise ValueError("demande négative")
+        D, S = self._demand.shape
+        h, w = min(block.shape[0], D - row), min(block.shape[1], S - col)
+        if h <= 0 or w <= 0:
+            return 0
+        target = self._demand[row:row + h, col:col + w]
+        self._total += int(block[:h, :w].sum() - target.sum())
+        target[...] = block[:h, :w]
+        self.dataChanged.emit(self.index(row, col), self.index(row + h - 1, col + w - 1),
+                              [Qt.DisplayRole, Qt.EditRole])
+        self.total_changed.emit(self._total)
+        return h * w
+
+
+def parse_block(text: str) -> np.ndarray:
+    # Texte du presse-papiers (tableur : tabulations ; CSV : virgules ou points-virgules)
+    rows = [line.replace(";", "\t").replace(",", "\t").split("\t")
+            for line in text.strip("\r\n").splitlines()]
+    width = max((len(r) for r in rows), default=0)
+    block = np.zeros((len(rows), width), dtype=np.int64)
+    for i, r in enumerate(rows):
+        for j, cell in enumerate(r):
+            cell = cell.strip()
+            block[i, j] = int(cell) if cell else 0
+    return block
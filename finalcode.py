@@ -1,8 +1,70 @@
 import sys
+import queue
+import threading
+import traceback
+import numpy as np
 from PyQt5.QtWidgets import *
-from PyQt5.QtCore import Qt
-import gurobipy as gp
-from gurobipy import GRB
+from PyQt5.QtCore import Qt, QThread, pyqtSignal
+from PyQt5.QtGui import QColor
+from nova_model import NovaModel
+from backends import available_backends
+from gantt import GanttView, schedule_arrays, COLORS
+
+
+class NovaWorker(QThread):
+    # File de journées à optimiser, traitées une par une hors du thread de l'interface
+    # job : {'label', 'projects', 'teams', 'backend', 'time_limit'}
+    job_started = pyqtSignal(object)
+    finished = pyqtSignal(object, object)   # (job, résultat de NovaModel.solve)
+    progress = pyqtSignal(object)           # {'obj', 'bound', 'gap', 'elapsed'}
+
+    def __init__(self):
+        super().__init__()
+        self.jobs = queue.Queue()
+        # Annule la journée en cours, ou la prochaine si le clic tombe entre deux journées ;
+        # remis à zéro une fois cette journée traitée
+        self.cancel = threading.Event()
+        self._lock = threading.Lock()
+        self._outstanding = 0               # journées soumises et pas encore terminées
+
+    def submit(self, job) -> bool:
+        # Renvoie True si une journée était déjà soumise (celle-ci attend son tour)
+        with self._lock:
+            queued = self._outstanding > 0
+            self._outstanding += 1
+        self.jobs.put(job)
+        if not self.isRunning():
+            self.start()
+        return queued
+
+    def busy(self) -> bool:
+        with self._lock:
+            return self._outstanding > 0
+
+    def pending(self) -> int:
+        return self.jobs.qsize()
+
+    def stop(self):
+        self.cancel.set()
+        self.jobs.put(None)
+        self.wait()
+
+    def run(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+            self.job_started.emit(job)
+            try:
+                model = NovaModel(job['projects'], len(job['teams']))
+                res = model.solve(backend=job['backend'], time_limit=job['time_limit'],
+                                  progress=self.progress.emit, cancel=self.cancel)
+            except Exception:
+                res = {'status': 'error', 'message': traceback.format_exc()}
+            self.cancel.clear()
+            with self._lock:
+                self._outstanding -= 1
+            self.finished.emit(job, res)
 
 
 class AtelierNOVA(QWidget):
@@ -21,6 +83,12 @@ class AtelierNOVA(QWidget):
         }
         self.teams = [f"Équipe {i+1}" for i in range(self.config["nb_teams"])]
         self.projects = {}
+        self.jobs_submitted = 0
+        self.running = None
+        self.worker = NovaWorker()
+        self.worker.job_started.connect(self.on_job_started)
+        self.worker.progress.connect(self.on_progress)
+        self.worker.finished.connect(self.on_finished)
 
         self.init_ui()
 
@@ -75,10 +143,19 @@ class AtelierNOVA(QWidget):
         for i, (txt, spin) in enumerate(zip(labels, self.spins)):
             grid.addWidget(QLabel(f"<b>{txt} :</b>"), i, 0)
             grid.addWidget(spin, i, 1)
+        self.backend_combo = QComboBox()
+        self.backend_combo.addItems(available_backends())
+        self.backend_combo.setStyleSheet("font-size:16px; padding:10px;")
+        grid.addWidget(QLabel("<b>Solveur :</b>"), len(labels), 0)
+        grid.addWidget(self.backend_combo, len(labels), 1)
+        self.time_limit_spin = QSpinBox(value=60, minimum=1, maximum=3600, suffix=" s")
+        self.time_limit_spin.setStyleSheet("font-size:16px; padding:10px;")
+        grid.addWidget(QLabel("<b>Temps limite :</b>"), len(labels) + 1, 0)
+        grid.addWidget(self.time_limit_spin, len(labels) + 1, 1)
         btn_apply = QPushButton("Appliquer")
         btn_apply.setStyleSheet("background:#238636; color:white; padding:12px 30px; border-radius:12px; font-size:16px;")
         btn_apply.clicked.connect(self.apply_config)
-        grid.addWidget(btn_apply, 5, 1, Qt.AlignRight)
+        grid.addWidget(btn_apply, len(labels) + 2, 1, Qt.AlignRight)
         config.setLayout(grid)
         left.addWidget(config)
 
@@ -92,23 +169,45 @@ class AtelierNOVA(QWidget):
             b.clicked.connect(func)
             btns.addWidget(b)
         left.addLayout(btns)
+
+        # Progression de l'optimisation + annulation
+        run = QHBoxLayout()
+        self.progress_label = QLabel("")
+        self.progress_label.setStyleSheet("font-size:16px; color:#79c0ff;")
+        self.btn_cancel = QPushButton("Annuler")
+        self.btn_cancel.setStyleSheet("background:#da3633; color:white; padding:12px 30px; border-radius:12px; font-size:16px;")
+        self.btn_cancel.setEnabled(False)
+        self.btn_cancel.clicked.connect(self.worker.cancel.set)
+        run.addWidget(self.progress_label, 1)
+        run.addWidget(self.btn_cancel)
+        left.addLayout(run)
         left.addStretch()
 
         left_widget = QWidget()
         left_widget.setLayout(left)
         left_widget.setMaximumWidth(int(self.width() * 0.38))
 
-        # === COLONNE DROITE : Résultats avec scroll ===
+        # === COLONNE DROITE : journal, Gantt peint et récapitulatif ===
         self.result = QTextEdit()
         self.result.setReadOnly(True)
         self.result.setStyleSheet("background:#161b22; border-radius:18px; padding:30px; font-family: Consolas; font-size:16px; line-height:2; border: 3px solid #30363d;")
 
-        scroll = QScrollArea()
-        scroll.setWidgetResizable(True)
-        scroll.setWidget(self.result)
+        self.gantt = GanttView()
+        self.recap = QTableWidget(0, 6)
+        self.recap.setHorizontalHeaderLabels(["Projet", "Tâche", "Équipe", "Début", "Fin", "Durée"])
+        self.recap.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.recap.verticalHeader().setVisible(False)
+        self.recap.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.recap.setStyleSheet("background:#161b22; font-size:15px; border: 3px solid #30363d; border-radius:18px;")
+
+        right = QSplitter(Qt.Vertical)
+        right.addWidget(self.result)
+        right.addWidget(self.gantt)
+        right.addWidget(self.recap)
+        right.setSizes([300, 450, 250])
 
         main_layout.addWidget(left_widget, 1)
-        main_layout.addWidget(scroll, 2)
+        main_layout.addWidget(right, 2)
         self.setLayout(main_layout)
 
         self.log("Atelier NOVA prêt – interface adaptée à votre écran")
@@ -131,6 +230,8 @@ class AtelierNOVA(QWidget):
     def clear_all(self):
         self.projects.clear()
         self.result.clear()
+        self.gantt.clear()
+        self.recap.setRowCount(0)
         self.log("Nouvelle journée démarrée.")
 
     def add_project(self):
@@ -204,96 +305,77 @@ class AtelierNOVA(QWidget):
             """)
             return
 
-        self.log("<h2 style='color:#00ff88;'>Optimisation en cours...</h2>")
-        try:
-            m = gp.Model("NOVA")
-            m.Params.OutputFlag = 0
-
-            S, X = {}, {}
-            for proj, tasks in self.projects.items():
-                for t in range(len(tasks)):
-                    S[(proj, t)] = m.addVar(lb=0)
-                    for team in range(self.config["nb_teams"]):
-                        X[(proj, t, team)] = m.addVar(vtype=GRB.BINARY)
-
-            Cmax = m.addVar()
-            bigM = 1e6
-            first_proj = next(iter(self.projects))
-            S[(first_proj, 0)].LB = S[(first_proj, 0)].UB = 0
-
-            for proj, tasks in self.projects.items():
-                for t in range(len(tasks)):
-                    m.addConstr(gp.quicksum(X[(proj, t, team)] for team in range(self.config["nb_teams"])) == 1)
-                for t in range(1, len(tasks)):
-                    m.addConstr(S[(proj, t)] >= S[(proj, t-1)] + tasks[t-1])
-                m.addConstr(Cmax >= S[(proj, len(tasks)-1)] + tasks[-1])
-
-            for team in range(self.config["nb_teams"]):
-                ops = [(p, t) for p, ts in self.projects.items() for t in range(len(ts))]
-                for i in range(len(ops)):
-                    for j in range(i+1, len(ops)):
-                        a, b = ops[i], ops[j]
-                        y = m.addVar(vtype=GRB.BINARY)
-                        da = self.projects[a[0]][a[1]]
-                        db = self.projects[b[0]][b[1]]
-                        m.addConstr(S[b] >= S[a] + da - bigM * (3 - X[(a[0],a[1],team)] - X[(b[0],b[1],team)] - (1-y)))
-                        m.addConstr(S[a] >= S[b] + db - bigM * (3 - X[(a[0],a[1],team)] - X[(b[0],b[1],team)] - y))
-
-            m.setObjective(Cmax, GRB.MINIMIZE)
-            m.optimize()
-
-            if m.status == GRB.OPTIMAL:
-                self.display_final_result(S, X, Cmax.X)
-            else:
-                self.log("<h2 style='color:#ff4444;'>Pas de solution optimale trouvée</h2>")
-
-        except Exception as e:
-            QMessageBox.critical(self, "Erreur", str(e))
-
-    def display_final_result(self, S, X, makespan):
-        colors = ["#f7768e","#ff9e64","#e0af68","#9ece6a","#73daca","#7aa2f7","#bb9af7","#c0caf5"]
-
-        recap = "<h2 style='color:#58a6ff; font-size:30px;'>Récapitulatif des Tâches</h2>"
-        recap += "<table style='width:100%; border-collapse:collapse; font-size:18px; background:#161b22;'><tr style='background:#21262d; height:60px;'><th>Projet</th><th>Tâche</th><th>Équipe</th><th>Début</th><th>Fin</th><th>Durée</th></tr>"
-        for (proj, t), v in S.items():
-            start = v.X
-            dur = self.projects[proj][t]
-            end = start + dur
-            team_idx = next(i for i in range(self.config["nb_teams"]) if X.get((proj, t, i), None) and X[(proj, t, i)].X > 0.5)
-            team = self.teams[team_idx]
-            color = colors[hash(proj) % len(colors)]
-            recap += f"<tr style='background:{color}22; height:55px;'><td style='padding:12px;'><b>{proj}</b></td><td style='padding:12px;'>Tâche {t+1}</td><td style='padding:12px; color:#79c0ff; font-weight:bold;'>{team}</td><td style='padding:12px;'>{start:.1f}h</td><td style='padding:12px;'>{end:.1f}h</td><td style='padding:12px;'>{dur}h</td></tr>"
-        recap += "</table>"
-
-        max_h = int(makespan) + 10
-        hours = list(range(0, max_h + 1))
-        grid = {team: ["-" for _ in hours] for team in self.teams}
-        for (proj, t), v in S.items():
-            start = int(v.X)
-            dur = int(self.projects[proj][t])
-            team_idx = next(i for i in range(self.config["nb_teams"]) if X.get((proj, t, i), None) and X[(proj, t, i)].X > 0.5)
-            team = self.teams[team_idx]
-            color = colors[hash(proj) % len(colors)]
-            label = f"{proj[:9]}<br><b>T{t+1}</b>"
-            for h in range(start, start + dur):
-                if h < len(grid[team]):
-                    grid[team][h] = f"<div style='background:{color}; color:black; padding:6px; border-radius:8px; font-size:11px; text-align:center; font-weight:bold;'>{label}</div>"
-
-        gantt = "<h2 style='color:#58a6ff; margin-top:50px; font-size:30px;'>Gantt – Parallélisation</h2>"
-        gantt += "<table style='border-collapse:collapse; width:100%; font-size:12px;'><tr style='background:#21262d;'><th style='padding:12px; min-width:120px;'>Équipe</th>"
-        for h in hours: gantt += f"<th style='padding:8px; min-width:50px;'>{h}h</th>"
-        gantt += "</tr>"
-        for team in self.teams:
-            gantt += f"<tr><td style='background:#1f6feb; color:white; padding:12px; font-weight:bold;'>{team}</td>"
-            for cell in grid[team]:
-                gantt += f"<td style='border:1px solid #30363d; text-align:center; height:70px; vertical-align:middle;'>{cell}</td>"
-            gantt += "</tr>"
-        gantt += "</table>"
-
-        final = f"<h1 style='color:#00ff88; margin:60px 0; font-size:46px;'>TERMINÉ À {makespan:.1f}h</h1>"
-
-        self.result.setHtml(f"<div style='line-height:2.2;'>{final}{recap}{gantt}</div>")
-
+        # Copie de la journée : on peut en préparer une autre pendant l'optimisation
+        self.jobs_submitted += 1
+        job = {'label': f"Journée {self.jobs_submitted}",
+               'projects': {p: list(ts) for p, ts in self.projects.items()},
+               'teams': list(self.teams),
+               'backend': self.backend_combo.currentText() or None,
+               'time_limit': float(self.time_limit_spin.value())}
+        self.btn_cancel.setEnabled(True)
+        if self.worker.submit(job):
+            self.log(f"<span style='color:#e3b341; font-size:18px;'>{job['label']} en file d'attente "
+                     f"({self.worker.pending()} en attente)</span>")
+
+    def on_job_started(self, job):
+        self.running = job
+        self.btn_cancel.setEnabled(True)
+        self.log(f"<h2 style='color:#00ff88;'>Optimisation en cours – {job['label']}...</h2>")
+
+    def on_finished(self, job, res):
+        self.running = None
+        self.btn_cancel.setEnabled(self.worker.busy())
+        self.progress_label.setText(f"{job['label']} : {res['status']}")
+        if res['status'] in ('optimal', 'interrupted', 'time_limit') and 'makespan' in res:
+            if res['status'] == 'interrupted':
+                self.log("<h2 style='color:#e3b341;'>Optimisation annulée – meilleure solution trouvée</h2>")
+            elif res['status'] == 'time_limit':
+                self.log("<h2 style='color:#e3b341;'>Temps limite atteint – meilleure solution trouvée</h2>")
+            if res.get('source') == 'heuristic':
+                self.log("<span style='color:#e3b341; font-size:18px;'>Planning heuristique "
+                         "(ordonnancement par liste), optimalité non prouvée</span>")
+            self.display_final_result(job, res['starts'], res['teams'], res['makespan'])
+        elif res['status'] == 'interrupted':
+            self.log("<h2 style='color:#e3b341;'>Optimisation annulée avant la première solution</h2>")
+        elif res['status'] == 'error':
+            QMessageBox.critical(self, "Erreur", res.get('message', 'Erreur inconnue'))
+        else:
+            self.log("<h2 style='color:#ff4444;'>Pas de solution optimale trouvée</h2>")
+
+    def on_progress(self, info):
+        # Reçu par signal depuis NovaWorker : l'interface n'est jamais bloquée par le solveur
+        txt = f"{self.running['label']} – " if self.running else ""
+        txt += f"{info['elapsed']:.1f} s"
+        if info['obj'] is not None:
+            txt += f" – makespan {info['obj']:.1f}h"
+        if info['bound'] is not None:
+            txt += f" – borne {info['bound']:.1f}h"
+        self.progress_label.setText(txt)
+
+    def closeEvent(self, event):
+        self.worker.stop()
+        super().closeEvent(event)
+
+    def display_final_result(self, job, starts, teams, makespan):
+        # Gantt et récapitulatif construits à partir des mêmes tableaux (équipe, début, durée)
+        bars, names = schedule_arrays(job['projects'], starts, teams)
+        self.gantt.set_schedule(bars, job['teams'], names, makespan)
+
+        order = np.lexsort((bars['team'], bars['start']))
+        self.recap.setUpdatesEnabled(False)
+        self.recap.setRowCount(len(order))
+        for row, i in enumerate(order):
+            start, dur = bars['start'][i], bars['duration'][i]
+            cells = [names[bars['project'][i]], f"Tâche {bars['task'][i] + 1}", job['teams'][bars['team'][i]],
+                     f"{start:.1f}h", f"{start + dur:.1f}h", f"{dur:g}h"]
+            for col, txt in enumerate(cells):
+                item = QTableWidgetItem(txt)
+                if col == 0:
+                    item.setForeground(QColor(COLORS[bars['project'][i] % len(COLORS)]))
+                self.recap.setItem(row, col, item)
+        self.recap.setUpdatesEnabled(True)
+
+        self.log(f"<h1 style='color:#00ff88; font-size:34px;'>{job['label']} – TERMINÉ À {makespan:.1f}h</h1>")
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
@@ -0,0 +1,189 @@
+# gantt.py – diagramme de Gantt peint directement (QPainter), pour les plannings NOVA
+# Données compactes : une ligne par tâche (équipe, début, durée, projet) en tableaux numpy.
+# Seules les barres visibles sont peintes : le coût ne dépend pas du makespan.
+# Molette : défilement vertical ; Maj + molette : horizontal ; Ctrl + molette : zoom.
+import numpy as np
+from PyQt5.QtCore import Qt, QRectF, QPointF
+from PyQt5.QtGui import QPainter, QColor, QPen, QFont
+from PyQt5.QtWidgets import QAbstractScrollArea, QToolTip
+
+COLORS = ["#f7768e", "#ff9e64", "#e0af68", "#9ece6a", "#73daca", "#7aa2f7", "#bb9af7", "#c0caf5"]
+
+
+def schedule_arrays(projects, starts, teams):
+    # {(projet, tâche): début}, {(projet, tâche): équipe} → tableaux (équipe, début, durée, projet, tâche)
+    names = list(projects)
+    index = {p: i for i, p in enumerate(names)}
+    ops = list(starts)
+    bars = {'team': np.array([teams[op] for op in ops], dtype=int),
+            'start': np.array([starts[op] for op in ops], dtype=float),
+            'duration': np.array([projects[p][t] for p, t in ops], dtype=float),
+            'project': np.array([index[p] for p, _ in ops], dtype=int),
+            'task': np.array([t for _, t in ops], dtype=int)}
+    return bars, names
+
+
+class GanttView(QAbstractScrollArea):
+    ROW_H = 46          # hauteur d'une ligne d'équipe (px)
+    HEADER_H = 28       # axe des heures
+    LABEL_W = 110       # colonne des noms d'équipes
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.zoom = 60.0                 # pixels par heure
+        self.bars = None
+        self.team_names, self.project_names = [], []
+        self.makespan = 0.0
+        self.viewport().setMouseTracking(True)
+        self.setStyleSheet("background:#161b22; border: 3px solid #30363d; border-radius:18px;")
+
+    def set_schedule(self, bars, team_names, project_names, makespan):
+        # Barres triées par début : la recherche des barres visibles est un searchsorted
+        order = np.argsort(bars['start'], kind='stable')
+        self.bars = {k: v[order] for k, v in bars.items()}
+        self.bars['end'] = self.bars['start'] + self.bars['duration']
+        self.max_duration = float(self.bars['duration'].max(initial=0.0))
+        self.team_names, self.project_names = list(team_names), list(project_names)
+        self.makespan = float(makespan)
+        self._update_scrollbars()
+        self.viewport().update()
+
+    def clear(self):
+        self.bars = None
+        self.team_names, self.project_names = [], []
+        self.makespan = 0.0
+        self._update_scrollbars()
+        self.viewport().update()
+
+    # --- géométrie ---
+    def _update_scrollbars(self):
+        vw, vh = self.viewport().width(), self.viewport().height()
+        width = int(self.makespan * self.zoom) + 40
+        height = len(self.team_names) * self.ROW_H
+        self.horizontalScrollBar().setRange(0, max(0, width - (vw - self.LABEL_W)))
+        self.horizontalScrollBar().setPageStep(max(1, vw - self.LABEL_W))
+        self.verticalScrollBar().setRange(0, max(0, height - (vh - self.HEADER_H)))
+        self.verticalScrollBar().setPageStep(max(1, vh - self.HEADER_H))
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._update_scrollbars()
+
+    def _visible(self):
+        # Indices des barres qui recoupent la fenêtre [t0, t1] × [r0, r1]
+        x0, y0 = self.horizontalScrollBar().value(), self.verticalScrollBar().value()
+        t0 = x0 / self.zoom
+        t1 = (x0 + self.viewport().width() - self.LABEL_W) / self.zoom
+        r0 = y0 // self.ROW_H
+        r1 = (y0 + self.viewport().height() - self.HEADER_H) // self.ROW_H
+        b = self.bars
+        lo = np.searchsorted(b['start'], t0 - self.max_duration, side='left')
+        hi = np.searchsorted(b['start'], t1, side='right')
+        idx = np.arange(lo, hi)
+        keep = (b['end'][idx] > t0) & (b['team'][idx] >= r0) & (b['team'][idx] <= r1)
+        return idx[keep], t0, t1, r0, r1
+
+    def _tick_step(self):
+        # Pas de graduation : au moins ~60 px entre deux étiquettes
+        for step in (0.25, 0.5, 1, 2, 4, 6, 12, 24, 48, 96, 168):
+            if step * self.zoom >= 60:
+                return step
+        return 336
+
+    # --- peinture ---
+    def paintEvent(self, event):
+        p = QPainter(self.viewport())
+        p.fillRect(self.viewport().rect(), QColor("#161b22"))
+        if self.bars is None:
+            p.end()
+            return
+        idx, t0, t1, r0, r1 = self._visible()
+        x0, y0 = self.horizontalScrollBar().value(), self.verticalScrollBar().value()
+        W, H = self.viewport().width(), self.viewport().height()
+        p.setRenderHint(QPainter.Antialiasing, False)
+
+        # Grille horaire (zone des barres)
+        p.setClipRect(self.LABEL_W, 0, W - self.LABEL_W, H)
+        step = self._tick_step()
+        ticks = np.arange(np.floor(t0 / step) * step, min(t1, self.makespan + step) + step, step)
+        p.setPen(QPen(QColor("#30363d")))
+        for t in ticks:
+            x = self.LABEL_W + t * self.zoom - x0
+            p.drawLine(QPointF(x, self.HEADER_H), QPointF(x, H))
+
+        # Barres visibles uniquement
+        p.setClipRect(self.LABEL_W, self.HEADER_H, W - self.LABEL_W, H - self.HEADER_H)
+        b = self.bars
+        font = QFont(self.font())
+        font.setPointSize(8)
+        font.setBold(True)
+        p.setFont(font)
+        for i in idx:
+            x = self.LABEL_W + b['start'][i] * self.zoom - x0
+            y = self.HEADER_H + b['team'][i] * self.ROW_H - y0
+            rect = QRectF(x + 1, y + 4, b['duration'][i] * self.zoom - 2, self.ROW_H - 8)
+            p.fillRect(rect, QColor(COLORS[b['project'][i] % len(COLORS)]))
+            if rect.width() > 30:
+                p.setPen(QColor("black"))
+                p.drawText(rect.adjusted(4, 0, -2, 0), Qt.AlignVCenter | Qt.AlignLeft,
+                           f"{self.project_names[b['project'][i]]} T{b['task'][i] + 1}")
+        # Fin du planning
+        p.setPen(QPen(QColor("#00ff88"), 2))
+        xm = self.LABEL_W + self.makespan * self.zoom - x0
+        p.drawLine(QPointF(xm, self.HEADER_H), QPointF(xm, H))
+
+        # Axe des heures
+        p.setClipRect(self.LABEL_W, 0, W - self.LABEL_W, self.HEADER_H)
+        p.fillRect(0, 0, W, self.HEADER_H, QColor("#21262d"))
+        p.setPen(QColor("#c9d1d9"))
+        for t in ticks:
+            x = self.LABEL_W + t * self.zoom - x0
+            p.drawText(QRectF(x + 3, 0, 80, self.HEADER_H), Qt.AlignVCenter, f"{t:g}h")
+
+        # Noms des équipes (lignes visibles)
+        p.setClipRect(0, self.HEADER_H, self.LABEL_W, H - self.HEADER_H)
+        p.fillRect(0, self.HEADER_H, self.LABEL_W, H, QColor("#1f6feb"))
+        p.setPen(QColor("white"))
+        for r in range(int(r0), min(int(r1) + 1, len(self.team_names))):
+            y = self.HEADER_H + r * self.ROW_H - y0
+            p.drawText(QRectF(8, y, self.LABEL_W - 10, self.ROW_H), Qt.AlignVCenter, self.team_names[r])
+        p.end()
+
+    # --- interactions ---
+    def wheelEvent(self, event):
+        delta = event.angleDelta().y()
+        if event.modifiers() & Qt.ControlModifier:
+            # Zoom centré sur l'heure sous le curseur
+            x = event.pos().x() - self.LABEL_W
+            hour = (self.horizontalScrollBar().value() + x) / self.zoom
+            self.zoom = float(np.clip(self.zoom * (1.25 if delta > 0 else 0.8), 2.0, 2000.0))
+            self._update_scrollbars()
+            self.horizontalScrollBar().setValue(int(hour * self.zoom - x))
+            self.viewport().update()
+        elif event.modifiers() & Qt.ShiftModifier:
+            self.horizontalScrollBar().setValue(self.horizontalScrollBar().value() - delta)
+        else:
+            super().wheelEvent(event)
+
+    def bar_at(self, pos):
+        # Barre sous le point pos (coordonnées du viewport), ou None
+        if self.bars is None or pos.x() < self.LABEL_W or pos.y() < self.HEADER_H:
+            return None
+        t = (pos.x() - self.LABEL_W + self.horizontalScrollBar().value()) / self.zoom
+        row = (pos.y() - self.HEADER_H + self.verticalScrollBar().value()) // self.ROW_H
+        b = self.bars
+        hi = np.searchsorted(b['start'], t, side='right')
+        lo = np.searchsorted(b['start'], t - self.max_duration, side='left')
+        hit = np.flatnonzero((b['end'][lo:hi] > t) & (b['team'][lo:hi] == row))
+        return int(lo + hit[0]) if len(hit) else None
+
+    def mouseMoveEvent(self, event):
+        i = self.bar_at(event.pos())
+        if i is None:
+            QToolTip.hideText()
+            return
+        b = self.bars
+        QToolTip.showText(event.globalPos(),
+                          f"{self.project_names[b['project'][i]]} – Tâche {b['task'][i] + 1}\n"
+                          f"{self.team_names[b['team'][i]]} : {b['start'][i]:.1f}h → {b['end'][i]:.1f}h",
+                          self.viewport())
@@ -0,0 +1,148 @@
+# heuristic.py – planning rapide (glouton + recherche locale) pour SchedulingModel
+# Respecte : 1 quart max/jour, pas de nuit → matin, max quarts par agent.
+import time
+from typing import Dict, Any
+import numpy as np
+
+
+def _available(x, worked, budget, d, s, S, prev_night):
+    # Agents libres le jour d, avec du budget, et sans nuit la veille si s est le matin
+    ok = (x[:, d, :].sum(axis=1) == 0) & (worked < budget)
+    if S >= 2 and d > 0 and s == 0:
+        ok &= x[:, d - 1, S - 1] == 0
+    if S >= 2 and d == 0 and s == 0:
+        ok &= ~prev_night
+    if S >= 2 and d + 1 < x.shape[1] and s == S - 1:
+        ok &= x[:, d + 1, 0] == 0
+    return ok
+
+
+def _pick(cost_ds, worked, ok, n):
+    # Les n agents disponibles les moins chers, à coût égal les moins chargés
+    cand = np.flatnonzero(ok)
+    if len(cand) <= n:
+        return cand
+    order = np.lexsort((worked[cand], cost_ds[cand]))
+    return cand[order[:n]]
+
+
+def _repair_morning(x, worked, budget, cost, d, S, prev_night):
+    # Libère un agent pour le matin du jour d : sa nuit de la veille est confiée
+    # à un agent libre la veille et déjà occupé le jour d (sinon aucun gain)
+    night = np.flatnonzero(x[:, d - 1, S - 1] & (x[:, d, :].sum(axis=1) == 0))
+    cand = np.flatnonzero(_available(x, worked, budget, d - 1, S - 1, S, prev_night)
+                          & (x[:, d, 1:].sum(axis=1) > 0))
+    if len(night) == 0 or len(cand) == 0:
+        return False
+    a = night[np.argmax(cost[night, d - 1, S - 1])]
+    b = cand[np.argmin(cost[cand, d - 1, S - 1])]
+    x[a, d - 1, S - 1] = 0; x[b, d - 1, S - 1] = 1
+    worked[a] -= 1; worked[b] += 1
+    return True
+
+
+def _improve(x, cost, budget, prev_night, max_rounds):
+    # Recherche locale : réaffectation d'un quart à un agent moins cher,
+    # puis échange de quarts entre deux agents le même jour
+    E, D, S = x.shape
+    worked = x.sum(axis=(1, 2))
+    for _ in range(max_rounds):
+        gain = False
+        for d in range(D):
+            for s in range(S):
+                # Réaffectation : e (affecté) → f (libre, moins cher)
+                assigned = np.flatnonzero(x[:, d, s])
+                if len(assigned) == 0:
+                    continue
+                ok = _available(x, worked, budget, d, s, S, prev_night)
+                if not ok.any():
+                    continue
+                free = np.flatnonzero(ok)
+                free = free[np.argsort(cost[free, d, s])]
+                for e in assigned[np.argsort(cost[assigned, d, s])[::-1]]:
+                    if len(free) == 0 or cost[free[0], d, s] >= cost[e, d, s] - 1e-12:
+                        break
+                    f = free[0]
+                    x[e, d, s] = 0; x[f, d, s] = 1
+                    worked[e] -= 1; worked[f] += 1
+                    gain = True
+                    ok = _available(x, worked, budget, d, s, S, prev_night)
+                    free = np.flatnonzero(ok)
+                    free = free[np.argsort(cost[free, d, s])]
+            # Échanges : e fait s1, f fait s2 → e fait s2, f fait s1
+            on = np.flatnonzero(x[:, d, :].sum(axis=1))
+            if len(on) < 2:
+                continue
+            shift = np.argmax(x[on, d, :], axis=1)
+            cur = cost[on, d, shift]
+            swp = cost[on[:, None], d, shift[None, :]]          # swp[i, j] = coût de i sur le quart de j
+            delta = swp + swp.T - cur[:, None] - cur[None, :]
+            np.fill_diagonal(delta, 0.0)
+            while True:
+                i, j = np.unravel_index(np.argmin(delta), delta.shape)
+                if delta[i, j] >= -1e-12:
+                    break
+                e, f, s1, s2 = on[i], on[j], shift[i], shift[j]
+                x[e, d, s1] = 0; x[f, d, s2] = 0
+                x[e, d, s2] = 1; x[f, d, s1] = 1
+                if _violates_night(x, e, d, prev_night) or _violates_night(x, f, d, prev_night):
+                    x[e, d, s2] = 0; x[f, d, s1] = 0
+                    x[e, d, s1] = 1; x[f, d, s2] = 1
+                else:
+                    gain = True
+                    shift[i], shift[j] = s2, s1
+                delta[i, :] = delta[:, i] = delta[j, :] = delta[:, j] = 0.0
+        if not gain:
+            break
+
+
+def _violates_night(x, e, d, prev_night):
+    E, D, S = x.shape
+    if S < 2:
+        return False
+    if d == 0 and prev_night[e] and x[e, 0, 0]:
+        return True
+    if d > 0 and x[e, d - 1, S - 1] and x[e, d, 0]:
+        return True
+    if d + 1 < D and x[e, d, S - 1] and x[e, d + 1, 0]:
+        return True
+    return False
+
+
+def heuristic_schedule(demand, cost, max_shifts, prev_night=None,
+                       max_rounds: int = 3) -> Dict[str, Any]:
+    # demand : (D, S) ; cost : (E, D, S) ; max_shifts : entier ou vecteur (E,)
+    # prev_night : agents de nuit la veille du jour 0 (vecteur booléen (E,))
+    t0 = time.perf_counter()
+    cost = np.asarray(cost, dtype=float)
+    demand = np.asarray(demand, dtype=np.int64)
+    E, D, S = cost.shape
+    budget = np.broadcast_to(np.asarray(max_shifts), (E,)).astype(np.int64)
+    prev_night = np.zeros(E, dtype=bool) if prev_night is None else np.asarray(prev_night, dtype=bool)
+    x = np.zeros((E, D, S), dtype=np.uint8)
+    worked = np.zeros(E, dtype=np.int64)
+    shortfall = np.zeros((D, S), dtype=np.int64)
+
+    # 1. Construction gloutonne, jour par jour, quart le plus demandé d'abord
+    for d in range(D):
+        for s in np.argsort(-demand[d], kind="stable"):
+            need = int(demand[d, s])
+            if need <= 0:
+                continue
+            ok = _available(x, worked, budget, d, s, S, prev_night)
+            if ok.sum() < need and s == 0 and d > 0 and S >= 2:
+                while ok.sum() < need and _repair_morning(x, worked, budget, cost, d, S, prev_night):
+                    ok = _available(x, worked, budget, d, s, S, prev_night)
+            chosen = _pick(cost[:, d, s], worked, ok, need)
+            x[chosen, d, s] = 1
+            worked[chosen] += 1
+            shortfall[d, s] = need - len(chosen)
+
+    # 2. Amélioration par réaffectations et échanges
+    _improve(x, cost, budget, prev_night, max_rounds)
+
+    return {'solution': x,
+            'obj': float((cost * x).sum()),
+            'feasible': bool(shortfall.sum() == 0),
+            'shortfall': shortfall,
+            'runtime': time.perf_counter() - t0}
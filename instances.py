@@ -0,0 +1,80 @@
+# instances.py – générateur d'instances reproductibles (graine) pour tests et benchmarks
+# Exemple : python instances.py sites/ --count 20 -E 40 -D 28 -S 3 --density 0.8 --seed 1
+import argparse
+import os
+from typing import Dict, Any, Optional
+import numpy as np
+from demand_io import save_demand_csv
+
+COST_PATTERNS = ('flat', 'night', 'weekend', 'random', 'agent')
+
+
+def _cost(pattern, E, D, S, rng):
+    # Spécification de coût compacte, au format accepté par SchedulingModel (voir expand_cost)
+    if pattern == 'flat':
+        return np.ones(S)
+    if pattern == 'night':
+        return None                                           # coût par défaut : nuit à 1.8
+    if pattern == 'weekend':
+        day = np.where(np.arange(D) % 7 >= 5, 1.5, 1.0)
+        return day[:, None] * np.ones(S)
+    if pattern == 'random':
+        return rng.uniform(1.0, 2.0, (D, S)).round(2)
+    if pattern == 'agent':
+        return {'shift': np.ones(S), 'agent': rng.uniform(0.8, 1.5, E).round(2)}
+    raise ValueError(f"Motif de coût inconnu : {pattern} (choix : {', '.join(COST_PATTERNS)})")
+
+
+def scheduling_instance(E: int, D: int, S: int, density: float = 0.7, cost: str = 'night',
+                        max_shifts: Optional[int] = None, seed: int = 0) -> Dict[str, Any]:
+    # Paramètres de SchedulingModel(**instance). density : part de la capacité totale
+    # E × max_shifts demandée. La demande respecte les bornes analytiques de presolve.py
+    # (effectif par jour, nuit → matin), sans garantir la faisabilité avec les budgets.
+    rng = np.random.default_rng(seed)
+    max_shifts = max_shifts or max(1, round(D * 5 / 7))
+    per_day = density * E * min(max_shifts, D) / D
+    weights = rng.dirichlet(np.full(S, 4.0), size=D)          # répartition entre quarts
+    demand = rng.poisson(per_day * weights).astype(np.int64)
+    # Un agent fait au plus un quart par jour
+    over = demand.sum(axis=1) > E
+    demand[over] = np.floor(demand[over] * E / demand[over].sum(axis=1, keepdims=True))
+    if S >= 2:
+        for d in range(D - 1):
+            excess = demand[d, S - 1] + demand[d + 1, 0] - E
+            if excess > 0:
+                demand[d + 1, 0] -= excess
+    return {'E': E, 'D': D, 'S': S, 'demand': demand, 'max_shifts': max_shifts,
+            'cost': _cost(cost, E, D, S, rng)}
+
+
+def nova_instance(projects: int, tasks: int, teams: int, max_duration: int = 5,
+                  vary_tasks: bool = False, seed: int = 0) -> Dict[str, Any]:
+    # Paramètres de NovaModel(**instance) ; vary_tasks : 1 à `tasks` tâches par projet
+    rng = np.random.default_rng(seed)
+    counts = rng.integers(1, tasks + 1, projects) if vary_tasks else np.full(projects, tasks)
+    return {'projects': {f"P{i+1}": rng.integers(1, max_duration + 1, n).astype(float).tolist()
+                         for i, n in enumerate(counts)},
+            'nb_teams': teams}
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Génère des fichiers de demande pour batch.py")
+    p.add_argument("directory")
+    p.add_argument("--count", type=int, default=10)
+    p.add_argument("-E", "--agents", type=int, default=20)
+    p.add_argument("-D", "--days", type=int, default=28)
+    p.add_argument("-S", "--shifts", type=int, default=3)
+    p.add_argument("--max-shifts", type=int, default=None)
+    p.add_argument("--density", type=float, default=0.7)
+    p.add_argument("--seed", type=int, default=0)
+    args = p.parse_args(argv)
+    os.makedirs(args.directory, exist_ok=True)
+    for i in range(args.count):
+        inst = scheduling_instance(args.agents, args.days, args.shifts, args.density,
+                                   max_shifts=args.max_shifts, seed=args.seed + i)
+        save_demand_csv(os.path.join(args.directory, f"site{i+1:03d}.csv"), inst['demand'])
+    print(f"{args.count} fichiers écrits dans {args.directory}")
+
+
+if __name__ == "__main__":
+    main()
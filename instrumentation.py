@@ -0,0 +1,107 @@
+# instrumentation.py – chronométrage par phase, journal JSON tournant et profilage optionnel
+# Journal : logs/solves.jsonl (SCHEDULER_LOG_DIR pour le déplacer), un enregistrement par résolution.
+# Profilage : SCHEDULER_PROFILE=1 (ou set_profiling(True)) → un fichier .prof par résolution.
+import cProfile
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from typing import Dict, Any, Optional
+
+LOG_DIR = os.environ.get("SCHEDULER_LOG_DIR", "logs")
+_logger = None
+_profiling = os.environ.get("SCHEDULER_PROFILE", "") not in ("", "0")
+
+
+class PhaseTimer:
+    # Durées cumulées par phase : build, presolve, optimize, extract, format, render...
+    def __init__(self):
+        self.phases = {}
+        self.t0 = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name: str):
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - t)
+
+    def add(self, name: str, seconds: float):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def merge(self, phases: Optional[Dict[str, float]]):
+        for name, seconds in (phases or {}).items():
+            self.add(name, seconds)
+
+    @property
+    def wall(self) -> float:
+        return time.perf_counter() - self.t0
+
+
+def configure(directory: Optional[str] = None, max_bytes: int = 1_000_000, backups: int = 5):
+    # Journal tournant : solves.jsonl, solves.jsonl.1, ... (directory=None : journal désactivé)
+    global _logger
+    _logger = logging.getLogger("scheduler.solves")
+    _logger.propagate = False
+    _logger.setLevel(logging.INFO)
+    for h in list(_logger.handlers):
+        _logger.removeHandler(h)
+        h.close()
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        handler = RotatingFileHandler(os.path.join(directory, "solves.jsonl"),
+                                      maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        _logger.addHandler(handler)
+    else:
+        _logger.addHandler(logging.NullHandler())
+
+
+def emit(record: Dict[str, Any]):
+    # Un enregistrement JSON par ligne ; les valeurs numpy sont converties
+    if _logger is None:
+        configure(LOG_DIR)
+    record = {'time': datetime.now().isoformat(timespec='milliseconds'), **record}
+    _logger.info(json.dumps(record, default=_jsonable, ensure_ascii=False))
+
+
+def _jsonable(v):
+    if hasattr(v, "tolist"):
+        return v.tolist()
+    return str(v)
+
+
+def solve_record(res: Dict[str, Any], **context) -> Dict[str, Any]:
+    # Résumé d'un résultat de résolution (sans le planning lui-même)
+    rec = {'event': 'solve', **context}
+    for k in ('status', 'obj', 'bound', 'gap', 'backend', 'formulation', 'runtime', 'size', 'phases',
+              'cached', 'incremental', 'windows'):
+        if k in res:
+            rec[k] = res[k]
+    return rec
+
+
+def set_profiling(enabled: bool):
+    global _profiling
+    _profiling = enabled
+
+
+@contextmanager
+def profiled(label: str):
+    # Profil cProfile de la résolution si le profilage est activé (sinon ne fait rien)
+    if not _profiling:
+        yield None
+        return
+    prof = cProfile.Profile()
+    prof.enable()
+    try:
+        yield prof
+    finally:
+        prof.disable()
+        directory = os.path.join(LOG_DIR, "profiles")
+        os.makedirs(directory, exist_ok=True)
+        prof.dump_stats(os.path.join(directory, f"{label}-{datetime.now():%Y%m%d-%H%M%S-%f}.prof"))
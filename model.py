@@ -1,93 +1,772 @@
 # model.py on fait 1 quart max/jour + pas de nuit → matin
-from typing import List, Optional, Dict, Any
+import time
+import threading
+from typing import List, Optional, Dict, Any, Sequence, Union
+import numpy as np
+import scipy.sparse as sp
+from backends import LinearProblem, GurobiBackend, get_backend
+from heuristic import heuristic_schedule
+from presolve import check_feasibility, describe
+from instrumentation import PhaseTimer, profiled, emit, solve_record
 try:
     from gurobipy import Model as GurobiModel, GRB, quicksum
 except Exception:
     GurobiModel = None
     GRB = None
 
+INFEASIBLE_MSG = ('Modèle infaisable !\n'
+                  '→ Essayez : plus d\'agents, ou augmentez "Max quarts/agent"\n'
+                  '   ou réduisez la demande sur certains créneaux.')
+
+CostSpec = Union[None, float, Sequence[float], np.ndarray, Dict[str, Any]]
+
+
+def default_shift_cost(S: int) -> np.ndarray:
+    cost = np.ones(S)
+    if S >= 3:
+        cost[2] = 1.8  # Quart de nuit plus cher
+    return cost
+
+
+def expand_cost(cost: CostSpec, E: int, D: int, S: int) -> np.ndarray:
+    # Coûts sous forme compacte, étendus en vue (E, D, S) sans copie (np.broadcast_to) :
+    #   None → coût par défaut par quart ; scalaire ; (S,) par quart ; (D, S) par jour et quart ;
+    #   (E, D, S) complet ; dict {'shift' ou 'day_shift': ..., 'agent': multiplicateur (E,)}
+    if isinstance(cost, dict):
+        unknown = set(cost) - {'shift', 'day_shift', 'agent'}
+        if unknown:
+            raise ValueError(f"Clés de coût inconnues : {', '.join(sorted(unknown))}")
+        base = expand_cost(cost.get('day_shift', cost.get('shift')), 1, D, S)[0]
+        agent = cost.get('agent')
+        if agent is None:
+            return np.broadcast_to(base, (E, D, S))
+        agent = np.asarray(agent, dtype=float).reshape(E)
+        return agent[:, None, None] * base[None, :, :]
+    if cost is None:
+        cost = default_shift_cost(S)
+    cost = np.asarray(cost, dtype=float)
+    if cost.ndim == 1 and cost.shape != (S,):
+        raise ValueError(f"{len(cost)} coûts par quart pour {S} quarts")
+    if cost.ndim == 3:
+        cost = cost.reshape(E, D, S)
+    try:
+        return np.broadcast_to(cost, (E, D, S))
+    except ValueError:
+        raise ValueError(f"Coûts de forme {cost.shape} incompatibles avec ({E}, {D}, {S})")
+
 class SchedulingModel:
     def __init__(self, E: int, D: int, S: int,
                  demand: List[List[int]],
-                 max_shifts: int,
-                 cost: Optional[List[List[List[float]]]] = None):
+                 max_shifts: Union[int, Sequence[int]],
+                 cost: CostSpec = None,
+                 prev_night: Optional[Sequence[bool]] = None):
+        # max_shifts : commun à tous les agents ou un budget par agent
+        # prev_night : agents ayant travaillé de nuit la veille du jour 0 (pas de matin le jour 0)
         self.E = E; self.D = D; self.S = S
-        self.demand = demand
+        self.demand = np.asarray(demand, dtype=np.int64).reshape(D, S)
         self.max_shifts = max_shifts
-        self.cost = cost if cost is not None else self._default_cost()
+        self.budget = np.broadcast_to(np.asarray(max_shifts, dtype=np.int64), (E,)).copy()
+        self.prev_night = (np.zeros(E, dtype=bool) if prev_night is None
+                           else np.asarray(prev_night, dtype=bool).reshape(E))
+        # Vue (E, D, S) en lecture seule : pas de tenseur dense si le coût ne dépend pas de l'agent
+        self.cost = expand_cost(cost, E, D, S)
 
-    def _default_cost(self):
-        cost = [[[1.0 for _ in range(self.S)] for _ in range(self.D)] for _ in range(self.E)]
-        if self.S >= 3:
-            for e in range(self.E):
-                for d in range(self.D):
-                    cost[e][d][2] = 1.8  # Quart de nuit plus cher
-        return cost
+    def _same_cost_for_all(self):
+        return self.E <= 1 or self.cost.strides[0] == 0
 
-    def solve(self, time_limit: Optional[int] = None) -> Dict[str, Any]:
-        if GurobiModel is None:
-            return {'status': 'error', 'message': 'gurobipy non installé ou licence manquante'}
+    def _constraint_blocks(self):
+        # Blocs (nom, A, sens, rhs) en creux sur x aplati dans l'ordre (e, d, s)
+        E, D, S = self.E, self.D, self.S
+        N = E * D * S
+        idx = np.arange(N).reshape(E, D, S)
+        ones = lambda n: np.ones(n)
+        blocks = []
 
-        try:
-            m = GurobiModel("CallCenter")
-            m.setParam('OutputFlag', 0)
-            if time_limit:
-                m.setParam('TimeLimit', time_limit)
+        # 1. Au plus 1 quart par jour par agent : ligne e*D + d
+        rows = np.repeat(np.arange(E * D), S)
+        A = sp.csr_matrix((ones(N), (rows, idx.ravel())), shape=(E * D, N))
+        blocks.append(("un_quart_par_jour", A, '<', ones(E * D)))
 
-            # Variables binaires : x[e,d,s] = 1 si agent e travaille quart s le jour d
-            x = m.addVars(self.E, self.D, self.S, vtype=GRB.BINARY, name="x")
+        # 2. Pas de nuit (dernier quart) suivi du matin (premier quart) : ligne e*(D-1) + d
+        if S >= 2 and D >= 2:
+            n = E * (D - 1)
+            rows = np.tile(np.arange(n), 2)
+            cols = np.concatenate([idx[:, :-1, S - 1].ravel(), idx[:, 1:, 0].ravel()])
+            A = sp.csr_matrix((ones(2 * n), (rows, cols)), shape=(n, N))
+            blocks.append(("pas_nuit_matin", A, '<', ones(n)))
 
-            #  1. CONTRAINTE : Au plus 1 quart par jour par agent 
-            for e in range(self.E):
-                for d in range(self.D):
-                    m.addConstr(quicksum(x[e, d, s] for s in range(self.S)) <= 1,
-                                name=f"un_quart_par_jour_{e}_{d}")
-
-            # 2. CONTRAINTE : Pas de nuit (dernier quart) suivi du matin (premier quart) 
-            if self.S >= 2:  # seulement si au moins 2 quarts
-                for e in range(self.E):
-                    for d in range(self.D - 1):  # tous les jours sauf le dernier
-                        nuit_aujourdhui = x[e, d, self.S-1]      # dernier quart du jour d
-                        matin_demain    = x[e, d+1, 0]           # premier quart du jour d+1
-                        m.addConstr(nuit_aujourdhui + matin_demain <= 1,
-                                    name=f"pas_nuit_matin_{e}_{d}")
-
-            # Contraintes de couverture (demande minimale)
+        # 3. Couverture (demande minimale) : ligne d*S + s
+        rows = np.tile(np.arange(D * S), E)
+        A = sp.csr_matrix((ones(N), (rows, idx.ravel())), shape=(D * S, N))
+        blocks.append(("couverture", A, '>', self.demand.ravel().astype(float)))
+
+        # 4. Max quarts par agent sur l'horizon : ligne e
+        rows = np.repeat(np.arange(E), D * S)
+        A = sp.csr_matrix((ones(N), (rows, idx.ravel())), shape=(E, N))
+        blocks.append(("max_quarts", A, '<', self.budget.astype(float)))
+        return blocks
+
+    def _problem(self, aggregate: bool = False) -> LinearProblem:
+        # Description du PLNE, résoluble par n'importe quel moteur de backends.py
+        if aggregate:
+            return self._aggregated_form(self._agent_classes())
+        p = LinearProblem("CallCenter")
+        ub = np.ones((self.E, self.D, self.S))
+        if self.S >= 2:
+            ub[self.prev_night, 0, 0] = 0.0   # nuit la veille → pas de matin le jour 0
+        p.add_vars(self.E * self.D * self.S, lb=0.0, ub=ub.ravel(), integer=True, obj=self.cost.ravel())
+        for block in self._constraint_blocks():
+            p.add_block(*block)
+        return p
+
+    #  Formulation agrégée : agents interchangeables 
+
+    def _agent_classes(self):
+        # Regroupe les agents identiques : même tranche de coûts, même budget, même veille
+        keys = np.column_stack([self.budget, self.prev_night])
+        if not self._same_cost_for_all():
+            keys = np.hstack([self.cost.reshape(self.E, -1), keys])
+        _, labels = np.unique(keys, axis=0, return_inverse=True)
+        labels = labels.ravel()
+        return [np.flatnonzero(labels == c) for c in range(labels.max() + 1)]
+
+    def _levels(self):
+        # Niveaux k = quarts déjà faits ; inutile de les suivre si tous les budgets >= D
+        return 1 if self.budget.min() >= self.D else min(int(self.budget.max()), self.D) + 1
+
+    def _aggregated_is_smaller(self):
+        L = self._levels()
+        return len(self._agent_classes()) * (self.S + 1) ** 2 * L <= self.E * self.S
+
+    def _aggregated_cost(self, classes, L):
+        # Coût d'un nœud (d, a, k) = coût du quart a pour la classe ; arcs gratuits
+        D, S, A_ = self.D, self.S, self.S + 1
+        parts = []
+        for members in classes:
+            cst = np.zeros((D, A_, L))
+            cst[:, :S, :] = self.cost[members[0]][:, :, None]
+            parts += [cst.ravel(), np.zeros((D - 1) * A_ * A_ * L)]
+        return np.concatenate(parts)
+
+    def _aggregated_form(self, classes):
+        # Pour chaque classe : flot entier de n_c agents dans un graphe par couches
+        # (jour d, état a, niveau k), état a < S = quart a, a = S = repos.
+        # n[d,a,k] = nb d'agents dans l'état a le jour d ayant fait k quarts (jour d inclus)
+        # z[d,a,b,k] = nb d'agents passant de (d,a,k) à (d+1,b,k+inc(b))
+        # Chaque chemin source → puits est un planning individuel valide.
+        D, S = self.D, self.S
+        A_ = S + 1
+        L = self._levels()
+        track = L > 1
+        inc = np.array([1 if (track and a < S) else 0 for a in range(A_)])
+        k = np.arange(L)
+
+        # Nœuds valides
+        node_ok = np.ones((D, A_, L), dtype=bool)
+        if track:
+            node_ok &= k[None, None, :] <= np.arange(1, D + 1)[:, None, None]
+            node_ok[:, :S, 0] = False
+        node_ok[0] = False
+        node_ok[0, np.arange(A_), inc] = True
+        kk = k[None, :] + inc[:, None]                 # niveau d'arrivée, indexé (b, k)
+
+        nn, na = D * A_ * L, (D - 1) * A_ * A_ * L
+        per_class = nn + na
+        ub_parts, blocks_rows = [], {"depart": [], "sortie": [], "entree": [], "couverture": []}
+        p = LinearProblem("CallCenterAgrege")
+        n_cls = len(classes)
+        N = n_cls * per_class
+
+        def triplets(key, rows, cols, vals):
+            blocks_rows[key].append((rows.ravel(), cols.ravel(), np.broadcast_to(vals, rows.shape).ravel()))
+
+        for ci, members in enumerate(classes):
+            off = ci * per_class
+            node = off + np.arange(nn).reshape(D, A_, L)
+            arc = off + nn + np.arange(na).reshape(D - 1, A_, A_, L)
+            cnt = float(len(members))
+
+            # Nœuds valides pour la classe : budget propre, nuit de la veille
+            ok = node_ok.copy()
+            if track:
+                ok &= k[None, None, :] <= self.budget[members[0]]
+            if S >= 2 and self.prev_night[members[0]]:
+                ok[0, 0, :] = False
+            # Arcs valides : nœuds de départ et d'arrivée valides, pas de nuit → matin
+            tgt = ok[1:, np.arange(A_)[:, None], np.minimum(kk, L - 1)] & (kk < L)
+            arc_ok = ok[:-1, :, None, :] & tgt[:, None, :, :]
+            if S >= 2:
+                arc_ok[:, S - 1, 0, :] = False
+
+            ub_parts += [np.where(ok, cnt, 0.0).ravel(), np.where(arc_ok, cnt, 0.0).ravel()]
+
+            # Départ : tous les agents de la classe sont placés le jour 0
+            triplets("depart", np.full(A_ * L, ci), node[0], 1.0)
+
+            # Sortie : n[d,a,k] = Σ_b z[d,a,b,k]  (ligne (ci, d, a, k), d < D-1)
+            base = ci * (D - 1) * A_ * L
+            r = base + np.arange((D - 1) * A_ * L).reshape(D - 1, A_, L)
+            triplets("sortie", r, node[:-1], 1.0)
+            triplets("sortie", np.broadcast_to(r[:, :, None, :], arc.shape), arc, -1.0)
+
+            # Entrée : n[d+1,b,k'] = Σ_a z[d,a,b,k'-inc(b)]
+            triplets("entree", r, node[1:], 1.0)
+            lvl = k[None, None, None, :] + inc[None, None, :, None]
+            rows = base + ((np.arange(D - 1)[:, None, None, None] * A_
+                            + np.arange(A_)[None, None, :, None]) * L + np.minimum(lvl, L - 1))
+            rows = np.broadcast_to(rows, arc.shape)
+            keep = np.broadcast_to(lvl < L, arc.shape)
+            triplets("entree", rows[keep], arc[keep], -1.0)
+
+            # Couverture : Σ_c Σ_k n[d,s,k] >= demande[d,s]  (ligne d*S + s)
+            rows = np.broadcast_to((np.arange(D)[:, None, None] * S
+                                    + np.arange(S)[None, :, None]), (D, S, L))
+            triplets("couverture", rows, node[:, :S, :], 1.0)
+
+        def matrix(key, m):
+            r, c, v = (np.concatenate(p) for p in zip(*blocks_rows[key]))
+            return sp.csr_matrix((v, (r, c)), shape=(m, N))
+
+        nf = n_cls * (D - 1) * A_ * L
+        p.add_vars(N, lb=0.0, ub=np.concatenate(ub_parts), integer=True,
+                   obj=self._aggregated_cost(classes, L))
+        p.add_block("depart", matrix("depart", n_cls), '=', [float(len(m)) for m in classes])
+        if D >= 2:
+            p.add_block("sortie", matrix("sortie", nf), '=', np.zeros(nf))
+            p.add_block("entree", matrix("entree", nf), '=', np.zeros(nf))
+        p.add_block("couverture", matrix("couverture", D * S), '>', self.demand.ravel().astype(float))
+        p.meta = {'classes': classes, 'shape': (D, A_, L), 'per_class': per_class, 'nn': nn}
+        return p
+
+    def _expand_aggregated(self, values, meta):
+        # Décompose le flot entier en chemins : un chemin par agent de la classe
+        D, A_, L = meta['shape']
+        S = self.S
+        nn, per_class = meta['nn'], meta['per_class']
+        sol = np.zeros((self.E, D, S), dtype=np.uint8)
+        track = L > 1
+        inc = np.array([1 if (track and a < S) else 0 for a in range(A_)])
+        for ci, members in enumerate(meta['classes']):
+            v = np.rint(values[ci * per_class:(ci + 1) * per_class]).astype(np.int64)
+            node = v[:nn].reshape(D, A_, L)
+            arc = v[nn:].reshape(D - 1, A_, A_, L)
+            # Jour 0 : répartit les membres selon les effectifs des nœuds
+            first = node[0].ravel()
+            a = np.repeat(np.arange(A_ * L) // L, first)
+            k = np.repeat(np.arange(A_ * L) % L, first)
+            for d in range(D):
+                on = a < S
+                sol[members[on], d, a[on]] = 1
+                if d == D - 1:
+                    break
+                # Agents triés par état (a, k) ; chaque groupe reçoit ses successeurs b
+                order = np.lexsort((k, a))
+                a, k = a[order], k[order]
+                members = members[order]
+                states = np.unique(a * L + k)
+                b = np.concatenate([np.repeat(np.arange(A_), arc[d, s // L, :, s % L])
+                                    for s in states])
+                a, k = b, k + inc[b]
+        return sol
+
+    def _build_loops(self, m):
+        # Construction historique, une contrainte à la fois (gardée pour comparaison)
+        # Variables binaires : x[e,d,s] = 1 si agent e travaille quart s le jour d
+        x = m.addVars(self.E, self.D, self.S, vtype=GRB.BINARY, name="x")
+
+        #  1. CONTRAINTE : Au plus 1 quart par jour par agent 
+        for e in range(self.E):
             for d in range(self.D):
-                for s in range(self.S):
-                    m.addConstr(quicksum(x[e, d, s] for e in range(self.E)) >= self.demand[d][s],
-                                name=f"couverture_{d}_{s}")
+                m.addConstr(quicksum(x[e, d, s] for s in range(self.S)) <= 1,
+                            name=f"un_quart_par_jour_{e}_{d}")
 
-            #  Max quarts par agent sur l'horizon 
+        # 2. CONTRAINTE : Pas de nuit (dernier quart) suivi du matin (premier quart) 
+        if self.S >= 2:  # seulement si au moins 2 quarts
             for e in range(self.E):
-                m.addConstr(quicksum(x[e, d, s] for d in range(self.D) for s in range(self.S)) <= self.max_shifts,
-                            name=f"max_quarts_{e}")
+                for d in range(self.D - 1):  # tous les jours sauf le dernier
+                    nuit_aujourdhui = x[e, d, self.S-1]      # dernier quart du jour d
+                    matin_demain    = x[e, d+1, 0]           # premier quart du jour d+1
+                    m.addConstr(nuit_aujourdhui + matin_demain <= 1,
+                                name=f"pas_nuit_matin_{e}_{d}")
+
+        # Contraintes de couverture (demande minimale)
+        for d in range(self.D):
+            for s in range(self.S):
+                m.addConstr(quicksum(x[e, d, s] for e in range(self.E)) >= self.demand[d][s],
+                            name=f"couverture_{d}_{s}")
+
+        #  Max quarts par agent sur l'horizon 
+        for e in range(self.E):
+            m.addConstr(quicksum(x[e, d, s] for d in range(self.D) for s in range(self.S)) <= self.budget[e],
+                        name=f"max_quarts_{e}")
+
+        #  Objectif : minimiser le coût total 
+        obj = quicksum(self.cost[e][d][s] * x[e, d, s]
+                       for e in range(self.E) for d in range(self.D) for s in range(self.S))
+        m.setObjective(obj, GRB.MINIMIZE)
+        return x
+
+    def _aggregated_start(self, roster, meta):
+        # Traduit un planning individuel en valeurs (n, z) du flot agrégé
+        D, A_, L = meta['shape']
+        S = self.S
+        nn, per_class = meta['nn'], meta['per_class']
+        track = L > 1
+        start = np.zeros(len(meta['classes']) * per_class)
+        state = np.where(roster.any(axis=2), roster.argmax(axis=2), S)          # (E, D)
+        level = np.cumsum(state < S, axis=1) if track else np.zeros_like(state)
+        for ci, members in enumerate(meta['classes']):
+            a, k = state[members], level[members]
+            node = np.zeros((D, A_, L))
+            np.add.at(node, (np.broadcast_to(np.arange(D), a.shape), a, k), 1)
+            arc = np.zeros((D - 1, A_, A_, L))
+            if D >= 2:
+                np.add.at(arc, (np.broadcast_to(np.arange(D - 1), a[:, 1:].shape),
+                                a[:, :-1], a[:, 1:], k[:, :-1]), 1)
+            start[ci * per_class:ci * per_class + nn] = node.ravel()
+            start[ci * per_class + nn:(ci + 1) * per_class] = arc.ravel()
+        return start
+
+    def _warm_start(self, problem):
+        # MIP start issu de l'heuristique (ignoré s'il ne couvre pas la demande)
+        h = heuristic_schedule(self.demand, self.cost, self.budget, self.prev_night)
+        if h['feasible']:
+            roster = h['solution']
+            problem.start = (self._aggregated_start(roster, problem.meta)
+                             if 'classes' in problem.meta else roster.ravel().astype(float))
+        return h
+
+    def solve_heuristic(self) -> Dict[str, Any]:
+        # Planning glouton + recherche locale, en quelques millisecondes
+        h = heuristic_schedule(self.demand, self.cost, self.budget, self.prev_night)
+        res = {'status': 'heuristic' if h['feasible'] else 'partial',
+               'obj': h['obj'], 'solution': h['solution'],
+               'runtime': h['runtime']}
+        if not h['feasible']:
+            res['message'] = f"Demande non couverte : {int(h['shortfall'].sum())} quart(s)"
+        return res
+
+    def presolve(self):
+        # Preuves d'infaisabilité rapides (voir presolve.py), avant le PLNE
+        return check_feasibility(self.demand, self.budget, self.prev_night)
 
-            #  Objectif : minimiser le coût total 
-            obj = quicksum(self.cost[e][d][s] * x[e, d, s]
-                           for e in range(self.E) for d in range(self.D) for s in range(self.S))
-            m.setObjective(obj, GRB.MINIMIZE)
+    def _describe_iis(self, iis, aggregate):
+        # Lignes de l'IIS ramenées aux contraintes du modèle (agent, jour, quart)
+        D, S = self.D, self.S
+        lines = []
+        if aggregate:
+            # Le flot agrégé n'a pas d'agents nommés : seules les demandes sont explicites
+            flow = sum(len(rows) for name, rows in iis.items() if name != "couverture")
+            iis = {"couverture": iis.get("couverture", [])}
+            if flow:
+                lines.append(f"{flow} contrainte(s) de flot agrégé (max quarts, nuit → matin, veille)")
+        for name, rows in iis.items():
+            for r in rows[:5]:
+                if name == "couverture":
+                    lines.append(f"Demande jour {r // S + 1}, quart {r % S + 1}")
+                elif name == "max_quarts":
+                    lines.append(f"Max quarts de l'agent {r + 1}")
+                elif name == "un_quart_par_jour":
+                    lines.append(f"Un quart par jour : agent {r // D + 1}, jour {r % D + 1}")
+                elif name == "pas_nuit_matin":
+                    lines.append(f"Nuit → matin : agent {r // (D - 1) + 1}, "
+                                 f"jours {r % (D - 1) + 1}–{r % (D - 1) + 2}")
+                elif name == "bornes":
+                    lines.append(f"Agent {r // (D * S) + 1} : pas de matin le jour 1 (nuit la veille)")
+            if len(rows) > 5:
+                lines.append(f"… et {len(rows) - 5} autre(s) contrainte(s) {name}")
+        return lines
 
-            m.optimize()
+    def _infeasible(self, conflicts=None, iis=None, aggregate=False):
+        res = {'status': 'infeasible', 'message': INFEASIBLE_MSG}
+        if conflicts:
+            res['conflicts'] = conflicts
+            res['message'] += "\n\nCauses détectées :\n" + describe(conflicts)
+        elif iis:
+            res['iis'] = iis
+            res['message'] += ("\n\nContraintes incompatibles (IIS) :\n"
+                               + "\n".join("   • " + line for line in self._describe_iis(iis, aggregate)))
+        return res
 
-            if m.Status == GRB.OPTIMAL:
-                sol = [[[int(x[e,d,s].X > 0.5) for s in range(self.S)]
-                        for d in range(self.D)] for e in range(self.E)]
-                return {
+    def _incumbent(self, res, problem, aggregate, backend):
+        # Annulation ou limite de temps : on rend la meilleure solution trouvée (MIP start compris)
+        status = res['status']
+        if 'x' not in res:
+            return {'status': status,
+                    'message': ('Résolution annulée avant la première solution' if status == 'interrupted'
+                                else f'{backend} : limite de temps atteinte sans solution')}
+        bound = res.get('bound')
+        bound = bound if bound is not None and np.isfinite(bound) else None
+        gap = max(0.0, res['obj'] - bound) / max(abs(res['obj']), 1e-10) if bound is not None else None
+        if status == 'interrupted':
+            msg = 'Résolution annulée : meilleure solution trouvée'
+        else:
+            msg = f'{backend} : limite de temps atteinte, meilleure solution trouvée'
+        if gap is not None:
+            msg += f' (écart {100 * gap:.2f} %)'
+        return {'status': status, 'obj': res['obj'], 'bound': bound, 'gap': gap,
+                'solution': self._solution(res['x'], problem), 'runtime': res['runtime'],
+                'formulation': 'aggregated' if aggregate else 'agents', 'backend': backend,
+                'message': msg}
+
+    def _solution(self, values, problem):
+        if 'classes' in problem.meta:
+            return self._expand_aggregated(values, problem.meta)
+        return (values.reshape(self.E, self.D, self.S) > 0.5).astype(np.uint8)
+
+    def _solve_loops(self, time_limit):
+        # Chemin historique (Gurobi uniquement), conservé pour compare_builders
+        m = GurobiModel("CallCenter")
+        m.setParam('OutputFlag', 0)
+        if time_limit:
+            m.setParam('TimeLimit', time_limit)
+        x = self._build_loops(m)
+        m.optimize()
+        if m.Status == GRB.OPTIMAL:
+            sol = np.zeros((self.E, self.D, self.S), dtype=np.uint8)
+            for (e, d, s), v in m.getAttr('X', x).items():
+                sol[e, d, s] = v > 0.5
+            return {'status': 'optimal', 'obj': m.ObjVal, 'solution': sol,
+                    'runtime': m.Runtime, 'formulation': 'agents', 'backend': 'gurobi'}
+        elif m.Status == GRB.INFEASIBLE:
+            m.computeIIS()
+            return {'status': 'infeasible', 'message': INFEASIBLE_MSG}
+        return {'status': 'error', 'message': f'Gurobi status: {m.Status}'}
+
+    def solve(self, time_limit: Optional[int] = None, builder: str = "matrix",
+              aggregate: Optional[bool] = None, backend: Optional[str] = None,
+              warm_start: bool = True, threads: Optional[int] = None,
+              progress=None, cancel=None, log: bool = True) -> Dict[str, Any]:
+        # aggregate=None : formulation agrégée choisie automatiquement si les agents
+        # sont interchangeables et que le graphe agrégé est plus petit que x[e,d,s]
+        # backend=None : Gurobi si disponible, sinon HiGHS (voir backends.py)
+        # warm_start : solution heuristique passée en MIP start (Gurobi uniquement)
+        # progress(dict obj/bound/gap/elapsed) et cancel (threading.Event) : voir backends.py
+        # log : enregistrement JSON dans le journal (False si l'appelant l'écrit lui-même)
+        timer = PhaseTimer()
+        with profiled("scheduling"):
+            res = self._solve(timer, time_limit, builder, aggregate, backend, warm_start,
+                              threads, progress, cancel)
+        res['phases'] = timer.phases
+        if log:
+            emit(solve_record(res, model='scheduling', E=self.E, D=self.D, S=self.S, wall=timer.wall))
+        return res
+
+    def _solve(self, timer, time_limit, builder, aggregate, backend, warm_start,
+               threads, progress, cancel):
+        try:
+            if builder == "loops":
+                if GurobiModel is None:
+                    return {'status': 'error', 'message': 'gurobipy non installé ou licence manquante'}
+                return self._solve_loops(time_limit)
+
+            engine = get_backend(backend)
+            with timer.phase('presolve'):
+                conflicts = self.presolve()
+            if conflicts:
+                res = self._infeasible(conflicts)
+                res['runtime'] = timer.phases['presolve']
+                return res
+            with timer.phase('build'):
+                if aggregate is None:
+                    aggregate = self._aggregated_is_smaller()
+                problem = self._problem(aggregate)
+            if warm_start and engine.name == "gurobi":
+                with timer.phase('heuristic'):
+                    self._warm_start(problem)
+            with timer.phase('optimize'):
+                res = engine.solve(problem, time_limit=time_limit, threads=threads, iis=True,
+                                   progress=progress, cancel=cancel)
+            # Construction du modèle côté solveur et IIS comptés à part de l'optimisation
+            for name, key in (('build', 'build_time'), ('iis', 'iis_time')):
+                if key in res:
+                    timer.add(name, res[key])
+                    timer.add('optimize', -res[key])
+            size = problem.size()
+
+            if res['status'] == 'optimal':
+                with timer.phase('extract'):
+                    solution = self._solution(res['x'], problem)
+                out = {
                     'status': 'optimal',
-                    'obj': m.ObjVal,
-                    'solution': sol,
-                    'runtime': m.Runtime         
+                    'obj': res['obj'],
+                    'solution': solution,
+                    'runtime': res['runtime'],
+                    'formulation': 'aggregated' if aggregate else 'agents',
+                    'backend': res['backend'],
+                    'size': size
                 }
-
-            elif m.Status == GRB.INFEASIBLE:
-                m.computeIIS()
-                return {'status': 'infeasible',
-                        'message': 'Modèle infaisable !\n'
-                                   '→ Essayez : plus d\'agents, ou augmentez "Max quarts/agent"\n'
-                                   '   ou réduisez la demande sur certains créneaux.'}
+            elif res['status'] == 'infeasible':
+                # IIS calculé uniquement ici, quand les preuves analytiques n'ont rien trouvé
+                out = self._infeasible(iis=res.get('iis'), aggregate=aggregate)
+            elif res['status'] in ('interrupted', 'time_limit'):
+                out = self._incumbent(res, problem, aggregate, res['backend'])
             else:
-                return {'status': 'error', 'message': f'Gurobi status: {m.Status}'}
+                out = {'status': 'error', 'message': res.get('message', res['status'])}
+            if 'fallback' in res:   # licence Gurobi insuffisante, résolu avec HiGHS
+                out['fallback'] = res['fallback']
+            return out
+
+        except Exception as ex:
+            return {'status': 'error', 'message': str(ex)}
+
+    #  Réparation locale après un changement de demande
+
+    def repair(self, previous, days: Optional[Sequence[int]] = None, radius: int = 1,
+               agents: Optional[Sequence[int]] = None, churn: Optional[float] = None,
+               time_limit: Optional[float] = None, backend: Optional[str] = None,
+               threads: Optional[int] = None, progress=None, cancel=None,
+               log: bool = True) -> Dict[str, Any]:
+        # previous : planning publié (E, D, S) ; self.demand : la demande mise à jour.
+        # Seuls les jours à moins de radius jours d'un jour modifié (days, par défaut les jours
+        # que previous ne couvre plus) et les agents de agents (par défaut tous) sont ré-optimisés ;
+        # tout le reste est figé. churn : pénalité par case changée (par défaut le coût du quart
+        # le plus cher). Sans solution, le voisinage est élargi jusqu'à l'horizon entier.
+        timer = PhaseTimer()
+        with profiled("repair"):
+            res = self._repair(timer, previous, days, radius, agents, churn, time_limit, backend,
+                               threads, progress, cancel)
+        res['phases'] = timer.phases
+        if log:
+            emit(solve_record(res, model='repair', E=self.E, D=self.D, S=self.S, wall=timer.wall,
+                              window=res.get('window'), changed=res.get('changed')))
+        return res
+
+    def _repair_problem(self, previous, d0, d1, free, churn):
+        # Sous-modèle des jours [d0, d1) : budgets restants, veille du jour d0 et matin du jour d1
+        # issus de previous ; agents hors de free figés ; coût + churn × |x − previous|
+        E, S = self.E, self.S
+        old = previous[:, d0:d1].astype(float)
+        outside = previous.sum(axis=(1, 2), dtype=np.int64) - previous[:, d0:d1].sum(axis=(1, 2), dtype=np.int64)
+        budget = np.maximum(self.budget - outside, 0)
+        prev_night = previous[:, d0 - 1, S - 1].astype(bool) if d0 > 0 else self.prev_night
+        sub = SchedulingModel(E, d1 - d0, S, self.demand[d0:d1], budget,
+                              self.cost[:, d0:d1] + churn * (1.0 - 2.0 * old), prev_night)
+        problem = sub._problem(aggregate=False)
+        ub = problem.ub.reshape(E, d1 - d0, S)
+        lb = problem.lb.reshape(E, d1 - d0, S)
+        if S >= 2 and d1 < self.D:
+            ub[previous[:, d1, 0] > 0, -1, S - 1] = 0.0   # matin figé le lendemain → pas de nuit
+        fixed = ~free
+        lb[fixed] = ub[fixed] = old[fixed]
+        problem.start = old.ravel()
+        return problem
+
+    def _repair(self, timer, previous, days, radius, agents, churn, time_limit, backend,
+                threads, progress, cancel):
+        try:
+            t0 = time.perf_counter()
+            E, D, S = self.E, self.D, self.S
+            previous = np.asarray(previous, dtype=np.uint8).reshape(E, D, S)
+            if days is None:
+                days = np.flatnonzero((previous.sum(axis=0, dtype=np.int64) < self.demand).any(axis=1))
+            days = np.asarray(days, dtype=np.int64)
+            if not len(days):
+                # La demande reste couverte : rien à réparer
+                return {'status': 'optimal', 'obj': float((self.cost * previous).sum()),
+                        'solution': previous.copy(), 'runtime': time.perf_counter() - t0,
+                        'formulation': 'repair', 'window': None, 'changed': 0}
+            free = np.zeros(E, dtype=bool)
+            free[np.arange(E) if agents is None else np.asarray(agents, dtype=np.int64)] = True
+            churn = float(self.cost.max(initial=1.0)) if churn is None else float(churn)
+            engine = get_backend(backend)
+
+            while True:
+                d0 = max(0, int(days.min()) - radius)
+                d1 = min(D, int(days.max()) + radius + 1)
+                with timer.phase('build'):
+                    problem = self._repair_problem(previous, d0, d1, free, churn)
+                    if engine.name != "gurobi":
+                        problem.start = None
+                remaining = None if not time_limit else max(1.0, time_limit - (time.perf_counter() - t0))
+                with timer.phase('optimize'):
+                    res = engine.solve(problem, time_limit=remaining, threads=threads,
+                                       progress=progress, cancel=cancel)
+                if 'build_time' in res:
+                    timer.add('build', res['build_time'])
+                    timer.add('optimize', -res['build_time'])
+                whole = (d0 == 0 and d1 == D and free.all())
+                if res['status'] != 'infeasible' or whole:
+                    break
+                # Voisinage trop petit : on l'élargit (jours puis agents) avant de conclure
+                radius = max(1, 2 * radius)
+                if d0 == 0 and d1 == D:
+                    free[:] = True
+
+            if res['status'] == 'infeasible':
+                return self._infeasible()
+            if 'x' not in res:
+                msg = ('Réparation annulée avant la première solution' if res['status'] == 'interrupted'
+                       else res.get('message', f"{engine.name} : {res['status']}"))
+                return {'status': 'interrupted' if res['status'] == 'interrupted' else 'error', 'message': msg}
+            with timer.phase('extract'):
+                sol = previous.copy()
+                sol[:, d0:d1] = (res['x'].reshape(E, d1 - d0, S) > 0.5)
+                changed = int((sol != previous).any(axis=2).sum())
+            out = {'status': res['status'], 'obj': float((self.cost * sol).sum()), 'solution': sol,
+                   'runtime': time.perf_counter() - t0, 'formulation': 'repair',
+                   'backend': engine.name, 'size': problem.size(), 'window': (d0, d1),
+                   'changed': changed, 'changed_agents': int((sol != previous).any(axis=(1, 2)).sum())}
+            if res['status'] == 'interrupted':
+                out['message'] = 'Réparation annulée : meilleure solution trouvée'
+            elif res['status'] == 'time_limit':
+                out['message'] = f'{engine.name} : limite de temps atteinte, meilleure réparation trouvée'
+            return out
+
+        except Exception as ex:
+            return {'status': 'error', 'message': str(ex)}
+
+
+class SchedulingSession:
+    # Modèle Gurobi persistant pour une taille (E, D, S) donnée. Entre deux appels,
+    # seuls les seconds membres (demande, max_shifts) et les coûts sont modifiés sur
+    # place, puis Gurobi repart de la solution précédente (MIP start).
+    def __init__(self, E: int, D: int, S: int, aggregate: Optional[bool] = None):
+        self.key = (E, D, S)
+        self.aggregate = aggregate
+        self.solves = 0
+        self._lock = threading.Lock()
+        self._m = None
+        self._x = None
+        self._constrs = None
+        self._problem = None
+        self._structure = None
+
+    def _structure_of(self, sm, aggregate):
+        # Ce qui fige la structure du modèle : classes d'agents et niveaux du graphe agrégé
+        if not aggregate:
+            return ('agents',)
+        return ('aggregated', sm._levels(),
+                tuple(tuple(c.tolist()) for c in sm._agent_classes()))
+
+    def _rebuild(self, sm, aggregate):
+        if self._m is not None:
+            self._m.dispose()
+        self._problem = sm._problem(aggregate)
+        sm._warm_start(self._problem)
+        self._m, self._x, self._constrs = GurobiBackend().build(self._problem)
+
+    def _update(self, sm, aggregate):
+        # Mise à jour en place : RHS de couverture / max quarts et coefficients d'objectif
+        m, x, constrs = self._m, self._x, self._constrs
+        start = x.X if m.SolCount > 0 else None
+        constrs["couverture"].RHS = sm.demand.ravel().astype(float)
+        meta = self._problem.meta
+        if aggregate:
+            self._problem.c = sm._aggregated_cost(meta['classes'], meta['shape'][2])
+        else:
+            constrs["max_quarts"].RHS = sm.budget.astype(float)
+            self._problem.c = sm.cost.ravel()
+        x.Obj = self._problem.c
+        if start is not None:
+            x.Start = start
+
+    def solve(self, demand, max_shifts: int, cost=None,
+              time_limit: Optional[int] = None, progress=None, cancel=None,
+              log: bool = True) -> Dict[str, Any]:
+        if GurobiModel is None:
+            return {'status': 'error', 'message': 'gurobipy non installé ou licence manquante'}
+        timer = PhaseTimer()
+        with self._lock, profiled("session"):
+            res = self._solve(timer, demand, max_shifts, cost, time_limit, progress, cancel)
+        res['phases'] = timer.phases
+        if log:
+            E, D, S = self.key
+            emit(solve_record(res, model='scheduling', E=E, D=D, S=S, wall=timer.wall))
+        return res
+
+    def _solve(self, timer, demand, max_shifts, cost, time_limit, progress, cancel):
+        E, D, S = self.key
+        try:
+            sm = SchedulingModel(E, D, S, demand, max_shifts, cost)
+            with timer.phase('presolve'):
+                conflicts = sm.presolve()
+            if conflicts:
+                return sm._infeasible(conflicts)
+            with timer.phase('build'):
+                aggregate = self.aggregate
+                if aggregate is None:
+                    aggregate = sm._aggregated_is_smaller()
+                structure = self._structure_of(sm, aggregate)
+                incremental = self._m is not None and structure == self._structure
+                if incremental:
+                    self._update(sm, aggregate)
+                else:
+                    self._rebuild(sm, aggregate)
+                    self._structure = structure
+            with timer.phase('optimize'):
+                res = GurobiBackend().run(self._m, self._x, time_limit, iis=True, constrs=self._constrs,
+                                          progress=progress, cancel=cancel)
+            if 'iis_time' in res:
+                timer.add('iis', res['iis_time'])
+                timer.add('optimize', -res['iis_time'])
+            self.solves += 1
 
+            if res['status'] == 'optimal':
+                with timer.phase('extract'):
+                    solution = sm._solution(res['x'], self._problem)
+                return {'status': 'optimal', 'obj': res['obj'],
+                        'solution': solution,
+                        'runtime': res['runtime'],
+                        'formulation': 'aggregated' if aggregate else 'agents',
+                        'backend': 'gurobi', 'incremental': incremental,
+                        'size': self._problem.size()}
+            elif res['status'] == 'infeasible':
+                return sm._infeasible(iis=res.get('iis'), aggregate=aggregate)
+            elif res['status'] in ('interrupted', 'time_limit'):
+                return sm._incumbent(res, self._problem, aggregate, 'gurobi')
+            else:
+                return {'status': 'error', 'message': res.get('message', res['status'])}
         except Exception as ex:
             return {'status': 'error', 'message': str(ex)}
+
+
+def compare_builders(E: int = 100, D: int = 31, S: int = 8, max_shifts: int = 22,
+                     repeat: int = 3) -> Dict[str, Any]:
+    # Compare le temps de construction (boucles vs matrices) et vérifie que les deux
+    # constructions donnent le même modèle (tailles, coefficients, seconds membres).
+    if GurobiModel is None:
+        return {'status': 'error', 'message': 'gurobipy non installé ou licence manquante'}
+    demand = np.full((D, S), max(1, E // (2 * S)), dtype=int)
+    sm = SchedulingModel(E, D, S, demand, max_shifts)
+
+    times, models = {}, {}
+    for builder in ("loops", "matrix"):
+        best = float("inf")
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            if builder == "loops":
+                m = GurobiModel(f"build_{builder}")
+                m.setParam('OutputFlag', 0)
+                sm._build_loops(m)
+            else:
+                m, _, _ = GurobiBackend().build(sm._problem())
+            m.update()
+            best = min(best, time.perf_counter() - t0)
+            models[builder] = m
+        times[builder] = best
+
+    def signature(m):
+        A = m.getA().tocsr()
+        A.sort_indices()
+        return (m.NumVars, m.NumConstrs, m.NumNZs,
+                np.asarray(m.getAttr("Obj", m.getVars())),
+                np.asarray(m.getAttr("RHS", m.getConstrs())),
+                m.getAttr("Sense", m.getConstrs()),
+                A)
+
+    a, b = signature(models["loops"]), signature(models["matrix"])
+    # Même ordre des variables ; les lignes sont groupées par famille dans les deux cas
+    same = (a[:3] == b[:3] and np.allclose(a[3], b[3]) and np.allclose(a[4], b[4])
+            and a[5] == b[5] and (a[6] != b[6]).nnz == 0)
+    return {'E': E, 'D': D, 'S': S,
+            'loops': times["loops"], 'matrix': times["matrix"],
+            'speedup': times["loops"] / max(times["matrix"], 1e-9),
+            'same_model': bool(same)}
+
+
+if __name__ == "__main__":
+    res = compare_builders()
+    print(f"E={res['E']} D={res['D']} S={res['S']} : boucles {res['loops']:.3f} s, "
+          f"matrices {res['matrix']:.3f} s (x{res['speedup']:.1f}), "
+          f"modèle identique : {res['same_model']}")
@@ -0,0 +1,223 @@
+# multisite.py – plusieurs centres d'appels partageant une partie de leurs agents
+# Décomposition lagrangienne : les contraintes des agents partagés qui lient les sites
+# (un quart par jour, pas de nuit → matin, max quarts sur l'horizon) sont relâchées avec
+# des multiplicateurs ; chaque site devient un SchedulingModel indépendant (agents locaux +
+# copies des agents partagés aux coûts pénalisés), résolu en parallèle.
+#   borne inférieure : valeur du dual lagrangien (sous-gradient, pas de Polyak) ;
+#   borne supérieure : réparation séquentielle — les sites sont re-résolus l'un après l'autre,
+#   chacun ne disposant que de ce que les précédents ont laissé des agents partagés (jours,
+#   nuit → matin, budget) ; elle tourne pendant les sous-problèmes de l'itération suivante.
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Dict, Any, Sequence
+import numpy as np
+from model import SchedulingModel, expand_cost
+from backends import get_backend, init_worker, progress_info
+from instrumentation import emit, solve_record
+
+
+def _solve_site(demand, cost, budget, ub, backend, time_limit, threads):
+    # Un site : agents locaux puis agents partagés, ub (E, D, S) = cases autorisées
+    E, D, S = cost.shape
+    sm = SchedulingModel(E, D, S, demand, budget, cost)
+    if sm.presolve():
+        return {'status': 'infeasible'}
+    problem = sm._problem(aggregate=False)
+    problem.ub = np.minimum(problem.ub, ub.ravel())
+    res = get_backend(backend).solve(problem, time_limit=time_limit, threads=threads)
+    out = {'status': res['status'], 'runtime': res['runtime']}
+    if 'x' in res:
+        out.update(obj=res['obj'], bound=res.get('bound'),
+                   x=(res['x'].reshape(E, D, S) > 0.5).astype(np.uint8))
+    return out
+
+
+class _Site:
+    def __init__(self, spec, P, D, S):
+        self.name = spec.get('name', '')
+        self.demand = np.asarray(spec['demand'], dtype=np.int64).reshape(D, S)
+        self.E = int(spec['E'])
+        self.local_budget = np.broadcast_to(np.asarray(spec['max_shifts'], dtype=np.int64), (self.E,))
+        self.local_cost = expand_cost(spec.get('cost'), self.E, D, S)
+        self.shared_cost = expand_cost(spec.get('shared_cost', spec.get('cost')), P, D, S)
+
+    def job(self, adjust, shared_ub, shared_budget):
+        # Tenseurs complets (agents locaux, puis partagés) pour _solve_site
+        cost = np.concatenate([self.local_cost, self.shared_cost + adjust])
+        budget = np.concatenate([self.local_budget, shared_budget])
+        ub = np.concatenate([np.ones((self.E,) + shared_ub.shape[1:]), shared_ub])
+        return self.demand, cost, budget, ub
+
+    def true_cost(self, x):
+        # Coût d'origine (sans pénalités lagrangiennes) d'un planning du site
+        return float((self.local_cost * x[:self.E]).sum() + (self.shared_cost * x[self.E:]).sum())
+
+
+def _adjustment(lam_day, lam_nm, lam_b, S):
+    # Coût lagrangien ajouté à x[p, d, s] pour chaque copie d'un agent partagé
+    adj = np.broadcast_to((lam_day + lam_b[:, None])[:, :, None], lam_day.shape + (S,)).copy()
+    if S >= 2 and lam_day.shape[1] >= 2:
+        adj[:, :-1, S - 1] += lam_nm
+        adj[:, 1:, 0] += lam_nm
+    return adj
+
+
+def _violations(xs, budget, S):
+    # Sous-gradients : excès des contraintes couplantes (somme sur les sites des copies)
+    tot = np.sum(xs, axis=0, dtype=np.int64)                      # (P, D, S)
+    g_day = tot.sum(axis=2) - 1
+    g_nm = (tot[:, :-1, S - 1] + tot[:, 1:, 0] - 1) if S >= 2 else np.zeros((len(tot), 0))
+    g_b = tot.sum(axis=(1, 2)) - budget
+    return g_day, g_nm, g_b
+
+
+def solve_multisite(sites: Sequence[Dict[str, Any]], shared: int, shared_max_shifts,
+                    D: int, S: int, backend: Optional[str] = None,
+                    time_limit: Optional[float] = None, max_iter: int = 30, tol: float = 1e-3,
+                    workers: Optional[int] = None, threads: int = 1,
+                    sub_time_limit: Optional[float] = None, progress=None, cancel=None,
+                    log: bool = True) -> Dict[str, Any]:
+    # sites : [{'name', 'demand' (D, S), 'E' (agents locaux), 'max_shifts', 'cost',
+    #           'shared_cost' (coût des agents partagés sur ce site, défaut : cost)}]
+    # shared : nombre d'agents partagés ; shared_max_shifts : leur budget sur l'horizon (tous sites)
+    # Résultat : obj (meilleure solution), bound (dual lagrangien), gap, history (une entrée par
+    # itération), plannings par site (agents locaux puis partagés) et affectation des partagés.
+    t0 = time.perf_counter()
+    P = int(shared)
+    budget = np.broadcast_to(np.asarray(shared_max_shifts, dtype=np.int64), (P,)).copy()
+    sites = [_Site(spec, P, D, S) for spec in sites]
+    K = len(sites)
+    workers = max(1, min(workers or multiprocessing.cpu_count(), 2 * K))
+    lam_day = np.zeros((P, D))
+    lam_nm = np.zeros((P, max(D - 1, 0))) if S >= 2 else np.zeros((P, 0))
+    lam_b = np.zeros(P)
+    full = np.ones((P, D, S))
+    best_lb, best_ub, best = -np.inf, np.inf, None
+    history = []
+    theta, stall = 2.0, 0
+    status, message = None, None
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=init_worker, initargs=(backend, threads)) as pool:
+        submit = lambda args: pool.submit(_solve_site, *args, backend, sub_time_limit, threads)
+
+        def run_repair(order, adj):
+            # Coûts pénalisés par λ (heuristique lagrangienne), évaluation au coût d'origine
+            nonlocal best_ub, best
+            ub, left = np.ones((P, D, S)), budget.copy()
+            fixed = [None] * K
+            for k in order:
+                # Un sous-problème arrêté par sa limite de temps fournit encore un planning réalisable
+                r = submit(sites[k].job(adj, ub, left)).result()
+                if 'x' not in r:
+                    return
+                fixed[k] = r['x']
+                x = r['x'][sites[k].E:]
+                ub[x.any(axis=2)] = 0.0
+                if S >= 2 and D >= 2:
+                    ub[:, 1:, 0][x[:, :-1, S - 1] > 0] = 0.0
+                    ub[:, :-1, S - 1][x[:, 1:, 0] > 0] = 0.0
+                left -= x.sum(axis=(1, 2), dtype=np.int64)
+            obj = sum(site.true_cost(x) for site, x in zip(sites, fixed))
+            if obj < best_ub:
+                best_ub, best = obj, fixed
+
+        repair = None
+        for it in range(max_iter):
+            if cancel is not None and cancel.is_set():
+                status = 'interrupted'
+                break
+            adj = _adjustment(lam_day, lam_nm, lam_b, S)
+            # Sous-problèmes lagrangiens de l'itération et réparation de la précédente : en même temps
+            jobs = [submit(site.job(adj, full, budget)) for site in sites]
+            if repair is not None:
+                run_repair(*repair)
+                repair = None
+            subs = [j.result() for j in jobs]
+
+            bad = [(site.name, r['status']) for site, r in zip(sites, subs) if 'x' not in r]
+            if bad:
+                statuses = {s for _, s in bad}
+                if 'infeasible' in statuses:
+                    status = 'infeasible'
+                elif statuses <= {'time_limit', 'interrupted'}:
+                    # Sous-problème arrêté avant toute solution : manque de temps, pas une erreur
+                    status = 'interrupted' if 'interrupted' in statuses else 'time_limit'
+                else:
+                    status = 'error'
+                message = ", ".join(f"{name or '?'} : {s}" for name, s in bad)
+                break
+            # Dual lagrangien : Σ sous-problèmes − Σ λ × second membre
+            lb = float(sum(r['obj'] if r['status'] == 'optimal' else (r.get('bound') or -np.inf)
+                           for r in subs) - lam_day.sum() - lam_nm.sum() - lam_b @ budget)
+            xs = [r['x'][site.E:] for site, r in zip(sites, subs)]
+            g_day, g_nm, g_b = _violations(xs, budget, S)
+            if max(g_day.max(initial=-1), g_nm.max(initial=-1), g_b.max(initial=-1)) <= 0:
+                # Solution relâchée compatible entre sites : solution réalisable
+                obj = sum(site.true_cost(r['x']) for site, r in zip(sites, subs))
+                if obj < best_ub:
+                    best_ub, best = obj, [r['x'] for r in subs]
+            if lb > best_lb + 1e-9:
+                best_lb, stall = lb, 0
+            else:
+                stall += 1
+                if stall >= 3:
+                    theta, stall = theta / 2, 0
+            gap = max(0.0, best_ub - best_lb) / max(abs(best_ub), 1e-10) if np.isfinite(best_ub) else None
+            history.append({'iter': it, 'lower': lb, 'best_lower': best_lb,
+                            'upper': best_ub if np.isfinite(best_ub) else None, 'gap': gap,
+                            'violation': int(np.maximum(g_day, 0).sum() + np.maximum(g_nm, 0).sum()
+                                             + np.maximum(g_b, 0).sum()),
+                            'elapsed': time.perf_counter() - t0})
+            if progress is not None:
+                progress(progress_info(history[-1]['upper'], best_lb, history[-1]['elapsed']))
+            if gap is not None and gap <= tol:
+                status = 'optimal'
+                break
+            if time_limit and time.perf_counter() - t0 >= time_limit:
+                status = 'time_limit'
+                break
+
+            # Pas de Polyak vers la meilleure borne supérieure (estimée tant qu'il n'y en a pas)
+            target = best_ub if np.isfinite(best_ub) else abs(best_lb) * 1.1 + 1.0
+            gp = [np.where((lam > 0) | (g > 0), g, 0) for lam, g in
+                  ((lam_day, g_day), (lam_nm, g_nm), (lam_b, g_b))]
+            norm = sum(float((g ** 2).sum()) for g in gp)
+            if norm > 0 and np.isfinite(lb):
+                step = theta * (target - lb) / norm
+                lam_day = np.maximum(0.0, lam_day + step * g_day)
+                lam_nm = np.maximum(0.0, lam_nm + step * g_nm)
+                lam_b = np.maximum(0.0, lam_b + step * g_b)
+            # Les sites qui utilisent le plus les agents partagés passent d'abord ; rotation
+            # à chaque itération pour varier les réparations
+            order = np.argsort([-int(x.sum()) for x in xs], kind='stable')
+            repair = (np.roll(order, -it), adj)
+        if repair is not None and status in (None, 'time_limit'):
+            run_repair(*repair)
+
+    gap = max(0.0, best_ub - best_lb) / max(abs(best_ub), 1e-10) if best is not None else None
+    if status is None:
+        status = 'optimal' if gap is not None and gap <= tol else 'iterations'
+    # Sans solution réalisable, le statut dit pourquoi la recherche s'est arrêtée (itérations,
+    # limite de temps, annulation) : ce n'est pas une erreur
+    out = {'status': status,
+           'obj': best_ub if best is not None else None,
+           'bound': best_lb if np.isfinite(best_lb) else None, 'gap': gap,
+           'history': history, 'iterations': len(history), 'workers': workers,
+           'runtime': time.perf_counter() - t0}
+    if message:
+        out['message'] = message
+    elif best is None and status != 'infeasible':
+        out['message'] = ("Aucune affectation réalisable des agents partagés trouvée "
+                          f"({len(history)} itérations) : augmenter max_iter ou time_limit")
+    if best is not None:
+        out['sites'] = {site.name: x[:site.E] for site, x in zip(sites, best)}
+        shared_x = np.stack([x[site.E:] for site, x in zip(sites, best)])   # (K, P, D, S)
+        works = shared_x.any(axis=3)
+        out['shared'] = {'site': np.where(works.any(axis=0), works.argmax(axis=0), -1),
+                         'shift': np.where(works.any(axis=0), shared_x.sum(axis=0).argmax(axis=2), -1)}
+    if log:
+        emit(solve_record(out, model='multisite', sites=K, shared=P, D=D, S=S,
+                          iterations=len(history), gap=gap))
+    return out
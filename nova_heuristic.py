@@ -0,0 +1,89 @@
+# nova_heuristic.py – ordonnancement par liste pour l'Atelier NOVA (chaînes de précédence)
+# Donne en quelques millisecondes un planning complet : borne supérieure du makespan,
+# horizon pour les M du modèle exact et solution initiale (MIP start).
+import time
+from typing import Dict, List, Any
+import numpy as np
+
+# Règles de priorité : chemin critique restant, durée de la tâche (LPT), travail restant ;
+# 'projets' : projets entiers enchaînés sur une équipe (LPT, l'ancienne borne d'horizon)
+RULES = ('critical_path', 'lpt', 'work', 'projets')
+
+
+def _schedule(chains, durations, T, rule):
+    # Génération série : à chaque pas, la tâche prête le plus tôt (priorité en cas d'égalité)
+    # est placée sur l'équipe libre qui laisse le moins de temps mort
+    n = len(durations)
+    start = np.zeros(n)
+    team = np.zeros(n, dtype=int)
+    free = np.zeros(T)                       # date de fin de la dernière tâche de chaque équipe
+    nxt = [0] * len(chains)                  # prochaine tâche de chaque projet
+    ready = np.zeros(len(chains))            # fin de la tâche précédente du projet
+    tails = [np.cumsum(durations[ops][::-1])[::-1] for ops in chains]
+    for _ in range(n):
+        best, key = None, None
+        for c, ops in enumerate(chains):
+            if nxt[c] >= len(ops):
+                continue
+            i = ops[nxt[c]]
+            est = max(ready[c], free.min())
+            prio = {'critical_path': tails[c][nxt[c]], 'lpt': durations[i],
+                    'work': tails[c][nxt[c]] * len(ops)}[rule]
+            k = (est, -prio, c)
+            if key is None or k < key:
+                best, key = c, k
+        c = best
+        i = chains[c][nxt[c]]
+        est = key[0]
+        # Équipe libre au plus tard avant est (meilleur ajustement), sinon la plus tôt libre
+        fits = np.flatnonzero(free <= est)
+        k = fits[np.argmax(free[fits])] if len(fits) else int(np.argmin(free))
+        start[i] = max(est, free[k])
+        team[i] = k
+        free[k] = ready[c] = start[i] + durations[i]
+        nxt[c] += 1
+    return start, team, float((start + durations).max(initial=0.0))
+
+
+def _whole_projects(chains, durations, T):
+    # Le plus long projet d'abord, sur l'équipe la moins chargée
+    start = np.zeros(len(durations))
+    team = np.zeros(len(durations), dtype=int)
+    load = np.zeros(T)
+    for ops in sorted(chains, key=lambda ops: -durations[ops].sum()):
+        k = int(np.argmin(load))
+        start[ops] = load[k] + np.concatenate([[0.0], np.cumsum(durations[ops])[:-1]])
+        team[ops] = k
+        load[k] += durations[ops].sum()
+    return start, team, float(load.max(initial=0.0))
+
+
+def _relabel(team):
+    # Équipes numérotées dans l'ordre de première utilisation : l'opération i utilise
+    # alors une équipe <= i (compatible avec la brisure de symétrie du modèle exact)
+    order = {}
+    for k in team:
+        order.setdefault(int(k), len(order))
+    return np.array([order[int(k)] for k in team], dtype=int)
+
+
+def list_schedule(projects: Dict[str, List[float]], nb_teams: int) -> Dict[str, Any]:
+    # Même format que NovaModel.solve : starts / teams par (projet, tâche), makespan
+    t0 = time.perf_counter()
+    ops = [(p, t) for p, ts in projects.items() for t in range(len(ts))]
+    durations = np.array([projects[p][t] for p, t in ops], dtype=float)
+    pos = {op: i for i, op in enumerate(ops)}
+    chains = [np.array([pos[(p, t)] for t in range(len(ts))], dtype=int) for p, ts in projects.items()]
+    best = None
+    for rule in RULES:
+        start, team, makespan = (_whole_projects(chains, durations, nb_teams) if rule == 'projets'
+                                 else _schedule(chains, durations, nb_teams, rule))
+        if best is None or makespan < best[2]:
+            best = (start, team, makespan, rule)
+    start, team, makespan, rule = best
+    team = _relabel(team)
+    return {'status': 'heuristic', 'makespan': makespan, 'rule': rule,
+            'starts': {op: float(start[i]) for i, op in enumerate(ops)},
+            'teams': {op: int(team[i]) for i, op in enumerate(ops)},
+            'start_vector': start, 'team_vector': team,
+            'runtime': time.perf_counter() - t0}
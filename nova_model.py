@@ -0,0 +1,234 @@
+# nova_model.py – modèle de makespan de l'Atelier NOVA, indépendant du solveur
+from typing import Dict, List, Optional, Any
+import numpy as np
+from backends import LinearProblem, get_backend
+from nova_heuristic import list_schedule
+from instrumentation import PhaseTimer, profiled, emit, solve_record
+
+
+class NovaModel:
+    # projects : {nom du projet: [durée tâche 1, durée tâche 2, ...]} (tâches séquentielles)
+    def __init__(self, projects: Dict[str, List[float]], nb_teams: int):
+        self.projects = projects
+        self.nb_teams = nb_teams
+        # Opérations à plat, dans l'ordre des projets puis des tâches
+        self.ops = [(p, t) for p, ts in projects.items() for t in range(len(ts))]
+        self.durations = np.array([projects[p][t] for p, t in self.ops], dtype=float)
+        self._heuristic = None
+
+    def _chains(self):
+        # Positions des opérations de chaque projet, dans l'ordre des tâches
+        pos = {op: i for i, op in enumerate(self.ops)}
+        return [np.array([pos[(p, t)] for t in range(len(ts))], dtype=int)
+                for p, ts in self.projects.items()]
+
+    def heuristic(self) -> Dict[str, Any]:
+        # Ordonnancement par liste (nova_heuristic.py), calculé une seule fois
+        if self._heuristic is None:
+            self._heuristic = list_schedule(self.projects, self.nb_teams)
+        return self._heuristic
+
+    def horizon(self) -> float:
+        # Borne supérieure valide du makespan : celui du planning heuristique (jamais pire
+        # que la répartition LPT de projets entiers, qui fait partie des candidats)
+        return self.heuristic()['makespan']
+
+    def build(self, horizon: Optional[float] = None) -> LinearProblem:
+        # Formulation compacte :
+        #   - une seule variable d'ordre y_ab par paire d'opérations de projets différents
+        #     (les tâches d'un même projet sont déjà ordonnées par les précédences) ;
+        #   - z_ab = 1 si a et b sont sur la même équipe (z_ab >= X_ak + X_bk - 1) ;
+        #   - M tiré de l'horizon H et des dates au plus tôt, au lieu de 1e6 ;
+        #   - équipes identiques : l'opération i n'utilise que les équipes 0..i.
+        n, T = len(self.ops), self.nb_teams
+        d = self.durations
+        H = float(horizon) if horizon is not None else self.horizon()
+        chains = self._chains()
+        est, tail = np.zeros(n), np.zeros(n)      # début au plus tôt, durée restante du projet
+        project = np.zeros(n, dtype=int)
+        for c, ops in enumerate(chains):
+            est[ops] = np.concatenate([[0.0], np.cumsum(d[ops])[:-1]])
+            tail[ops] = np.cumsum(d[ops][::-1])[::-1]
+            project[ops] = c
+
+        p = LinearProblem("NOVA")
+        S = p.add_vars(n, lb=est, ub=H - tail)                       # début de chaque opération
+        ub_team = (np.arange(T)[None, :] <= np.arange(n)[:, None]).astype(float)
+        X = p.add_vars(n * T, lb=0.0, ub=ub_team.ravel(), integer=True).reshape(n, T)
+        # Cmax >= plus long projet et >= charge moyenne par équipe
+        lower = max(max((d[ops].sum() for ops in chains), default=0.0), d.sum() / T)
+        Cmax = p.add_vars(1, lb=min(lower, H), ub=H, obj=1.0)[0]
+
+        # Chaque tâche est affectée à exactement une équipe
+        p.add_constrs("affectation", np.repeat(np.arange(n), T), X.ravel(), 1.0, '=', np.ones(n))
+
+        # Précédences dans un projet, et Cmax après la dernière tâche de chaque projet
+        prev = np.concatenate([ops[:-1] for ops in chains])
+        nxt = np.concatenate([ops[1:] for ops in chains])
+        last = np.array([ops[-1] for ops in chains], dtype=int)
+        k = len(prev)
+        p.add_constrs("precedence", np.tile(np.arange(k), 2), np.concatenate([nxt, prev]),
+                      np.concatenate([np.ones(k), -np.ones(k)]), '>', d[prev])
+        q = len(last)
+        p.add_constrs("makespan", np.tile(np.arange(q), 2), np.concatenate([np.full(q, Cmax), S[last]]),
+                      np.concatenate([np.ones(q), -np.ones(q)]), '>', d[last])
+
+        # Charge de chaque équipe : Cmax >= somme des durées qui lui sont affectées
+        p.add_constrs("charge_equipe", np.concatenate([np.repeat(np.arange(T), n), np.arange(T)]),
+                      np.concatenate([X.T.ravel(), np.full(T, Cmax)]),
+                      np.concatenate([np.tile(-d, T), np.ones(T)]), '>', np.zeros(T))
+
+        # Paires d'opérations de projets différents
+        a, b = np.triu_indices(n, 1)
+        keep = project[a] != project[b]
+        a, b = a[keep], b[keep]
+        m = len(a)
+        y = z = np.zeros(0, dtype=int)
+        if m:
+            y = p.add_vars(m, lb=0.0, ub=1.0, integer=True)          # 1 : a avant b
+            z = p.add_vars(m, lb=0.0, ub=1.0)                        # 1 : même équipe
+            # z_ab >= X_ak + X_bk - 1 pour chaque équipe k autorisée aux deux
+            kk = np.arange(T)
+            ok = (kk[None, :] <= a[:, None]) & (kk[None, :] <= b[:, None])
+            pi, ki = np.nonzero(ok)
+            r = np.arange(len(pi))
+            p.add_constrs("meme_equipe", np.tile(r, 3),
+                          np.concatenate([z[pi], X[a[pi], ki], X[b[pi], ki]]),
+                          np.concatenate([np.ones(len(pi)), -np.ones(len(pi)), -np.ones(len(pi))]),
+                          '>', -np.ones(len(pi)))
+            # a avant b : S_b >= S_a + d_a - M_ab (1 - y) - M_ab (1 - z), M_ab = H - est_b
+            # b avant a : S_a >= S_b + d_b - M_ba y - M_ba (1 - z),       M_ba = H - est_a
+            Mab, Mba = H - est[b], H - est[a]
+            r = np.tile(np.arange(m), 4)
+            ones = np.ones(m)
+            p.add_constrs("ordre_ab", r, np.concatenate([S[b], S[a], y, z]),
+                          np.concatenate([ones, -ones, -Mab, -Mab]), '>', d[a] - 2 * Mab)
+            p.add_constrs("ordre_ba", r, np.concatenate([S[a], S[b], y, z]),
+                          np.concatenate([ones, -ones, Mba, -Mba]), '>', d[b] - Mba)
+
+        p.meta = {'S': S, 'X': X, 'Cmax': Cmax, 'horizon': H, 'pairs': (a, b, y, z)}
+        return p
+
+    def _warm_start(self, problem, sched):
+        # MIP start complet (S, X, Cmax, y, z) tiré d'un planning réalisable ; ses équipes
+        # sont numérotées par première utilisation, compatible avec la brisure de symétrie
+        meta = problem.meta
+        start = np.zeros(problem.num_vars)
+        S, team = sched['start_vector'], sched['team_vector']
+        start[meta['S']] = S
+        start[meta['X'][np.arange(len(team)), team]] = 1.0
+        start[meta['Cmax']] = sched['makespan']
+        a, b, y, z = meta['pairs']
+        start[y] = S[a] <= S[b]
+        start[z] = team[a] == team[b]
+        problem.start = start
+
+    def build_bigm(self) -> LinearProblem:
+        # Formulation historique (une variable y par paire et par équipe, big-M = 1e6),
+        # conservée pour compare_formulations
+        n, T = len(self.ops), self.nb_teams
+        bigM = 1e6
+        p = LinearProblem("NOVA")
+        S = p.add_vars(n, lb=0.0)                                    # début de chaque opération
+        X = p.add_vars(n * T, lb=0.0, ub=1.0, integer=True).reshape(n, T)  # affectation aux équipes
+        Cmax = p.add_vars(1)[0]
+        p.c[Cmax] = 1.0
+        p.ub[S[0]] = 0.0   # la première tâche du premier projet démarre à 0
+
+        # Chaque tâche est affectée à exactement une équipe
+        p.add_constrs("affectation", np.repeat(np.arange(n), T), X.ravel(), 1.0, '=', np.ones(n))
+
+        # Précédences dans un projet, et Cmax après la dernière tâche de chaque projet
+        pos = {op: i for i, op in enumerate(self.ops)}
+        prev, nxt, last = [], [], []
+        for proj, tasks in self.projects.items():
+            for t in range(1, len(tasks)):
+                prev.append(pos[(proj, t - 1)]); nxt.append(pos[(proj, t)])
+            last.append(pos[(proj, len(tasks) - 1)])
+        prev, nxt, last = np.array(prev, dtype=int), np.array(nxt, dtype=int), np.array(last, dtype=int)
+        k = len(prev)
+        p.add_constrs("precedence", np.tile(np.arange(k), 2), np.concatenate([nxt, prev]),
+                      np.concatenate([np.ones(k), -np.ones(k)]), '>', self.durations[prev])
+        q = len(last)
+        p.add_constrs("makespan", np.tile(np.arange(q), 2), np.concatenate([np.full(q, Cmax), S[last]]),
+                      np.concatenate([np.ones(q), -np.ones(q)]), '>', self.durations[last])
+
+        # Disjonctions big-M : une variable y par paire d'opérations et par équipe
+        #   S_b >= S_a + d_a - M (3 - X_a - X_b - (1 - y))
+        #   S_a >= S_b + d_b - M (3 - X_a - X_b - y)
+        a, b = np.triu_indices(n, 1)
+        npairs = len(a)
+        for team in range(T):
+            y = p.add_vars(npairs, lb=0.0, ub=1.0, integer=True)
+            r = np.arange(npairs)
+            rows = np.tile(r, 5)
+            ones = np.ones(npairs)
+            cols = np.concatenate([S[b], S[a], X[a, team], X[b, team], y])
+            vals = np.concatenate([ones, -ones, -bigM * ones, -bigM * ones, bigM * ones])
+            p.add_constrs(f"ordre_ab_{team}", rows, cols, vals, '>', self.durations[a] - 2 * bigM)
+            vals = np.concatenate([-ones, ones, -bigM * ones, -bigM * ones, -bigM * ones])
+            p.add_constrs(f"ordre_ba_{team}", rows, cols, vals, '>', self.durations[b] - 3 * bigM)
+
+        p.meta = {'S': S, 'X': X, 'Cmax': Cmax}
+        return p
+
+    def solve(self, backend: Optional[str] = None, time_limit: Optional[float] = None,
+              progress=None, cancel=None, log: bool = True) -> Dict[str, Any]:
+        # progress / cancel : voir backends.py (statut 'interrupted' avec la meilleure solution)
+        timer = PhaseTimer()
+        with profiled("nova"):
+            out = self._solve(timer, backend, time_limit, progress, cancel)
+        out['phases'] = timer.phases
+        if log:
+            emit(solve_record(out, model='nova', ops=len(self.ops), teams=self.nb_teams,
+                              makespan=out.get('makespan'), wall=timer.wall))
+        return out
+
+    def _solve(self, timer, backend, time_limit, progress, cancel):
+        try:
+            engine = get_backend(backend)
+            with timer.phase('heuristic'):
+                sched = self.heuristic()
+            with timer.phase('build'):
+                problem = self.build()
+                self._warm_start(problem, sched)
+            with timer.phase('optimize'):
+                res = engine.solve(problem, time_limit=time_limit, progress=progress, cancel=cancel)
+            timer.add('build', res.get('build_time', 0.0))
+            timer.add('optimize', -res.get('build_time', 0.0))
+        except Exception as ex:
+            return {'status': 'error', 'message': str(ex)}
+        out = {'status': res['status'], 'runtime': res['runtime'], 'backend': engine.name,
+               'size': problem.size()}
+        if 'x' in res:
+            with timer.phase('extract'):
+                x, meta = res['x'], problem.meta
+                teams = np.argmax(x[meta['X']], axis=1)
+                out.update(makespan=float(x[meta['Cmax']]),
+                           starts={op: float(x[i]) for op, i in zip(self.ops, meta['S'])},
+                           teams={op: int(teams[i]) for i, op in enumerate(self.ops)})
+            if out['makespan'] > sched['makespan'] + 1e-9:
+                x = None   # incumbent du solveur moins bon que l'heuristique (HiGHS sans MIP start)
+        else:
+            x = None
+        if x is None and res['status'] in ('time_limit', 'interrupted'):
+            # Résolution coupée : on rend le planning heuristique plutôt que rien
+            out.update(makespan=sched['makespan'], starts=sched['starts'], teams=sched['teams'],
+                       source='heuristic')
+        elif res['status'] == 'error':
+            out['message'] = res.get('message', '')
+        return out
+
+
+def compare_formulations(projects: Dict[str, List[float]], nb_teams: int,
+                         backend: Optional[str] = None, time_limit: Optional[float] = 60) -> Dict[str, Any]:
+    # Taille et temps de résolution : formulation big-M historique vs formulation compacte
+    nova = NovaModel(projects, nb_teams)
+    engine = get_backend(backend)
+    out = {}
+    for name, problem in (('bigm', nova.build_bigm()), ('compact', nova.build())):
+        res = engine.solve(problem, time_limit=time_limit)
+        out[name] = {**problem.size(), 'binaries': int(problem.integer.sum()),
+                     'status': res['status'], 'runtime': res['runtime'],
+                     'makespan': float(res['x'][problem.meta['Cmax']]) if 'x' in res else None}
+    return out
@@ -0,0 +1,124 @@
+# presolve.py – preuves d'infaisabilité rapides, avant tout PLNE (quelques millisecondes) :
+# tests analytiques, puis relaxation linéaire du flot agrégé par classes d'agents.
+# Chaque conflit désigne les jours / quarts qui rendent l'instance impossible.
+from typing import List, Dict, Any, Optional
+import numpy as np
+import scipy.sparse as sp
+from scipy.optimize import linprog
+
+
+def _conflict(kind, days, shifts, need, capacity, message):
+    return {'kind': kind, 'days': [int(d) for d in days], 'shifts': [int(s) for s in shifts],
+            'need': int(need), 'capacity': int(capacity), 'message': message}
+
+
+def check_feasibility(demand, budget, prev_night: Optional[np.ndarray] = None,
+                      max_conflicts: int = 10) -> List[Dict[str, Any]]:
+    # demand : (D, S) ; budget : max quarts par agent (E,) ; prev_night : nuit la veille du jour 0
+    # Liste vide : aucune preuve d'infaisabilité (le modèle peut tout de même l'être)
+    demand = np.asarray(demand, dtype=np.int64)
+    budget = np.asarray(budget, dtype=np.int64)
+    D, S = demand.shape
+    prev_night = np.zeros(len(budget), dtype=bool) if prev_night is None else np.asarray(prev_night, dtype=bool)
+    active = budget > 0
+    E = int(active.sum())
+    conflicts = []
+
+    # 1. Effectif par jour : un agent fait au plus un quart par jour
+    per_day = demand.sum(axis=1)
+    for d in np.flatnonzero(per_day > E):
+        conflicts.append(_conflict('jour', [d], np.flatnonzero(demand[d]), per_day[d], E,
+                                   f"Jour {d+1} : {per_day[d]} quarts demandés pour {E} agents"))
+
+    # 2. Chaînes nuit → matin : la nuit du jour d et le matin du jour d+1 exigent des agents
+    #    distincts (avec les jours 1 et 2, c'est une condition suffisante hors budgets)
+    if S >= 2:
+        morning0 = E - int((prev_night & active).sum())
+        if demand[0, 0] > morning0:
+            conflicts.append(_conflict('nuit_matin', [0], [0], demand[0, 0], morning0,
+                                       f"Jour 1 matin : {demand[0, 0]} demandés, {morning0} agents "
+                                       f"sans nuit la veille"))
+        if D >= 2:
+            pair = demand[:-1, S - 1] + demand[1:, 0]
+            for d in np.flatnonzero(pair > E):
+                conflicts.append(_conflict('nuit_matin', [d, d + 1], [S - 1, 0], pair[d], E,
+                                           f"Nuit du jour {d+1} + matin du jour {d+2} : "
+                                           f"{pair[d]} agents distincts requis, {E} disponibles"))
+
+    # 3. Capacité sur toute fenêtre de w jours consécutifs : un agent y fait au plus min(budget, w)
+    #    quarts (w = D : capacité totale E × max_shifts). On signale la fenêtre la plus en défaut.
+    csum = np.concatenate([[0], np.cumsum(per_day)])
+    w = np.arange(1, D + 1)
+    cap = np.minimum(budget[active][None, :], w[:, None]).sum(axis=1)      # cap[w-1]
+    need = csum[None, 1:] - csum[:-1, None]                                 # need[i, j] : jours i..j
+    i, j = np.triu_indices(D)
+    excess = need[i, j] - cap[j - i]
+    if len(excess) and excess.max() > 0 and not any(c['kind'] == 'jour' for c in conflicts):
+        k = int(np.argmax(excess))
+        a, b = int(i[k]), int(j[k])
+        conflicts.append(_conflict('capacite', range(a, b + 1), range(S), need[a, b], cap[b - a],
+                                   f"Jours {a+1}–{b+1} : {need[a, b]} quarts demandés, capacité "
+                                   f"{cap[b - a]} avec les max quarts/agent"))
+
+    # 4. Flot agrégé : les contraintes précédentes réunies sur tout l'horizon (budgets par agent,
+    #    un quart par jour, chaînes nuit → matin, veille de nuit), là où les tests par paires ou
+    #    par fenêtre ne voient qu'une contrainte à la fois
+    if not conflicts and E:
+        found = _flow_conflict(demand, budget[active], prev_night[active])
+        if found is not None:
+            conflicts.append(found)
+    return conflicts[:max_conflicts]
+
+
+def _flow_conflict(demand, budget, prev_night, max_size: int = 50_000):
+    # Flot agrégé par classe d'agents (même budget, même veille de nuit ; n agents par classe) :
+    # y[c, d, s] agents de la classe c sur le quart s du jour d, avec au plus n par jour,
+    # nuit du jour d + matin du jour d+1 <= n, somme <= n × budget, pas de matin le jour 0 pour
+    # une classe de nuit la veille. La relaxation linéaire maximise la demande couverte ; tout
+    # planning réalisable y correspond, donc un maximum inférieur à la demande est une preuve.
+    # Les quarts en cause sont ceux dont la couverture a un coût marginal non nul.
+    D, S = demand.shape
+    keys, n = np.unique(np.stack([np.minimum(budget, D), prev_night]), axis=1, return_counts=True)
+    C = len(n)
+    if C * D * S > max_size:   # trop de classes distinctes : la preuve coûterait une résolution
+        return None
+    y = np.arange(C * D * S).reshape(C, D, S)
+    z = C * D * S + np.arange(D * S).reshape(D, S)
+    blocks = [(np.repeat(np.arange(C * D), S), y.ravel(), 1.0, np.repeat(n, D)),     # un quart par jour
+              (np.repeat(np.arange(C), D * S), y.ravel(), 1.0, n * keys[0])]           # budgets
+    if S >= 2 and D >= 2:
+        pairs = np.arange(C * (D - 1))
+        blocks.append((np.tile(pairs, 2), np.concatenate([y[:, :-1, S - 1].ravel(), y[:, 1:, 0].ravel()]),
+                       1.0, np.repeat(n, D - 1)))                                     # nuit → matin
+    cover = np.arange(D * S)
+    blocks.append((np.concatenate([cover, np.repeat(cover, C)]),
+                   np.concatenate([z.ravel(), y.transpose(1, 2, 0).ravel()]),
+                   np.concatenate([np.ones(D * S), -np.ones(D * S * C)]), np.zeros(D * S)))
+    rows, cols, vals, rhs, offset = [], [], [], [], 0
+    for r, c_, v, b in blocks:
+        rows.append(r + offset), cols.append(c_), vals.append(np.broadcast_to(v, r.shape)), rhs.append(b)
+        offset += len(b)
+    A = sp.csr_matrix((np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))),
+                      shape=(offset, C * D * S + D * S))
+    upper = np.concatenate([np.repeat(n, D * S).astype(float), demand.ravel().astype(float)])
+    if S >= 2:
+        upper[y[keys[1].astype(bool), 0, 0]] = 0.0
+    cost = np.concatenate([np.zeros(C * D * S), -np.ones(D * S)])
+    res = linprog(cost, A_ub=A, b_ub=np.concatenate(rhs).astype(float),
+                  bounds=np.column_stack([np.zeros(len(upper)), upper]), method='highs')
+    need = int(demand.sum())
+    if res.status != 0 or -res.fun >= need - 1e-6:
+        return None
+    capacity = int(np.floor(-res.fun + 1e-6))
+    dual = np.abs(res.ineqlin.marginals[offset - D * S:]).reshape(D, S)
+    dd, ss = np.nonzero((dual > 1e-9) & (demand > 0))
+    if not len(dd):
+        dd, ss = np.nonzero(demand > 0)
+    cells = ", ".join(f"j{d+1} q{s+1}" for d, s in zip(dd[:8], ss[:8])) + (" ..." if len(dd) > 8 else "")
+    return _conflict('flux', np.unique(dd), np.unique(ss), need, capacity,
+                     f"{need} quarts demandés, au plus {capacity} couvrables avec les budgets, un "
+                     f"quart par jour et les chaînes nuit → matin (quarts en cause : {cells})")
+
+
+def describe(conflicts: List[Dict[str, Any]]) -> str:
+    return "\n".join("   • " + c['message'] for c in conflicts)
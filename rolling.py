@@ -0,0 +1,118 @@
+# rolling.py – horizon glissant pour les longs horizons (trimestre, année)
+# On optimise des fenêtres qui se chevauchent, on fige le début de chaque fenêtre
+# et on transmet l'état de frontière : nuit de la veille et budget restant par agent.
+import time
+from typing import Optional, Dict, Any
+import numpy as np
+from model import SchedulingModel
+from instrumentation import PhaseTimer, emit, solve_record
+
+
+def _window_budget(remaining, length, days_left, pace):
+    # Rythme le budget : une fenêtre ne consomme pas tout le budget restant d'un coup
+    if not pace or days_left <= length:
+        return remaining
+    paced = np.ceil(remaining * length / days_left).astype(np.int64) + 1
+    return np.minimum(remaining, paced)
+
+
+def coverage_bound(model: SchedulingModel) -> Optional[float]:
+    # Borne inférieure sur tout l'horizon : chaque agent demandé coûte au moins le quart le
+    # moins cher parmi les agents (valide seulement pour des coûts positifs)
+    if (model.cost < 0).any():
+        return None
+    return float((model.demand * model.cost.min(axis=0)).sum())
+
+
+def solve_rolling(model: SchedulingModel, window: int = 14, commit: Optional[int] = None,
+                  backend: Optional[str] = None, time_limit: Optional[float] = None,
+                  pace: bool = True, progress=None, cancel=None, log: bool = True) -> Dict[str, Any]:
+    # window : jours optimisés par fenêtre ; commit : jours figés avant de glisser
+    # time_limit : par fenêtre ; une fenêtre arrêtée avec une solution garde cette solution
+    # progress / cancel : transmis à chaque fenêtre (une fenêtre annulée arrête tout)
+    E, D, S = model.E, model.D, model.S
+    commit = commit or max(1, window // 2)
+    if commit > window:
+        raise ValueError("commit doit être inférieur ou égal à window")
+    t0 = time.perf_counter()
+    timer = PhaseTimer()   # phases cumulées sur toutes les fenêtres
+    sol = np.zeros((E, D, S), dtype=np.uint8)
+    remaining = model.budget.copy()
+    prev_night = model.prev_night.copy()
+    windows, limited, solver_time = 0, 0, 0.0
+
+    start = 0
+    while start < D:
+        end = min(D, start + window)
+        length = end - start
+        res = None
+        for paced in ((True, False) if pace else (False,)):
+            budget = _window_budget(remaining, length, D - start, paced)
+            sub = SchedulingModel(E, length, S, model.demand[start:end], budget,
+                                  model.cost[:, start:end], prev_night=prev_night)
+            res = sub.solve(time_limit=time_limit, backend=backend, progress=progress, cancel=cancel,
+                            log=False)
+            timer.merge(res.get('phases'))
+            solver_time += res.get('runtime', 0.0)
+            if res['status'] in ('optimal', 'interrupted') or res.get('solution') is not None:
+                break
+        windows += 1
+        if res['status'] == 'time_limit' and res.get('solution') is not None:
+            limited += 1   # meilleure solution de la fenêtre, figée comme une optimale
+        elif res['status'] != 'optimal':
+            # Planning partiel inutilisable : seule la raison de l'arrêt est rendue
+            res = {k: v for k, v in res.items() if k not in ('solution', 'obj')}
+            res['message'] = (f"Fenêtre jours {start + 1}–{end} : "
+                              + res.get('message', res['status']))
+            res['window'] = (start, end)
+            res['phases'] = timer.phases
+            if log:
+                emit(solve_record(res, model='rolling', E=E, D=D, S=S, wall=timer.wall))
+            return res
+
+        x = np.asarray(res['solution'], dtype=np.uint8)
+        keep = length if end == D else commit
+        sol[:, start:start + keep] = x[:, :keep]
+        remaining -= x[:, :keep].sum(axis=(1, 2), dtype=np.int64)
+        if S >= 2:
+            prev_night = x[:, keep - 1, S - 1].astype(bool)
+        start += keep
+
+    # Fenêtres optimales une à une seulement : réalisable, sans preuve d'optimalité globale
+    obj = float((model.cost * sol).sum())
+    bound = coverage_bound(model)
+    gap = max(0.0, obj - bound) / max(abs(obj), 1e-10) if bound is not None else None
+    res = {'status': 'time_limit' if limited else 'feasible',
+           'obj': obj,
+           'bound': bound,
+           'gap': gap,
+           'solution': sol,
+           'runtime': time.perf_counter() - t0,
+           'solver_time': solver_time,
+           'windows': windows,
+           'time_limited': limited,
+           'formulation': 'rolling',
+           'phases': timer.phases}
+    if limited:
+        res['message'] = (f"Limite de temps atteinte dans {limited} fenêtre(s) sur {windows} : "
+                          "meilleure solution de ces fenêtres retenue")
+    if log:
+        emit(solve_record(res, model='rolling', E=E, D=D, S=S, wall=timer.wall))
+    return res
+
+
+def compare_rolling(model: SchedulingModel, window: int = 14, commit: Optional[int] = None,
+                    backend: Optional[str] = None, time_limit: Optional[float] = None) -> Dict[str, Any]:
+    # Écart entre horizon glissant et modèle complet (instances résolubles des deux façons)
+    t0 = time.perf_counter()
+    full = model.solve(time_limit=time_limit, backend=backend)
+    full_time = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    roll = solve_rolling(model, window, commit, backend, time_limit)
+    roll_time = time.perf_counter() - t0
+    out = {'full_status': full['status'], 'rolling_status': roll['status'],
+           'full_time': full_time, 'rolling_time': roll_time}
+    if full['status'] == 'optimal' and roll.get('solution') is not None:
+        out.update(full_obj=full['obj'], rolling_obj=roll['obj'],
+                   gap=(roll['obj'] - full['obj']) / max(abs(full['obj']), 1e-9))
+    return out
@@ -0,0 +1,135 @@
+# sweep.py – balayage des effectifs : combien d'agents au minimum pour couvrir la demande,
+# et à quel coût, pour plusieurs valeurs de max_shifts
+import math
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Dict, Any, Sequence
+import numpy as np
+from heuristic import heuristic_schedule
+from model import SchedulingModel, expand_cost, CostSpec
+from backends import init_worker
+from instrumentation import emit, solve_record
+
+
+def agents_lower_bound(demand, max_shifts: int) -> int:
+    # Bornes analytiques (sans solveur) : en dessous, le modèle est forcément infaisable
+    demand = np.asarray(demand, dtype=np.int64)
+    D, S = demand.shape
+    lb = max(int(demand.sum(axis=1).max(initial=0)),            # 1 quart max par jour
+             math.ceil(demand.sum() / max_shifts))                # capacité totale
+    if S >= 2 and D >= 2:
+        # La nuit du jour d et le matin du jour d+1 ne peuvent pas être tenus par le même agent
+        lb = max(lb, int((demand[:-1, S - 1] + demand[1:, 0]).max()))
+    return lb
+
+
+def _solve_point(demand, E, max_shifts, cost, backend, time_limit, threads):
+    if E == 0:
+        return {'status': 'optimal', 'obj': 0.0, 'runtime': 0.0}   # demande nulle : aucun agent
+    D, S = demand.shape
+    model = SchedulingModel(E, D, S, demand, max_shifts, cost)
+    res = model.solve(time_limit=time_limit, backend=backend, threads=threads, log=False)
+    return {k: res.get(k) for k in ('status', 'obj', 'runtime', 'message', 'backend',
+                                    'formulation', 'size', 'phases')}
+
+
+def _feasible(res):
+    # Planning réalisable trouvé (optimal, ou meilleure solution à la limite de temps)
+    return res['status'] in ('optimal', 'time_limit') and res.get('obj') is not None
+
+
+def _heuristic_upper(demand, max_shifts, cost, lo):
+    # Premier effectif pour lequel l'heuristique couvre toute la demande (faisabilité prouvée)
+    if lo == 0:
+        return 0
+    D, S = demand.shape
+    cap = max(lo, int(demand.sum()))   # un quart par agent : toujours faisable
+    E = lo
+    while True:
+        if heuristic_schedule(demand, expand_cost(cost, E, D, S), max_shifts)['feasible']:
+            return E
+        if E >= cap:
+            return cap
+        E = min(cap, E + max(1, E // 8))
+
+
+def sweep_staffing(demand, max_shifts_values: Sequence[int], cost: CostSpec = None, extra: int = 4,
+                   agent_cost: float = 0.0, backend: Optional[str] = None,
+                   time_limit: Optional[float] = None, workers: Optional[int] = None,
+                   threads: int = 1) -> Dict[str, Any]:
+    # Pour chaque max_shifts : recherche k-aire de l'effectif minimal (k = nombre de
+    # processus), puis frontière coût/effectif sur [E_min, E_min + extra].
+    # agent_cost : coût fixe par agent ajouté au coût des quarts (total = obj + agent_cost × E)
+    # Seul un statut 'infeasible' relève la borne basse : un effectif non tranché (limite de
+    # temps sans solution, erreur) reste dans 'unresolved' et le statut devient 'time_limit'.
+    t0 = time.perf_counter()
+    demand = np.asarray(demand, dtype=np.int64)
+    workers = max(1, workers or multiprocessing.cpu_count())
+    results = {}   # (max_shifts, E) → résultat
+    min_agents = {}
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=init_worker, initargs=(backend, threads)) as pool:
+        def run(points):
+            jobs = {p: pool.submit(_solve_point, demand, p[1], p[0], cost, backend, time_limit, threads)
+                    for p in points if p not in results}
+            for p, job in jobs.items():
+                results[p] = job.result()
+                emit(solve_record(results[p], model='scheduling', source='sweep', E=p[1],
+                                  D=demand.shape[0], S=demand.shape[1], max_shifts=p[0]))
+
+        # 1. Effectif minimal par max_shifts : toutes les valeurs de max_shifts avancent ensemble
+        bounds = {}
+        for ms in max_shifts_values:
+            lo = agents_lower_bound(demand, ms)
+            bounds[ms] = [lo, _heuristic_upper(demand, ms, cost, lo)]   # lo..hi, hi faisable
+        def untried(ms):
+            lo, hi = bounds[ms]
+            return [E for E in range(lo, hi) if (ms, E) not in results]
+
+        while True:
+            todo = {ms: untried(ms) for ms in bounds}
+            active = [ms for ms in bounds if todo[ms]]
+            if not active:
+                break
+            points = []
+            k = max(1, workers // len(active))
+            for ms in active:
+                cand = todo[ms]
+                pick = np.unique(np.linspace(0, len(cand) - 1, min(k, len(cand))).round().astype(int))
+                points += [(ms, cand[i]) for i in pick]
+            run(points)
+            for ms in active:
+                lo, hi = bounds[ms]
+                for E in range(lo, hi):
+                    res = results.get((ms, E))
+                    if res is None:
+                        continue
+                    if _feasible(res):
+                        hi = min(hi, E)
+                    elif res['status'] == 'infeasible':
+                        lo = max(lo, E + 1)
+                bounds[ms] = [lo, max(lo, hi)]
+        unresolved = {}
+        for ms, (lo, hi) in bounds.items():
+            min_agents[ms] = hi
+            if lo < hi:
+                unresolved[ms] = list(range(lo, hi))   # minimum réel dans [lo, hi]
+
+        # 2. Frontière coût / effectif au-delà du minimum
+        run([(ms, E) for ms, E_min in min_agents.items() for E in range(E_min, E_min + extra + 1)])
+
+    points = []
+    for (ms, E), res in sorted(results.items()):
+        point = {'max_shifts': ms, 'E': E, 'status': res['status'], 'obj': res.get('obj')}
+        if _feasible(res):
+            point['total'] = res['obj'] + agent_cost * E
+        points.append(point)
+    out = {'status': 'time_limit' if unresolved else 'optimal', 'points': points,
+           'min_agents': min_agents, 'unresolved': unresolved, 'agent_cost': agent_cost,
+           'solves': len(results), 'runtime': time.perf_counter() - t0}
+    if unresolved:
+        out['message'] = "Effectif minimal non prouvé pour max quarts " + ", ".join(
+            f"{ms} (entre {E[0]} et {min_agents[ms]})" for ms, E in sorted(unresolved.items()))
+    return out
@@ -0,0 +1,46 @@
+# Les modules du projet sont à la racine du dépôt ; les tests n'utilisent que HiGHS
+# (pas de dépendance à la licence Gurobi limitée en taille) et n'écrivent aucun journal.
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import instrumentation  # noqa: E402
+
+BACKEND = 'highs'
+
+
+@pytest.fixture(autouse=True, scope="session")
+def _no_solve_log():
+    instrumentation.configure(None)
+    instrumentation.set_profiling(False)
+
+
+def roster_violations(model, sol):
+    # Contraintes de SchedulingModel non respectées par un planning (E, D, S) ; [] si réalisable
+    sol = np.asarray(sol, dtype=np.int64)
+    E, D, S = model.E, model.D, model.S
+    out = []
+    if sol.shape != (E, D, S):
+        return [f"forme {sol.shape} au lieu de {(E, D, S)}"]
+    if (sol.sum(axis=2) > 1).any():
+        out.append("plus d'un quart par jour")
+    if S >= 2 and D >= 2 and (sol[:, :-1, S - 1] + sol[:, 1:, 0] > 1).any():
+        out.append("nuit suivie d'un matin")
+    if S >= 2 and sol[model.prev_night, 0, 0].any():
+        out.append("matin du jour 1 après la nuit de la veille")
+    if (sol.sum(axis=0) < model.demand).any():
+        out.append("demande non couverte")
+    if (sol.sum(axis=(1, 2)) > model.budget).any():
+        out.append("max quarts dépassé")
+    return out
+
+
+@pytest.fixture
+def check_roster():
+    def check(model, sol):
+        assert roster_violations(model, sol) == []
+    return check
@@ -0,0 +1,97 @@
+import threading
+import numpy as np
+import pytest
+import backends
+from backends import GurobiBackend, LinearProblem, get_backend
+from conftest import BACKEND
+from model import SchedulingModel
+
+
+def knapsack():
+    # max 5a + 4b + 3c  s.c.  2a + 3b + c <= 5, 4a + b + 2c <= 11, 3a + 4b + 2c <= 8, entiers
+    p = LinearProblem("sac")
+    x = p.add_vars(3, lb=0.0, ub=10.0, integer=True, obj=[-5.0, -4.0, -3.0])
+    p.add_block("cap", np.array([[2, 3, 1], [4, 1, 2], [3, 4, 2]]), '<', [5, 11, 8])
+    return p, x
+
+
+def test_highs_solves_integer_problem():
+    p, _ = knapsack()
+    res = get_backend(BACKEND).solve(p)
+    assert res['status'] == 'optimal'
+    assert res['obj'] == pytest.approx(-13.0)
+    np.testing.assert_allclose(res['x'], [2, 0, 1], atol=1e-6)
+
+
+def test_triplet_constraints_match_block():
+    p, x = knapsack()
+    q = LinearProblem("sac")
+    q.add_vars(3, lb=0.0, ub=10.0, integer=True, obj=[-5.0, -4.0, -3.0])
+    rows, cols = np.nonzero(np.array([[2, 3, 1], [4, 1, 2], [3, 4, 2]]))
+    q.add_constrs("cap", rows, cols, np.array([[2, 3, 1], [4, 1, 2], [3, 4, 2]])[rows, cols], '<', [5, 11, 8])
+    assert q.size() == p.size()
+    assert get_backend(BACKEND).solve(q)['obj'] == pytest.approx(-13.0)
+
+
+def test_infeasible_problem():
+    p = LinearProblem()
+    p.add_vars(2, ub=1.0, integer=True)
+    p.add_constrs("trop", [0, 0], [0, 1], 1.0, '>', [3.0])
+    assert get_backend(BACKEND).solve(p)['status'] == 'infeasible'
+
+
+def test_cancel_before_start_is_interrupted():
+    p, _ = knapsack()
+    cancel = threading.Event()
+    cancel.set()
+    assert get_backend(BACKEND).solve(p, cancel=cancel)['status'] == 'interrupted'
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        get_backend("cplex")
+
+
+@pytest.fixture
+def size_limited_gurobi(monkeypatch):
+    # Licence pip limitée en taille : l'environnement démarre, l'optimisation est refusée
+    gp = pytest.importorskip("gurobipy")
+
+    def too_large(self, *args, **kwargs):
+        raise gp.GurobiError(gp.GRB.Error.SIZE_LIMIT_EXCEEDED,
+                             "Model too large for size-limited license")
+    monkeypatch.setattr(GurobiBackend, "available", lambda self: True)
+    monkeypatch.setattr(GurobiBackend, "build", too_large)
+    return gp
+
+
+def test_automatic_choice_falls_back_to_highs_on_size_limit(size_limited_gurobi):
+    p, _ = knapsack()
+    res = get_backend().solve(p)
+    assert res['status'] == 'optimal' and res['backend'] == 'highs'
+    assert res['obj'] == pytest.approx(-13.0)
+    assert 'fallback' in res
+    # Gurobi demandé explicitement : pas de repli silencieux
+    with pytest.raises(size_limited_gurobi.GurobiError):
+        get_backend('gurobi').solve(p)
+
+
+def test_model_solve_reports_the_fallback(size_limited_gurobi, check_roster):
+    model = SchedulingModel(6, 5, 3, [[2, 1, 1], [1, 2, 1], [2, 1, 2], [1, 1, 1], [2, 2, 0]], 4)
+    res = model.solve()
+    assert res['status'] == 'optimal' and res['backend'] == 'highs'
+    assert 'fallback' in res
+    check_roster(model, res['solution'])
+    assert model.solve(backend='gurobi')['status'] == 'error'
+
+
+def test_unlicensed_gurobi_is_not_available(monkeypatch):
+    gp = pytest.importorskip("gurobipy")
+
+    def no_license(*args, **kwargs):
+        raise gp.GurobiError(gp.GRB.Error.NO_LICENSE, "No Gurobi license found")
+    monkeypatch.setattr(backends, "GurobiEnv", no_license)
+    monkeypatch.setattr(backends, "_default_env", None)
+    monkeypatch.setattr(GurobiBackend, "_licensed", None)
+    assert not GurobiBackend().available()
+    assert get_backend().name == 'highs'
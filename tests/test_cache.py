@@ -0,0 +1,33 @@
+import numpy as np
+from cache import SolutionCache
+from model import SchedulingModel
+
+DEMAND = [[1, 0, 1], [1, 1, 0]]
+
+
+def test_key_depends_on_prev_night():
+    plain = SchedulingModel(2, 2, 3, DEMAND, 2)
+    carried = SchedulingModel(2, 2, 3, DEMAND, 2, prev_night=[True, True])
+    assert SolutionCache.key(plain, 'highs') != SolutionCache.key(carried, 'highs')
+
+
+def test_key_depends_on_budget_vector():
+    a = SchedulingModel(2, 2, 3, DEMAND, [2, 1])
+    b = SchedulingModel(2, 2, 3, DEMAND, [1, 2])
+    assert SolutionCache.key(a, 'highs') != SolutionCache.key(b, 'highs')
+
+
+def test_key_same_for_equivalent_models():
+    a = SchedulingModel(2, 2, 3, DEMAND, 2)
+    b = SchedulingModel(2, 2, 3, np.array(DEMAND), [2, 2], prev_night=[False, False])
+    assert SolutionCache.key(a, 'highs') == SolutionCache.key(b, 'highs')
+
+
+def test_cached_roster_not_reused_across_prev_night(tmp_path):
+    cache = SolutionCache(directory=str(tmp_path))
+    first = cache.solve(SchedulingModel(2, 2, 3, [[2, 0, 0], [0, 0, 0]], 2), backend='highs')
+    assert first['status'] == 'optimal'
+    res = cache.solve(SchedulingModel(2, 2, 3, [[2, 0, 0], [0, 0, 0]], 2, prev_night=[True, True]),
+                      backend='highs')
+    assert not res.get('cached')
+    assert res['status'] == 'infeasible'
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+from colgen import solve_colgen, price
+from conftest import BACKEND
+from instances import scheduling_instance
+from model import SchedulingModel
+
+
+def identical_agents(seed):
+    inst = scheduling_instance(10, 7, 3, density=0.6, cost='night', seed=seed)
+    return SchedulingModel(**inst)
+
+
+def agent_classes(seed):
+    rng = np.random.default_rng(seed)
+    demand = rng.integers(1, 4, (7, 3))
+    return SchedulingModel(12, 7, 3, demand, 5, {'shift': [1.0, 1.1, 1.8], 'agent': rng.choice([1.0, 1.3], 12)})
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_colgen_matches_exact_model_with_identical_agents(seed, check_roster):
+    model = identical_agents(seed)
+    exact = model.solve(backend=BACKEND)
+    res = solve_colgen(model, backend=BACKEND)
+    assert exact['status'] == 'optimal'
+    assert res['status'] == 'optimal'
+    assert res['obj'] == pytest.approx(exact['obj'], rel=1e-6)
+    check_roster(model, res['solution'])
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_colgen_bound_and_status_are_consistent(seed, check_roster):
+    model = agent_classes(seed)
+    exact = model.solve(backend=BACKEND)
+    res = solve_colgen(model, backend=BACKEND)
+    assert res['status'] in ('optimal', 'feasible')
+    check_roster(model, res['solution'])
+    assert float((model.cost * res['solution']).sum()) == pytest.approx(res['obj'], rel=1e-6)
+    # Borne valide, solution jamais meilleure que l'optimum
+    assert res['bound'] <= exact['obj'] + 1e-6
+    assert res['obj'] >= exact['obj'] - 1e-6
+    if res['status'] == 'optimal':
+        assert res['obj'] == pytest.approx(exact['obj'], rel=1e-4)
+    else:
+        assert res['gap'] > 1e-4
+
+
+def test_colgen_detects_infeasibility():
+    model = SchedulingModel(2, 3, 2, [[0, 1], [1, 1], [1, 1]], 1)
+    assert solve_colgen(model, backend=BACKEND)['status'] == 'infeasible'
+
+
+def test_price_returns_legal_patterns():
+    # Motifs : un quart par jour au plus, pas de nuit → matin, budget respecté
+    rng = np.random.default_rng(0)
+    D, S = 6, 3
+    r = rng.uniform(-2.0, 1.0, (D, S))
+    patterns, values = price(r, 3, prev_night=True)
+    assert len(patterns) == len(values) > 0
+    for pattern, value in zip(patterns, values):
+        work = pattern < S
+        assert work.sum() <= 3
+        assert pattern[0] != 0   # nuit la veille
+        night = pattern[:-1] == S - 1
+        assert not (night & (pattern[1:] == 0)).any()
+        assert r[np.flatnonzero(work), pattern[work]].sum() == pytest.approx(value)
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+from demand_io import _minutes, convert_to_columnar, load_demand, load_demand_csv, save_demand_csv
+
+CSV = """site,date,time,demand
+A,2026-01-05,06:00,3
+A,2026-01-05,6:30,4
+A,2026-01-05,14:00:00,2
+A,2026-01-05,22:00,5
+A,2026-01-06,03:00,6
+B,2026-01-05,06:00,1
+B,2026-01-06,18:30,2
+"""
+
+
+@pytest.fixture
+def forecast(tmp_path):
+    path = tmp_path / "prev.csv"
+    path.write_text(CSV, encoding="utf-8")
+    return str(path)
+
+
+def test_minutes_accepts_short_hours_and_seconds():
+    times = np.array(['06:30', '9:30', '23:59', '09:30:15', '7:05:00', '00:00'], dtype='U8')
+    np.testing.assert_array_equal(_minutes(times), [390, 570, 1439, 570, 425, 0])
+
+
+@pytest.mark.parametrize("bad", ['9h30', '25:00', '12:61', '1230', ''])
+def test_minutes_rejects_malformed_times(bad):
+    with pytest.raises(ValueError, match="heure invalide"):
+        _minutes(np.array(['06:00', bad], dtype='U8'))
+
+
+def test_intervals_aggregate_to_shift_peaks(forecast):
+    demand = load_demand(forecast, S=3, days=2, start='2026-01-05')
+    # 03:00 le 6 appartient à la nuit du 5 ; pic de l'intervalle le plus chargé
+    np.testing.assert_array_equal(demand['A'], [[4, 2, 6], [0, 0, 0]])
+    np.testing.assert_array_equal(demand['B'], [[1, 0, 0], [0, 2, 0]])
+
+
+def test_columnar_format_reads_the_same_demand(forecast, tmp_path):
+    path = convert_to_columnar(forecast, str(tmp_path / "prev.npy"))
+    for sites in (None, ['B']):
+        csv = load_demand(forecast, S=3, sites=sites, start='2026-01-05', days=2)
+        npy = load_demand(path, S=3, sites=sites, start='2026-01-05', days=2)
+        assert csv.keys() == npy.keys()
+        for site in csv:
+            np.testing.assert_array_equal(csv[site], npy[site])
+
+
+def test_matrix_csv_round_trip(tmp_path):
+    demand = np.array([[1, 2, 3], [4, 5, 6]])
+    save_demand_csv(str(tmp_path / "d.csv"), demand)
+    np.testing.assert_array_equal(load_demand_csv(str(tmp_path / "d.csv")), demand)
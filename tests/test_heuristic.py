@@ -0,0 +1,11 @@
+import numpy as np
+from model import SchedulingModel
+
+
+def test_heuristic_roster_is_feasible_when_reported_so(check_roster):
+    for seed in range(5):
+        rng = np.random.default_rng(seed)
+        model = SchedulingModel(10, 14, 3, rng.integers(0, 4, (14, 3)), 10)
+        res = model.solve_heuristic()
+        if res['status'] == 'heuristic':
+            check_roster(model, res['solution'])
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+from conftest import BACKEND
+from model import SchedulingModel, expand_cost
+
+
+def small_instances():
+    # Agents identiques, classes de coûts, budgets individuels, veille de nuit, S = 2 et S = 3
+    yield SchedulingModel(6, 5, 3, [[2, 1, 1], [1, 2, 1], [2, 1, 2], [1, 1, 1], [2, 2, 0]], 4)
+    yield SchedulingModel(5, 4, 2, [[2, 2], [1, 2], [2, 1], [2, 2]], 4,
+                          prev_night=[True, True, False, False, False])
+    yield SchedulingModel(6, 5, 3, [[1, 2, 1], [2, 1, 1], [1, 1, 2], [2, 2, 1], [1, 1, 1]],
+                          [3, 3, 4, 4, 5, 5], {'shift': [1.0, 1.2, 1.8], 'agent': [1, 1, 1, 1.5, 1.5, 1.5]})
+    for seed in range(3):
+        rng = np.random.default_rng(seed)
+        yield SchedulingModel(8, 7, 3, rng.integers(0, 3, (7, 3)), 5)
+
+
+@pytest.mark.parametrize("model", list(small_instances()))
+def test_aggregated_and_agent_formulations_agree(model, check_roster):
+    agents = model.solve(aggregate=False, backend=BACKEND)
+    aggregated = model.solve(aggregate=True, backend=BACKEND)
+    assert agents['status'] == aggregated['status'] == 'optimal'
+    assert aggregated['formulation'] == 'aggregated'
+    assert aggregated['obj'] == pytest.approx(agents['obj'], rel=1e-6)
+    for res in (agents, aggregated):
+        check_roster(model, res['solution'])
+        assert float((model.cost * np.asarray(res['solution'])).sum()) == pytest.approx(res['obj'], rel=1e-6)
+
+
+def test_infeasible_instance_reported_by_both_formulations():
+    # Nuit du jour 1 + matin du jour 2 : 3 agents distincts requis pour 2
+    model = SchedulingModel(2, 3, 2, [[0, 2], [1, 1], [2, 0]], 3)
+    for aggregate in (False, True):
+        assert model.solve(aggregate=aggregate, backend=BACKEND)['status'] == 'infeasible'
+
+
+def test_incumbent_on_time_limit_keeps_solution():
+    model = SchedulingModel(2, 2, 3, [[1, 0, 1], [1, 1, 0]], 2)
+    problem = model._problem()
+    x = np.zeros(len(problem.c))
+    x[[0, 5, 6, 10]] = 1.0
+    res = model._incumbent({'status': 'time_limit', 'x': x, 'obj': 4.0, 'bound': 3.6, 'runtime': 1.0},
+                           problem, False, BACKEND)
+    assert res['status'] == 'time_limit'
+    assert res['gap'] == pytest.approx(0.1)
+    assert res['solution'].sum() == 4
+    assert model._incumbent({'status': 'time_limit'}, problem, False, BACKEND)['status'] == 'time_limit'
+
+
+@pytest.mark.parametrize("spec, expected", [
+    (None, [1.0, 1.0, 1.8]),
+    (2.0, [2.0, 2.0, 2.0]),
+    ([1.0, 2.0, 3.0], [1.0, 2.0, 3.0]),
+])
+def test_expand_cost_broadcasts_without_copy(spec, expected):
+    cost = expand_cost(spec, 4, 5, 3)
+    assert cost.shape == (4, 5, 3)
+    assert cost.strides[0] == 0
+    np.testing.assert_allclose(cost[2, 3], expected)
+
+
+def test_expand_cost_agent_multiplier():
+    cost = expand_cost({'shift': [1.0, 2.0], 'agent': [1.0, 3.0]}, 2, 3, 2)
+    np.testing.assert_allclose(cost[1, 0], [3.0, 6.0])
+    with pytest.raises(ValueError):
+        expand_cost([1.0, 2.0], 2, 3, 3)
@@ -0,0 +1,73 @@
+import itertools
+import pytest
+from conftest import BACKEND
+from instances import nova_instance
+from nova_heuristic import list_schedule
+from nova_model import NovaModel
+
+
+def check_schedule(projects, nb_teams, res):
+    # Tâches d'un projet dans l'ordre, pas de chevauchement sur une équipe, makespan cohérent
+    end = {}
+    for p, durations in projects.items():
+        for t, d in enumerate(durations):
+            start = res['starts'][(p, t)]
+            if t:
+                assert start >= end[(p, t - 1)] - 1e-6
+            end[(p, t)] = start + d
+    by_team = {}
+    for op, team in res['teams'].items():
+        assert 0 <= team < nb_teams
+        by_team.setdefault(team, []).append((res['starts'][op], end[op]))
+    for slots in by_team.values():
+        slots.sort()
+        for (_, e1), (s2, _) in zip(slots, slots[1:]):
+            assert s2 >= e1 - 1e-6
+    assert max(end.values()) == pytest.approx(res['makespan'], abs=1e-6)
+
+
+def brute_force_makespan(projects, nb_teams):
+    # Énumère équipes et ordres de passage sur chaque équipe (petites instances uniquement)
+    ops = [(p, t) for p, ts in projects.items() for t in range(len(ts))]
+    dur = [projects[p][t] for p, t in ops]
+    n = len(ops)
+    best = float('inf')
+    for teams in itertools.product(range(nb_teams), repeat=n):
+        groups = [[i for i in range(n) if teams[i] == k] for k in range(nb_teams)]
+        for orders in itertools.product(*(itertools.permutations(g) for g in groups)):
+            before = [[] for _ in range(n)]
+            for i in range(1, n):
+                if ops[i][0] == ops[i - 1][0]:
+                    before[i].append(i - 1)
+            for order in orders:
+                for u, v in zip(order, order[1:]):
+                    before[v].append(u)
+            start, done = [0.0] * n, [False] * n
+            for _ in range(n):
+                for i in range(n):
+                    if not done[i] and all(done[j] for j in before[i]):
+                        start[i] = max([start[j] + dur[j] for j in before[i]], default=0.0)
+                        done[i] = True
+            if all(done):
+                best = min(best, max(s + d for s, d in zip(start, dur)))
+    return best
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_compact_formulation_is_exact_on_small_instances(seed):
+    inst = nova_instance(3, 2, 2, vary_tasks=True, seed=seed)
+    res = NovaModel(inst['projects'], inst['nb_teams']).solve(backend=BACKEND)
+    assert res['status'] == 'optimal'
+    check_schedule(inst['projects'], inst['nb_teams'], res)
+    assert res['makespan'] == pytest.approx(brute_force_makespan(inst['projects'], inst['nb_teams']), abs=1e-6)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_solution_is_valid_and_no_worse_than_heuristic(seed):
+    inst = nova_instance(4, 3, 2, vary_tasks=True, seed=seed)
+    res = NovaModel(inst['projects'], inst['nb_teams']).solve(backend=BACKEND)
+    heuristic = list_schedule(inst['projects'], inst['nb_teams'])
+    assert res['status'] == 'optimal'
+    check_schedule(inst['projects'], inst['nb_teams'], res)
+    check_schedule(inst['projects'], inst['nb_teams'], heuristic)
+    assert res['makespan'] <= heuristic['makespan'] + 1e-6
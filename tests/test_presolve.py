@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+from backends import get_backend
+from conftest import BACKEND
+from model import SchedulingModel
+from presolve import check_feasibility
+
+
+def random_models(n, seed=0):
+    rng = np.random.default_rng(seed)
+    for _ in range(n):
+        E, D, S = int(rng.integers(2, 6)), int(rng.integers(2, 5)), int(rng.integers(2, 4))
+        demand = rng.integers(0, 3, (D, S))
+        budget = rng.integers(1, D + 1, E)
+        prev_night = rng.random(E) < 0.3
+        yield SchedulingModel(E, D, S, demand, budget, prev_night=prev_night)
+
+
+def test_presolve_never_rejects_a_feasible_instance():
+    # Les conflits analytiques sont des preuves : le PLNE (sans presolve) doit être infaisable
+    engine = get_backend(BACKEND)
+    rejected = 0
+    for model in random_models(80):
+        conflicts = model.presolve()
+        res = engine.solve(model._problem(aggregate=False))
+        assert res['status'] in ('optimal', 'infeasible')
+        if conflicts:
+            rejected += 1
+            assert res['status'] == 'infeasible', conflicts
+    assert rejected > 0   # le tirage exerce bien les preuves
+
+
+@pytest.mark.parametrize("demand, budget, prev_night, kind", [
+    ([[3, 0, 0], [0, 0, 0]], [2, 2], None, 'jour'),
+    ([[0, 0, 2], [1, 0, 0]], [2, 2], None, 'nuit_matin'),
+    ([[2, 0, 0], [0, 0, 0]], [2, 2], [True, False], 'nuit_matin'),
+    ([[1, 1, 0], [1, 1, 0], [1, 1, 0]], [2, 2], None, 'capacite'),
+    ([[1, 0], [2, 0]], [2, 1], [True, False], 'flux'),
+])
+def test_conflicts_name_their_cause(demand, budget, prev_night, kind):
+    conflicts = check_feasibility(np.array(demand), np.array(budget),
+                                  None if prev_night is None else np.array(prev_night))
+    assert kind in {c['kind'] for c in conflicts}
+
+
+def test_infeasible_result_carries_conflicts():
+    model = SchedulingModel(2, 2, 3, [[3, 0, 0], [0, 0, 0]], 2)
+    res = model.solve(backend=BACKEND)
+    assert res['status'] == 'infeasible'
+    assert res['conflicts'][0]['days'] == [0]
+
+
+def test_flow_bound_combines_budgets_and_night_morning_chains():
+    # Veille de nuit pour A : le matin du jour 1 revient à B (budget 1), qui manque le jour 2.
+    # Chaque contrôle isolé passe : seul le flot agrégé voit le conflit.
+    conflicts = check_feasibility(np.array([[1, 0], [2, 0]]), np.array([2, 1]), np.array([True, False]))
+    assert [c['kind'] for c in conflicts] == ['flux']
+    assert conflicts[0]['need'] == 3 and conflicts[0]['capacity'] == 2
+    model = SchedulingModel(2, 2, 2, [[1, 0], [2, 0]], [2, 1], prev_night=[True, False])
+    assert get_backend(BACKEND).solve(model._problem(aggregate=False))['status'] == 'infeasible'
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+from conftest import BACKEND
+from instances import scheduling_instance
+from model import SchedulingModel
+
+
+def base_roster(seed=0):
+    inst = scheduling_instance(12, 10, 3, density=0.55, seed=seed)
+    model = SchedulingModel(**inst)
+    res = model.solve(backend=BACKEND)
+    assert res['status'] == 'optimal'
+    return inst, res['solution']
+
+
+def with_demand(inst, demand):
+    return SchedulingModel(**{**inst, 'demand': demand})
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_repair_keeps_feasibility_and_frozen_days(seed, check_roster):
+    inst, previous = base_roster(seed)
+    demand = inst['demand'].copy()
+    demand[5] += 1
+    model = with_demand(inst, demand)
+    res = model.repair(previous, backend=BACKEND)
+    assert res['status'] == 'optimal'
+    check_roster(model, res['solution'])
+    d0, d1 = res['window']
+    assert d0 <= 5 < d1
+    np.testing.assert_array_equal(res['solution'][:, :d0], previous[:, :d0])
+    np.testing.assert_array_equal(res['solution'][:, d1:], previous[:, d1:])
+    assert res['obj'] == pytest.approx(float((model.cost * res['solution']).sum()))
+    assert res['changed'] == int((res['solution'] != previous).any(axis=2).sum())
+    # Jamais mieux que l'optimum du modèle complet
+    assert res['obj'] >= model.solve(backend=BACKEND)['obj'] - 1e-6
+
+
+def test_repair_without_change_returns_previous():
+    inst, previous = base_roster()
+    res = with_demand(inst, inst['demand']).repair(previous, backend=BACKEND)
+    assert res['status'] == 'optimal'
+    assert res['changed'] == 0
+    np.testing.assert_array_equal(res['solution'], previous)
+
+
+def test_repair_only_moves_selected_agents(check_roster):
+    inst, previous = base_roster()
+    demand = inst['demand'].copy()
+    demand[4, 1] += 1
+    model = with_demand(inst, demand)
+    agents = np.flatnonzero(previous[:, 3:6].sum(axis=(1, 2)) < 3)[:6]
+    res = model.repair(previous, agents=agents, backend=BACKEND)
+    assert res['status'] == 'optimal'
+    check_roster(model, res['solution'])
+    if res['window'] != (0, model.D):   # élargi à tous les agents seulement sur l'horizon entier
+        frozen = np.setdiff1d(np.arange(model.E), agents)
+        np.testing.assert_array_equal(res['solution'][frozen], previous[frozen])
+
+
+def test_repair_widens_an_infeasible_neighbourhood(check_roster):
+    inst, previous = base_roster()
+    demand = inst['demand'].copy()
+    demand[5] += 1
+    model = with_demand(inst, demand)
+    res = model.repair(previous, radius=0, agents=[0], backend=BACKEND)
+    assert res['status'] == 'optimal'
+    check_roster(model, res['solution'])
+
+
+def test_repair_reports_infeasible_demand():
+    inst, previous = base_roster()
+    demand = inst['demand'].copy()
+    demand[5, 0] = inst['E'] + 1
+    assert with_demand(inst, demand).repair(previous, backend=BACKEND)['status'] == 'infeasible'
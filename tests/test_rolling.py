@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+from backends import HighsBackend
+from conftest import BACKEND
+from model import SchedulingModel
+from rolling import solve_rolling
+
+
+@pytest.mark.parametrize("seed", range(2))
+def test_rolling_horizon_roster_is_feasible(seed, check_roster):
+    rng = np.random.default_rng(seed)
+    model = SchedulingModel(10, 21, 3, rng.integers(0, 4, (21, 3)), 15)
+    res = solve_rolling(model, window=7, backend=BACKEND)
+    assert res['status'] == 'feasible'
+    assert res['windows'] >= 3
+    check_roster(model, res['solution'])
+    # Au mieux l'optimum du modèle complet, qui encadre la borne
+    full = model.solve(backend=BACKEND)['obj']
+    assert res['bound'] <= full + 1e-6 <= res['obj'] + 2e-6
+    assert res['gap'] == pytest.approx((res['obj'] - res['bound']) / res['obj'])
+
+
+def test_rolling_carries_prev_night_into_first_window(check_roster):
+    model = SchedulingModel(3, 4, 2, [[2, 1], [1, 1], [1, 1], [1, 1]], 3, prev_night=[True, False, False])
+    res = solve_rolling(model, window=2, backend=BACKEND)
+    assert res['status'] == 'feasible'
+    check_roster(model, res['solution'])
+
+
+def test_time_limited_windows_keep_their_incumbent(monkeypatch, check_roster):
+    # Limite minuscule par fenêtre : chaque fenêtre s'arrête sur une solution non prouvée
+    # optimale (simulé à partir de la résolution complète pour rester déterministe)
+    solve = HighsBackend.solve
+
+    def stopped(self, problem, time_limit=None, **options):
+        res = solve(self, problem, **options)
+        if time_limit and res['status'] == 'optimal':
+            res['status'] = 'time_limit'
+        return res
+    monkeypatch.setattr(HighsBackend, "solve", stopped)
+    rng = np.random.default_rng(0)
+    model = SchedulingModel(10, 21, 3, rng.integers(0, 4, (21, 3)), 15)
+    res = solve_rolling(model, window=7, backend=BACKEND, time_limit=1e-3)
+    assert res['status'] == 'time_limit'
+    assert res['time_limited'] == res['windows'] >= 3
+    check_roster(model, res['solution'])
+    assert res['obj'] == pytest.approx(float((model.cost * res['solution']).sum()))
+    assert 'message' in res
@@ -0,0 +1,57 @@
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pytest
+import sweep
+from conftest import BACKEND
+from model import SchedulingModel
+from sweep import agents_lower_bound, sweep_staffing
+
+DEMAND = np.array([[2, 1, 1], [1, 2, 1], [2, 2, 1], [1, 1, 1]])
+
+
+class _Pool(ThreadPoolExecutor):
+    # Mêmes appels que ProcessPoolExecutor, dans le processus de test (fonctions remplaçables)
+    def __init__(self, max_workers, mp_context=None, initializer=None, initargs=()):
+        super().__init__(max_workers)
+
+
+@pytest.fixture(autouse=True)
+def in_process(monkeypatch):
+    monkeypatch.setattr(sweep, "ProcessPoolExecutor", _Pool)
+
+
+def test_min_agents_is_the_smallest_feasible_headcount():
+    res = sweep_staffing(DEMAND, [2, 3], agent_cost=3.0, backend=BACKEND, workers=2, extra=1)
+    assert res['status'] == 'optimal' and res['unresolved'] == {}
+    for ms, E in res['min_agents'].items():
+        assert E >= agents_lower_bound(DEMAND, ms)
+        D, S = DEMAND.shape
+        assert SchedulingModel(E, D, S, DEMAND, ms).solve(backend=BACKEND)['status'] == 'optimal'
+        assert SchedulingModel(E - 1, D, S, DEMAND, ms).solve(backend=BACKEND)['status'] == 'infeasible'
+    for p in res['points']:
+        assert p['total'] == pytest.approx(p['obj'] + 3.0 * p['E'])
+
+
+def test_unresolved_point_is_not_treated_as_infeasible(monkeypatch):
+    exact = sweep_staffing(DEMAND, [2], backend=BACKEND, workers=1, extra=0)['min_agents'][2]
+    solve_point = sweep._solve_point
+
+    def timed_out(demand, E, max_shifts, *args):
+        if E == exact:
+            return {'status': 'time_limit', 'obj': None}
+        return solve_point(demand, E, max_shifts, *args)
+
+    monkeypatch.setattr(sweep, "_solve_point", timed_out)
+    monkeypatch.setattr(sweep, "_heuristic_upper", lambda demand, ms, cost, lo: lo + 6)
+    res = sweep_staffing(DEMAND, [2], backend=BACKEND, workers=2, extra=0)
+    assert res['status'] == 'time_limit'
+    assert res['min_agents'][2] == exact + 1
+    assert exact in res['unresolved'][2]
+    assert 'message' in res
+
+
+def test_zero_demand_needs_no_agent():
+    res = sweep_staffing(np.zeros((3, 3), dtype=int), [2], backend=BACKEND, workers=1, extra=1)
+    assert res['status'] == 'optimal'
+    assert res['min_agents'] == {2: 0}
+    assert all(p['obj'] == 0.0 for p in res['points'])
@@ -1,10 +1,16 @@
 from PyQt5 import QtWidgets, QtCore, QtGui
 from visualizer import VisualizationWidget
+from backends import BACKENDS, available_backends, get_backend
+from demand_io import load_demand_csv, load_demand, list_sites, is_interval_file
+from demand_model import DemandTableModel, parse_block
 import os
+import numpy as np
 
 
 class SchedulerView(QtWidgets.QWidget):
     solve_requested = QtCore.pyqtSignal(dict)
+    sweep_requested = QtCore.pyqtSignal(dict)
+    cancel_requested = QtCore.pyqtSignal()
 
     def __init__(self):
         super().__init__()
@@ -57,7 +63,7 @@ class SchedulerView(QtWidgets.QWidget):
 
         labels = ["Nombre d'agents", "Jours", "Quarts / jour", "Max quarts / agent"]
         defaults = [16, 7, 3, 12]
-        ranges = [(5, 100), (1, 31), (2, 8), (1, 50)]
+        ranges = [(5, 100), (1, 92), (2, 8), (1, 80)]
         self.spins = []
         for i, (txt, val, (minv, maxv)) in enumerate(zip(labels, defaults, ranges)):
             lbl = QtWidgets.QLabel(f"<b>{txt} :</b>")
@@ -106,18 +112,42 @@ class SchedulerView(QtWidgets.QWidget):
         self.btnSafe.setStyleSheet(style_btn("#2ecc71"))
         self.btnSafe.clicked.connect(lambda: (self.spins[0].setValue(16), self.spins[3].setValue(12)))
 
-        for b in (self.btnBuild, self.btnLoad, self.btnSafe):
+        self.btnSweep = QtWidgets.QPushButton("Effectif minimal")
+        self.btnSweep.setStyleSheet(style_btn("#16a085"))
+        self.btnSweep.setToolTip("Balayage du nombre d'agents et de max quarts : frontière coût / effectif")
+        self.btnSweep.clicked.connect(self._on_sweep_clicked)
+        # Coût fixe d'un agent sur l'horizon : sans lui, la frontière coût / effectif est plate
+        self.agentCostSpin = QtWidgets.QDoubleSpinBox()
+        self.agentCostSpin.setRange(0.0, 1000.0)
+        self.agentCostSpin.setDecimals(2)
+        self.agentCostSpin.setValue(5.0)
+        self.agentCostSpin.setSuffix(" €/agent")
+        self.agentCostSpin.setToolTip("Coût fixe par agent ajouté au coût des quarts dans le balayage")
+        self.agentCostSpin.setStyleSheet("padding: 8px; font-size: 15px;")
+
+        self.btnCsv = QtWidgets.QPushButton("Importer CSV")
+        self.btnCsv.setStyleSheet(style_btn("#d35400"))
+        self.btnCsv.setToolTip("Charger une demande (une ligne par jour, un entier par quart)")
+        self.btnCsv.clicked.connect(self._on_import_csv)
+
+        for b in (self.btnBuild, self.btnLoad, self.btnCsv, self.btnSafe, self.agentCostSpin, self.btnSweep):
             btns.addWidget(b)
         grid.addLayout(btns, 5, 0, 1, 2)
 
-        # Tableau demande
-        self.tableDemand = QtWidgets.QTableWidget()
+        # Tableau demande : vue sur un tableau numpy (total mis à jour cellule par cellule)
+        self.demandModel = DemandTableModel()
+        self.demandModel.total_changed.connect(self._update_demand_label)
+        self.tableDemand = QtWidgets.QTableView()
+        self.tableDemand.setModel(self.demandModel)
         self.tableDemand.setStyleSheet("""
-            QTableWidget { gridline-color: #95a5a6; background: white; font-size: 14px;
-                          border: 2px solid #dcdcdc; border-radius: 10px; }
+            QTableView { gridline-color: #95a5a6; background: white; font-size: 14px;
+                         border: 2px solid #dcdcdc; border-radius: 10px; }
             QHeaderView::section { background: #34495e; color: white; padding: 8px; }
         """)
-        self.tableDemand.itemChanged.connect(self._update_demand_label)
+        # Ctrl+V : collage d'un bloc (depuis un tableur ou un CSV) à partir de la cellule courante
+        paste = QtWidgets.QShortcut(QtGui.QKeySequence.Paste, self.tableDemand)
+        paste.setContext(QtCore.Qt.WidgetWithChildrenShortcut)
+        paste.activated.connect(self._paste_demand)
         grid.addWidget(self.tableDemand, 6, 0, 1, 2)
 
         # BANDEAU MAGIQUE
@@ -144,9 +174,41 @@ class SchedulerView(QtWidgets.QWidget):
         self.btnSolve.setCursor(QtGui.QCursor(QtCore.Qt.PointingHandCursor))
         self.btnSolve.clicked.connect(self._on_solve_clicked)
 
+        self.backendCombo = QtWidgets.QComboBox()
+        # « auto » : Gurobi si la licence le permet, HiGHS sinon (et pour les modèles trop grands)
+        self.backendCombo.addItems(["auto"] + available_backends())
+        self.backendCombo.setToolTip("Moteur PLNE utilisé pour la résolution")
+        self.backendCombo.setStyleSheet("padding: 10px; font-size: 15px;")
+        self.backendCombo.currentTextChanged.connect(self._update_solve_label)
+        self._update_solve_label()
+
+        # Horizon glissant pour les longs horizons (fenêtres qui se chevauchent)
+        self.rollingCheck = QtWidgets.QCheckBox("Horizon glissant")
+        self.rollingCheck.setToolTip("Optimise des fenêtres successives (utile au-delà d'un mois)")
+        self.rollingCheck.setStyleSheet("font-size: 15px;")
+        self.windowSpin = QtWidgets.QSpinBox()
+        self.windowSpin.setRange(2, 31)
+        self.windowSpin.setValue(14)
+        self.windowSpin.setSuffix(" j")
+        self.windowSpin.setStyleSheet("padding: 10px; font-size: 15px;")
+
+        self.btnCancel = QtWidgets.QPushButton("Annuler")
+        self.btnCancel.setToolTip("Arrête la résolution et garde la meilleure solution trouvée")
+        self.btnCancel.setStyleSheet("""
+            QPushButton { background: #e74c3c; color: white; font-weight: bold; font-size: 16px;
+                          padding: 20px; border-radius: 15px; }
+            QPushButton:disabled { background: #bdc3c7; }
+        """)
+        self.btnCancel.setEnabled(False)
+        self.btnCancel.clicked.connect(self.cancel_requested)
+
         self.statusLabel = QtWidgets.QLabel("Prêt")
         self.statusLabel.setStyleSheet("font-size: 16px; color: #27ae60; font-weight: bold;")
+        solve_layout.addWidget(self.rollingCheck)
+        solve_layout.addWidget(self.windowSpin)
+        solve_layout.addWidget(self.backendCombo)
         solve_layout.addWidget(self.btnSolve)
+        solve_layout.addWidget(self.btnCancel)
         solve_layout.addWidget(self.statusLabel)
         grid.addLayout(solve_layout, 8, 0, 1, 2)
 
@@ -209,46 +271,74 @@ class SchedulerView(QtWidgets.QWidget):
     def _on_build(self):
         D = self.spins[1].value()
         S = self.spins[2].value()
-        self.tableDemand.blockSignals(True)
-        self.tableDemand.setRowCount(D)
-        self.tableDemand.setColumnCount(S)
-        for s in range(S):
-            self.tableDemand.setHorizontalHeaderItem(s, QtWidgets.QTableWidgetItem(f"Quart {s+1}"))
-        for d in range(D):
-            self.tableDemand.setVerticalHeaderItem(d, QtWidgets.QTableWidgetItem(f"Jour {d+1}"))
-            for s in range(S):
-                item = QtWidgets.QTableWidgetItem("2")
-                item.setTextAlignment(QtCore.Qt.AlignCenter)
-                self.tableDemand.setItem(d, s, item)
-        self.tableDemand.blockSignals(False)
-        self._update_demand_label()
+        self.demandModel.set_demand(np.full((D, S), 2, dtype=np.int64))
         self._update_cost_table()
 
+    def _set_demand(self, demand):
+        # Chargement en bloc : dimensions reprises du fichier, une seule notification.
+        # Hors des plages des champs Jours / Quarts, la grille est refusée (pas de troncature
+        # silencieuse qui désaccorderait les coûts par quart et la demande)
+        D, S = demand.shape
+        days, shifts = self.spins[1], self.spins[2]
+        if not (days.minimum() <= D <= days.maximum() and shifts.minimum() <= S <= shifts.maximum()):
+            QtWidgets.QMessageBox.warning(
+                self, "Import",
+                f"Demande de {D} jours × {S} quarts non prise en charge : l'interface accepte "
+                f"{days.minimum()} à {days.maximum()} jours et {shifts.minimum()} à {shifts.maximum()} "
+                f"quarts (batch.py ou demand_io pour les horizons plus longs).")
+            return False
+        self.spins[1].setValue(D)
+        self.spins[2].setValue(S)
+        self.demandModel.set_demand(demand)
+        self._update_cost_table()
+        return True
+
     def _load_sample_demand(self):
         path = "sample_demand.csv"
         if os.path.exists(path):
-            with open(path) as f:
-                lines = [l.strip().split(',') for l in f if l.strip()]
-            if lines:
-                D, S = len(lines), len(lines[0])
-                self.spins[1].setValue(D)
-                self.spins[2].setValue(S)
-                self._on_build()
-                for d, row in enumerate(lines):
-                    for s, val in enumerate(row):
-                        if d < self.tableDemand.rowCount() and s < self.tableDemand.columnCount():
-                            self.tableDemand.item(d, s).setText(val.strip())
+            lines = load_demand_csv(path)
+            if lines.size:
+                self._set_demand(lines)
         self._update_demand_label()
 
+    def _on_import_csv(self):
+        path, _ = QtWidgets.QFileDialog.getOpenFileName(
+            self, "Importer une demande", "",
+            "Demande (*.csv *.txt *.npy);;Tous les fichiers (*)")
+        if not path:
+            return
+        try:
+            if is_interval_file(path):
+                # Prévision par site et par intervalle : agrégée en quarts pour le site choisi
+                sites = list_sites(path)
+                site = sites[0] if len(sites) == 1 else None
+                if site is None:
+                    site, ok = QtWidgets.QInputDialog.getItem(self, "Importer", "Site :", sites, 0, False)
+                    if not ok:
+                        return
+                demand = load_demand(path, S=self.spins[2].value(), sites=[site]).get(site)
+                if demand is None:
+                    return
+            else:
+                demand = load_demand_csv(path)
+        except ValueError as e:
+            QtWidgets.QMessageBox.warning(self, "Import", f"Fichier illisible : {e}")
+            return
+        if demand.size and self._set_demand(demand):
+            self.set_status(f"Demande importée : {demand.shape[0]} jours × {demand.shape[1]} quarts")
+
+    def _paste_demand(self):
+        index = self.tableDemand.currentIndex()
+        row, col = (index.row(), index.column()) if index.isValid() else (0, 0)
+        try:
+            n = self.demandModel.paste_block(row, col, parse_block(QtWidgets.QApplication.clipboard().text()))
+        except ValueError:
+            self.set_status("Collage ignoré : valeurs entières positives attendues")
+            return
+        self.set_status(f"{n} cellules collées")
+
     def _update_demand_label(self):
-        D = self.tableDemand.rowCount()
-        S = self.tableDemand.columnCount()
-        total = 0
-        for d in range(D):
-            for s in range(S):
-                item = self.tableDemand.item(d, s)
-                if item and item.text().isdigit():
-                    total += int(item.text())
+        total = self.demandModel.total
         agents = self.spins[0].value()
         max_shifts = self.spins[3].value()
         capacity = agents * max_shifts
@@ -261,31 +351,47 @@ class SchedulerView(QtWidgets.QWidget):
 
 
     def _collect_params(self):
-        E, D, S = [sp.value() for sp in self.spins[:3]]
-        demand = [[int(self.tableDemand.item(d, s).text() or 0) for s in range(S)] for d in range(D)]
+        E = self.spins[0].value()
+        demand = self.demandModel.demand()
+        D, S = demand.shape
         max_shifts = self.spins[3].value()
 
-        user_costs = [spin.value() for spin in self.cost_spins]
-
-       
-        cost = []
-        for e in range(E):
-            agent_cost = []
-            for d in range(D):
-                day_cost = []
-                for s in range(S):
-                    day_cost.append(user_costs[s])   
-                agent_cost.append(day_cost)
-            cost.append(agent_cost)
+        # Un coût par quart : le modèle l'étend lui-même à (E, D, S)
+        cost = [spin.value() for spin in self.cost_spins]
+        backend = self.backendCombo.currentText()
 
         self._last_demand = demand
         return {"E": E, "D": D, "S": S, "demand": demand,
-                "max_shifts": max_shifts, "cost": cost}
+                "max_shifts": max_shifts, "cost": cost,
+                "backend": backend if backend in BACKENDS else None,
+                "rolling": self.windowSpin.value() if self.rollingCheck.isChecked() else None}
 
     def _on_solve_clicked(self):
         params = self._collect_params()
         self.solve_requested.emit(params)
-        self.set_status("Gurobi en action...")
+        self.set_status(f"{self._engine_label()} en action...")
+
+    def _engine_label(self):
+        name = self.backendCombo.currentText()
+        return BACKENDS[name].label if name in BACKENDS else get_backend().label
+
+    def _update_solve_label(self):
+        self.btnSolve.setText(f"RÉSOUDRE AVEC {self._engine_label().upper()}")
+
+    def _on_sweep_clicked(self):
+        params = self._collect_params()
+        ms = params['max_shifts']
+        values = sorted({v for v in (ms - 2, ms, ms + 2) if 1 <= v <= params['D']}) or [ms]
+        self.sweep_requested.emit({"demand": params['demand'],
+                                   "cost": [spin.value() for spin in self.cost_spins],
+                                   "max_shifts_values": values,
+                                   "agent_cost": self.agentCostSpin.value(),
+                                   "backend": params['backend']})
+        self.set_status("Balayage des effectifs...")
+
+    def show_frontier(self, result):
+        self.canvas.show_frontier(result['points'], result['min_agents'])
+        self.tabs.setCurrentIndex(2)
 
     def show_result(self, text: str, sol=None):
         self.resultBox.setPlainText(text)
@@ -293,6 +399,10 @@ class SchedulerView(QtWidgets.QWidget):
             self._last_solution = sol
             self.tabs.setCurrentIndex(1)
 
+    def set_running(self, running: bool):
+        self.btnSolve.setEnabled(not running)
+        self.btnCancel.setEnabled(running)
+
     def set_status(self, text: str):
         self.statusLabel.setText(text)
         if "optimal" in text.lower():
@@ -303,11 +413,11 @@ class SchedulerView(QtWidgets.QWidget):
             self.statusLabel.setStyleSheet("color: #3498db; font-size: 16px;")
 
     def _visu_load(self):
-        if self._last_solution:
+        if self._last_solution is not None:
             self.canvas.show_agent_load(self._last_solution)
             self.tabs.setCurrentIndex(2)
 
     def _visu_heat(self):
-        if self._last_solution:
+        if self._last_solution is not None:
             self.canvas.show_heatmap(self._last_solution)
             self.tabs.setCurrentIndex(2)
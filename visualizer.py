@@ -3,74 +3,196 @@ import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as Canvas
 from matplotlib.figure import Figure
 import numpy as np
+import time
+from functools import wraps
+from instrumentation import emit
+
+
+def _timed(kind):
+    # Phase « render » : une ligne de journal par tracé
+    def deco(fn):
+        @wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            t0 = time.perf_counter()
+            out = fn(self, *args, **kwargs)
+            emit({'event': 'render', 'kind': kind, 'phases': {'render': time.perf_counter() - t0}})
+            return out
+        return wrapper
+    return deco
+
 
 class VisualizationWidget(Canvas):
+    # Une paire d'axes par vue, créée une seule fois : changer de vue ne fait que masquer /
+    # afficher, et une nouvelle solution de même taille met à jour les artistes en place
+    # (set_height, set_data) puis ne redessine qu'eux (blitting). Les artistes fixes qui doivent
+    # rester au-dessus des artistes animés (grille, cadre, légende) sont redessinés après eux.
+    MAX_LABELS = 40   # au-delà, les étiquettes d'agents sont espacées
+
     def __init__(self):
         self.fig = Figure(figsize=(10, 6), dpi=100)
         super().__init__(self.fig)
+        self._views = {}          # nom → {'ax', 'pos', 'animated', ...}
+        self._active = None
+        self._background = None
+        self.mpl_connect('draw_event', self._on_draw)
 
     def clear(self):
         self.fig.clear()
+        self._views.clear()
+        self._active = None
+        self._background = None
         self.draw()
 
-    # 1. Charges par agent (histogramme)
-   
-    def show_agent_load(self, sol):
-        self.clear()
-        ax = self.fig.add_subplot(111)
-        E = len(sol)
-        loads = [sum(sum(day) for day in agent) for agent in sol]
-
-        bars = ax.bar(range(1, E+1), loads, color='#3498db', edgecolor='black', alpha=0.85)
-        ax.set_title("Charge de travail par agent", fontsize=18, fontweight='bold', pad=20, color='#2c3e50')
-        ax.set_xlabel("Agent", fontsize=13)
-        ax.set_ylabel("Nombre de quarts", fontsize=13)
-        ax.set_xticks(range(1, E+1, max(1, E//20)))  
-
-        for bar in bars:
-            h = int(bar.get_height())
-            ax.text(bar.get_x() + bar.get_width()/2, h + 0.1, f'{h}', ha='center', va='bottom', fontweight='bold')
-
+    # --- mécanique commune ---
+    def _on_draw(self, event):
+        # Après un rendu complet : fond mémorisé sans les artistes animés, puis ceux-ci par-dessus
+        view = self._views.get(self._active)
+        if view is None or not view['animated']:
+            self._background = None
+            return
+        self._background = self.copy_from_bbox(self.fig.bbox)
+        self._draw_animated(view)
+
+    @staticmethod
+    def _draw_animated(view):
+        for artist in view['animated'] + view['overlay']:
+            view['ax'].draw_artist(artist)
+
+    def _new_view(self, kind):
+        old = self._views.pop(kind, None)
+        if old is not None:
+            old['ax'].remove()
+        for view in self._views.values():
+            view['ax'].set_visible(False)
+            view['ax'].set_in_layout(False)
+        self._active = kind
+        return self.fig.add_subplot(111)
+
+    def _register(self, kind, ax, animated, overlay=(), **data):
+        for artist in animated:
+            artist.set_animated(True)
         self.fig.tight_layout()
+        # Position figée : un tight_layout ultérieur pour une autre vue ne la déplace pas
+        self._views[kind] = {'ax': ax, 'pos': ax.get_position(), 'animated': animated,
+                             'overlay': list(overlay), **data}
         self.draw()
 
+    def _show(self, kind, blit):
+        # Vue existante : blitting si elle est déjà affichée, sinon bascule et rendu complet
+        if blit and self._active == kind and self._background is not None:
+            view = self._views[kind]
+            self.restore_region(self._background)
+            self._draw_animated(view)
+            self.blit(self.fig.bbox)
+            return
+        for name, view in self._views.items():
+            view['ax'].set_visible(name == kind)
+            view['ax'].set_in_layout(name == kind)
+        self._views[kind]['ax'].set_position(self._views[kind]['pos'])
+        self._active = kind
+        self.draw()
 
-    # 2. Heatmap 
+    # 1. Charges par agent (histogramme)
 
+    @_timed('agent_load')
+    def show_agent_load(self, sol):
+        E = sol.shape[0]
+        loads = sol.reshape(E, -1).sum(axis=1, dtype=np.int64)
+        top = loads.max(initial=0) * 1.15 + 1
+        labelled = E <= self.MAX_LABELS
+        view = self._views.get('agent_load')
+        if view is None or view['E'] != E:
+            ax = self._new_view('agent_load')
+            bars = ax.bar(range(1, E+1), loads, color='#3498db', edgecolor='black' if labelled else 'none',
+                          alpha=0.85)
+            ax.set_title("Charge de travail par agent", fontsize=18, fontweight='bold', pad=20, color='#2c3e50')
+            ax.set_xlabel("Agent", fontsize=13)
+            ax.set_ylabel("Nombre de quarts", fontsize=13)
+            ax.set_xticks(range(1, E+1, max(1, E//20)))
+            ax.set_ylim(0, top)
+            # Valeurs au-dessus des barres seulement quand elles restent lisibles
+            texts = [ax.text(i + 1, h + 0.1, f'{h}', ha='center', va='bottom', fontweight='bold')
+                     for i, h in enumerate(loads)] if labelled else []
+            self._register('agent_load', ax, list(bars) + texts, E=E, bars=list(bars), texts=texts)
+            return
+        for bar, h in zip(view['bars'], loads):
+            bar.set_height(h)
+        for text, h in zip(view['texts'], loads):
+            text.set_y(h + 0.1)
+            text.set_text(f'{h}')
+        ylim = view['ax'].get_ylim()[1]
+        rescale = top > ylim or top < 0.5 * ylim
+        if rescale:
+            view['ax'].set_ylim(0, top)
+        self._show('agent_load', blit=not rescale)
+
+
+    # 2. Frontière coût / effectif (balayage)
+
+    @_timed('frontier')
+    def show_frontier(self, points, min_agents):
+        ax = self._new_view('frontier')
+        for ms in sorted(min_agents):
+            pts = [p for p in points if p['max_shifts'] == ms and 'total' in p]
+            if not pts:
+                continue
+            E = np.array([p['E'] for p in pts])
+            total = np.array([p['total'] for p in pts])
+            line, = ax.plot(E, total, marker='o', linewidth=2, label=f"max {ms} quarts/agent")
+            best = np.argmin(E)
+            ax.annotate(f"min {E[best]}", (E[best], total[best]), textcoords="offset points",
+                        xytext=(0, 10), ha='center', fontweight='bold', color=line.get_color())
+        ax.set_title("Coût total selon l'effectif", fontsize=18, fontweight='bold', pad=20, color='#2c3e50')
+        ax.set_xlabel("Nombre d'agents", fontsize=13)
+        ax.set_ylabel("Coût total", fontsize=13)
+        ax.grid(alpha=0.3)
+        ax.legend(fontsize=11)
+        self._register('frontier', ax, [])
+
+
+    # 3. Heatmap 
+
+    @_timed('heatmap')
     def show_heatmap(self, sol):
-        self.clear()
-        ax = self.fig.add_subplot(111)
-
-        E = len(sol)
-        D = len(sol[0])
-        heat = np.zeros((E, D))
-        for e in range(E):
-            for d in range(D):
-                heat[e, d] = sum(sol[e][d])
+        E, D = sol.shape[:2]
+        heat = sol.sum(axis=2)
+        view = self._views.get('heatmap')
+        if view is not None and view['shape'] == (E, D):
+            view['image'].set_data(heat)
+            self._show('heatmap', blit=True)
+            return
+        ax = self._new_view('heatmap')
 
         jours = ["Lun", "Mar", "Mer", "Jeu", "Ven", "Sam", "Dim"]
         im = ax.imshow(heat, cmap="YlOrRd", aspect='auto', vmin=0, vmax=1)
 
-        ax.set_yticks(np.arange(E))
-        ax.set_yticklabels([f"Agent {e+1}" for e in range(E)], fontsize=9)
+        # Étiquettes d'agents espacées pour les grands effectifs
+        step = -(-E // self.MAX_LABELS)
+        ax.set_yticks(np.arange(0, E, step))
+        ax.set_yticklabels([f"Agent {e+1}" for e in range(0, E, step)], fontsize=9)
         ax.set_xticks(np.arange(D))
-        ax.set_xticklabels(jours, fontsize=12, fontweight='bold', color='#2c3e50')
+        ax.set_xticklabels([jours[d % 7] for d in range(D)], fontsize=12 if D <= 14 else 8,
+                           fontweight='bold', color='#2c3e50')
 
         ax.set_title("Planning Hebdomadaire – Qui travaille quand ?", 
                      fontsize=18, fontweight='bold', pad=30, color='#2c3e50')
 
-        # Grille
-        ax.set_xticks(np.arange(-.5, D, 1), minor=True)
-        ax.set_yticks(np.arange(-.5, E, 1), minor=True)
-        ax.grid(which='minor', color='gray', linestyle='-', linewidth=1.5)
+        # Grille (lignes d'agents seulement si elles restent visibles), tracée en segments pour
+        # être redessinée par-dessus l'image après un blitting
+        width = 1.5 if E <= self.MAX_LABELS else 0.5
+        grid = [ax.vlines(np.arange(-.5, D, 1), -.5, E - .5, color='gray', linewidth=width)]
+        if E <= 2 * self.MAX_LABELS:
+            grid.append(ax.hlines(np.arange(-.5, E, 1), -.5, D - .5, color='gray', linewidth=width))
+        ax.set_xlim(-.5, D - .5)
+        ax.set_ylim(E - .5, -.5)
         ax.tick_params(which='both', length=0)
 
         # Légende
         from matplotlib.patches import Patch
         legend = [Patch(facecolor='#ffffb3', label='Repos'),
                   Patch(facecolor='#fb6a4a', label='Travaille')]
-        ax.legend(handles=legend, loc='upper right', bbox_to_anchor=(1.15, 1),
-                  title="Légende", fontsize=11, title_fontsize=12)
+        leg = ax.legend(handles=legend, loc='upper right', bbox_to_anchor=(1.15, 1),
+                        title="Légende", fontsize=11, title_fontsize=12)
 
-        self.fig.tight_layout()
-        self.draw()
+        self._register('heatmap', ax, [im], overlay=grid + list(ax.spines.values()) + [leg],
+                       shape=(E, D), image=im)